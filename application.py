@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 """
 Main entry point for the Flask application
+
+Importing this module builds the WSGI application once and performs no
+database I/O; the schema is managed separately with
+``python -m src.infrastructure.migrations upgrade``.
 """
 import sys
 import os
@@ -9,20 +13,16 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.app import create_app
-from src.infrastructure.models import db
-
-# Create the application instance for gunicorn/WSGI servers
-application = create_app('production')
-
-# Create database tables on startup
-with application.app_context():
-    db.create_all()
 
 if __name__ == '__main__':
     # When running directly (not via gunicorn), use development config
+    from src.infrastructure.migrations import upgrade
+
     app = create_app('development')
-    
     with app.app_context():
-        db.create_all()
-        
+        upgrade()
+
     app.run(debug=True, host='0.0.0.0', port=5000)
+else:
+    # Create the application instance for gunicorn/WSGI servers
+    application = create_app('production')
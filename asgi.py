@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+ASGI entry point for the optional async serving mode
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+"""
+from src.asgi import create_asgi_app
+
+# Create the application instance for ASGI servers
+application = create_asgi_app('production')
@@ -0,0 +1,57 @@
+"""
+Per-request JWT verification overhead with and without the verified-token cache
+
+Usage:
+    python -m benchmarks.bench_auth [--iterations 20000]
+
+Times ``verify_jwt_in_request_cached`` inside a request context carrying the
+singleton token, first with full verification on every call and then with the
+verified-token cache, and reports the mean and p99 cost per request.
+"""
+import argparse
+import sys
+import time
+from .http_client import percentile
+
+
+def time_verification(app, headers, token_cache, iterations):
+    from src.utils.jwt_utils import verify_jwt_in_request_cached
+
+    samples = []
+    for _ in range(iterations):
+        with app.test_request_context("/blacklists/user@example.com", headers=headers):
+            started = time.perf_counter()
+            verify_jwt_in_request_cached(token_cache)
+            samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {
+        "mean_us": sum(samples) / len(samples) * 1e6,
+        "p50_us": percentile(samples, 0.50) * 1e6,
+        "p99_us": percentile(samples, 0.99) * 1e6,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark per-request JWT verification overhead")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    from src.app import create_app
+    from src.utils.jwt_utils import VerifiedTokenCache
+
+    app = create_app("testing")
+    token = app.test_client().post("/token").get_json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    results = {
+        "uncached": time_verification(app, headers, None, args.iterations),
+        "cached": time_verification(app, headers, VerifiedTokenCache(), args.iterations),
+    }
+    for mode, result in results.items():
+        print(f"{mode:>9}: mean {result['mean_us']:7.1f} us  p50 {result['p50_us']:7.1f} us  p99 {result['p99_us']:7.1f} us")
+    print(f"Saved per request: {results['uncached']['mean_us'] - results['cached']['mean_us']:.1f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
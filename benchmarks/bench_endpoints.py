@@ -0,0 +1,197 @@
+"""
+Endpoint benchmark suite with baseline regression check
+
+Usage:
+    python -m benchmarks.bench_endpoints [--table-sizes 0 1000 10000]
+        [--iterations 500] [--database-url URL] [--no-cache]
+        [--output results.json] [--baseline benchmarks/baseline.json]
+        [--threshold 0.25] [--save-baseline]
+
+The app is built with ``create_app('testing')`` (in-memory SQLite) or, with
+``--database-url``, against a file-backed SQLite or local PostgreSQL. For each
+table size the blacklist is seeded and the following scenarios are timed
+through the Flask test client: ``/ping``, ``/health``, ``POST /blacklists``
+with new and duplicate emails, and ``GET /blacklists/<email>`` hits and misses.
+
+Throughput and latency percentiles are written as JSON. When a baseline is
+given, any scenario whose median latency grew by more than ``--threshold``
+(a fraction) makes the run exit with status 1. Baselines are machine specific;
+regenerate ``benchmarks/baseline.json`` with ``--save-baseline`` on the
+machine that runs the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from .http_client import percentile
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def build_app(database_url=None, cache=True):
+    """Create the app under test, configured before src is imported"""
+    os.environ["BLACKLIST_CACHE_ENABLED"] = "true" if cache else "false"
+    if database_url:
+        os.environ["DATABASE_URL"] = database_url
+
+    from src.app import create_app
+    from src.infrastructure.models import db
+
+    app = create_app("production" if database_url else "testing")
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def seed(app, size):
+    """Reset the table and insert size entries"""
+    from src.domain.entities import Blacklist
+    from src.infrastructure.models import db
+    from src.infrastructure.repositories import BlacklistRepository
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        repository = BlacklistRepository(batch_chunk_size=1000)
+        for start in range(0, size, 10000):
+            repository.add_emails_to_blacklist([
+                Blacklist(email=f"seed-{i}@example.com", app_uuid="bench", blocked_reason="seed")
+                for i in range(start, min(size, start + 10000))
+            ])
+
+
+def time_calls(call, iterations, warmup):
+    """Time call() iterations times after warmup calls"""
+    for i in range(warmup):
+        call(-1 - i)
+    samples = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        call_started = time.perf_counter()
+        call(i)
+        samples.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "ops_per_second": iterations / elapsed,
+        "mean_ms": sum(samples) / len(samples) * 1000,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p90_ms": percentile(samples, 0.90) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+    }
+
+
+def run_scenarios(app, size, iterations, warmup):
+    client = app.test_client()
+    token = client.post("/token").get_json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    run_id = time.time_ns()
+
+    def expect(response, status):
+        if response.status_code != status:
+            raise RuntimeError(f"Expected {status}, got {response.status_code}: {response.data[:200]!r}")
+
+    def insert(email):
+        return client.post("/blacklists", json={
+            "email": email, "app_uuid": "bench", "blocked_reason": "benchmark"
+        }, headers=headers)
+
+    insert("duplicate@example.com")
+    hit_email = f"seed-{size // 2}@example.com" if size else "duplicate@example.com"
+
+    scenarios = {
+        "ping": lambda i: expect(client.get("/ping"), 200),
+        "health": lambda i: expect(client.get("/health"), 200),
+        "insert_new": lambda i: expect(insert(f"new-{run_id}-{i}@example.com"), 201),
+        "insert_duplicate": lambda i: expect(insert("duplicate@example.com"), 409),
+        "check_hit": lambda i: expect(client.get(f"/blacklists/{hit_email}", headers=headers), 200),
+        "check_miss": lambda i: expect(client.get(f"/blacklists/miss-{i}@example.com", headers=headers), 200),
+    }
+
+    results = {}
+    with app.app_context():
+        for name, call in scenarios.items():
+            results[f"size={size}/{name}"] = time_calls(call, iterations, warmup)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return the scenarios whose median latency regressed beyond threshold"""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get("results", {}).get(key)
+        if not previous:
+            continue
+        change = current["p50_ms"] / previous["p50_ms"] - 1 if previous["p50_ms"] else 0.0
+        if change > threshold:
+            regressions.append((key, previous["p50_ms"], current["p50_ms"], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the HTTP endpoints and service layer")
+    parser.add_argument("--table-sizes", type=int, nargs="+", default=[0, 1000, 10000])
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--database-url", help="File-backed SQLite or PostgreSQL URL (default: in-memory SQLite)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the blacklist lookup cache")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed median latency growth (fraction)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    args = parser.parse_args(argv)
+
+    app = build_app(args.database_url, cache=not args.no_cache)
+
+    results = {}
+    for size in args.table_sizes:
+        seed(app, size)
+        results.update(run_scenarios(app, size, args.iterations, args.warmup))
+
+    for key, result in results.items():
+        print(
+            f"{key:<32} {result['ops_per_second']:9.1f} ops/s  p50 {result['p50_ms']:7.3f} ms  "
+            f"p90 {result['p90_ms']:7.3f} ms  p99 {result['p99_ms']:7.3f} ms"
+        )
+
+    report = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": args.database_url or "sqlite:///:memory:",
+            "cache": not args.no_cache,
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    regressions = compare(results, baseline, args.threshold)
+    for key, previous, current, change in regressions:
+        print(f"REGRESSION {key}: p50 {previous:.3f} ms -> {current:.3f} ms (+{change:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Compare the development server with the gunicorn production configuration
+
+Usage:
+    python -m benchmarks.bench_gunicorn [--rate 1000] [--duration 15]
+        [--concurrency 64] [--database-url URL] [--output FILE]
+
+Each mode is started against a fresh database and driven open loop at a rate
+above what it can sustain, so the achieved throughput is its capacity:
+
+- ``dev``: the Flask development server the Dockerfile used to run
+- ``sync`` / ``gthread``: ``gunicorn --config gunicorn.conf.py`` with that
+  worker class and its derived worker count
+
+To reproduce the 512 CPU unit (0.5 vCPU) Fargate task, run inside a container
+with the same quota, e.g. ``docker run --cpus 0.5 ...``; gunicorn.conf.py reads
+the cgroup quota when deriving the worker count.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from .http_client import wait_until_ready
+from .loadgen import DEV_SERVER_SCRIPT, PROJECT_ROOT, get_token, migrate, seed, run_open_loop, summarize
+
+MODES = {
+    "dev": lambda port: ([sys.executable, "-c", DEV_SERVER_SCRIPT, str(port)], {}),
+    "sync": lambda port: (
+        [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}"],
+        {"GUNICORN_WORKER_CLASS": "sync"},
+    ),
+    "gthread": lambda port: (
+        [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}"],
+        {"GUNICORN_WORKER_CLASS": "gthread"},
+    ),
+}
+
+
+def bench_mode(mode, args, port, database_url):
+    command, extra_env = MODES[mode](port)
+    migrate(database_url)
+    env = dict(os.environ, DATABASE_URL=database_url, PYTHONPATH=PROJECT_ROOT, **extra_env)
+    server = subprocess.Popen(
+        command, cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        asyncio.run(wait_until_ready("127.0.0.1", port))
+        headers = {"Authorization": f"Bearer {asyncio.run(get_token('127.0.0.1', port))}"}
+        seeded_emails = asyncio.run(seed("127.0.0.1", port, headers, args.seed))
+        latencies, outcomes, elapsed = asyncio.run(run_open_loop(
+            "127.0.0.1", port, headers, args.rate, args.duration, args.concurrency, args.write_ratio, seeded_emails
+        ))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    result = summarize(latencies, outcomes, elapsed, args.rate, args.concurrency)
+    result.pop("histogram")
+    result["mode"] = mode
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dev server against gunicorn.conf.py")
+    parser.add_argument("--modes", nargs="+", default=["dev", "sync", "gthread"], choices=sorted(MODES))
+    parser.add_argument("--rate", type=float, default=1000.0, help="Offered load, above the expected capacity")
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=200)
+    parser.add_argument("--database-url", help="Database shared by all modes (default: temporary SQLite per mode)")
+    parser.add_argument("--port", type=int, default=5300)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for offset, mode in enumerate(args.modes):
+            database_url = args.database_url or f"sqlite:///{os.path.join(tmp_dir, mode + '.db')}"
+            result = bench_mode(mode, args, args.port + offset, database_url)
+            results.append(result)
+            print(
+                f"{mode:>8}: {result['achieved_rate']:8.1f} req/s  p50 {result['p50_ms']:8.2f} ms  "
+                f"p99 {result['p99_ms']:8.2f} ms  errors {result['error_rate']:.2%}"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Index size and lookup latency of the canonical email and digest lookup keys
+
+Usage:
+    python -m benchmarks.bench_lookup_key [--rows 100000 1000000 10000000]
+        [--lookups 5000] [--database-url URL] [--output FILE]
+
+For each row count and ``BLACKLIST_LOOKUP_KEY`` mode a fresh ``blacklist``
+table is migrated (so only the indexes that mode keeps exist), loaded with
+synthetic entries and then probed through ``BlacklistRepository`` with a mix
+of present and absent emails. The report lists the size of every index on the
+table and the p50/p99 latency of hits and misses.
+
+Without ``--database-url`` each run uses a temporary SQLite file and sizes
+come from the ``dbstat`` table; with a PostgreSQL URL the table is dropped and
+recreated between runs and sizes come from ``pg_relation_size``.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from .http_client import percentile
+
+MODES = ("canonical", "digest")
+LOAD_BATCH_SIZE = 10000
+
+
+def build_app(database_url, mode):
+    from flask import Flask
+    from src.infrastructure.models import db
+
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=database_url,
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        BLACKLIST_LOOKUP_KEY=mode,
+    )
+    db.init_app(app)
+    return app
+
+
+def reset_schema():
+    from src.infrastructure.migrations import migration_metadata, upgrade
+    from src.infrastructure.models import db, BlacklistModel
+
+    BlacklistModel.__table__.drop(db.engine, checkfirst=True)
+    migration_metadata.drop_all(bind=db.engine)
+    upgrade()
+
+
+def load_rows(rows):
+    from datetime import datetime
+    from sqlalchemy import text
+    from src.domain.canonical_email import email_digest
+    from src.infrastructure.models import db, BlacklistModel
+
+    created_at = datetime.utcnow()
+    for start in range(0, rows, LOAD_BATCH_SIZE):
+        batch = []
+        for i in range(start, min(rows, start + LOAD_BATCH_SIZE)):
+            canonical = f"user{i}@bench.example.com"
+            batch.append({
+                "email": canonical, "email_canonical": canonical, "email_digest": email_digest(canonical),
+                "app_uuid": "bench", "blocked_reason": "benchmark", "ip": None, "created_at": created_at,
+            })
+        with db.engine.begin() as connection:
+            connection.execute(BlacklistModel.__table__.insert(), batch)
+
+    with db.engine.begin() as connection:
+        connection.execute(text("ANALYZE blacklist" if connection.dialect.name == "postgresql" else "ANALYZE"))
+
+
+def index_sizes():
+    from sqlalchemy import inspect, text
+    from src.infrastructure.models import db
+
+    names = [index["name"] for index in inspect(db.engine).get_indexes("blacklist")]
+    sizes = {}
+    with db.engine.connect() as connection:
+        for name in names:
+            if connection.dialect.name == "postgresql":
+                query = text("SELECT pg_relation_size(CAST(:name AS regclass))")
+            else:
+                query = text("SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name = :name")
+            sizes[name] = connection.execute(query, {"name": name}).scalar()
+    return sizes
+
+
+def time_lookups(repository, emails):
+    samples = []
+    for email in emails:
+        started = time.perf_counter()
+        repository.is_email_blacklisted(email)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {"p50_us": percentile(samples, 0.50) * 1e6, "p99_us": percentile(samples, 0.99) * 1e6}
+
+
+def bench(database_url, mode, rows, lookups):
+    from src.infrastructure.models import db
+    from src.infrastructure.repositories import BlacklistRepository
+
+    app = build_app(database_url, mode)
+    with app.app_context():
+        reset_schema()
+        started = time.perf_counter()
+        load_rows(rows)
+        load_seconds = time.perf_counter() - started
+
+        rng = random.Random(rows)
+        repository = BlacklistRepository(lookup_key=mode)
+        hits = [f"USER{rng.randrange(rows)}@Bench.Example.com" for _ in range(lookups)]
+        misses = [f"absent{rng.randrange(10**9)}@bench.example.com" for _ in range(lookups)]
+        time_lookups(repository, hits[:min(lookups, 500)])
+        result = {
+            "mode": mode,
+            "rows": rows,
+            "load_seconds": load_seconds,
+            "index_bytes": index_sizes(),
+            "hit": time_lookups(repository, hits),
+            "miss": time_lookups(repository, misses),
+        }
+        db.session.remove()
+        db.engine.dispose()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the canonical email and digest lookup keys")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000], help="Table sizes, e.g. 1000000 10000000")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--lookups", type=int, default=5000, help="Hits and misses timed per run")
+    parser.add_argument("--database-url", help="PostgreSQL database to use (default: temporary SQLite per run)")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in args.rows:
+            for mode in args.modes:
+                database_url = args.database_url or f"sqlite:///{os.path.join(tmp_dir, f'{mode}-{rows}.db')}"
+                result = bench(database_url, mode, rows, args.lookups)
+                results.append(result)
+                indexes = "  ".join(f"{name} {size / 2**20:.1f} MiB" for name, size in result["index_bytes"].items())
+                print(
+                    f"{rows:>9} rows {mode:>9}: hit p50 {result['hit']['p50_us']:7.1f} us "
+                    f"p99 {result['hit']['p99_us']:7.1f} us  miss p50 {result['miss']['p50_us']:7.1f} us "
+                    f"p99 {result['miss']['p99_us']:7.1f} us  {indexes}"
+                )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
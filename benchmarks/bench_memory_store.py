@@ -0,0 +1,123 @@
+"""
+Memory footprint, load time, lookup latency and sync lag of the in-memory store
+
+Usage:
+    python -m benchmarks.bench_memory_store [--rows 1000000] [--lookups 20000]
+        [--poll-interval 1] [--database-url URL] [--output FILE]
+
+Loads a synthetic ``blacklist`` table (temporary SQLite unless
+``--database-url`` is given), builds ``InMemoryBlacklistRepository`` from it
+and reports:
+
+- memory per million entries, measured with tracemalloc around the load and
+  as estimated by ``stats()``
+- the time to load the table
+- hit/miss lookup latency from memory and from ``BlacklistRepository``
+- replication lag: the time until a row inserted directly into the table is
+  visible to a store syncing every ``--poll-interval`` seconds
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from .bench_lookup_key import build_app, load_rows, reset_schema, time_lookups
+
+
+def measure_lag(store, poll_interval, samples):
+    from sqlalchemy import text
+    from src.infrastructure.models import db
+
+    lags = []
+    for sample in range(samples):
+        email = f"lag-{sample}@bench.example.com"
+        with db.engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO blacklist (email, email_canonical, app_uuid, blocked_reason, created_at) "
+                "VALUES (:email, :email, 'bench', 'lag', CURRENT_TIMESTAMP)"
+            ), {"email": email})
+        inserted = time.perf_counter()
+        while store.is_email_blacklisted(email) is None:
+            if time.perf_counter() - inserted > 10 * poll_interval + 5:
+                break
+            time.sleep(0.001)
+        lags.append(time.perf_counter() - inserted)
+    store.stop()
+    return {"mean_ms": sum(lags) / len(lags) * 1000, "max_ms": max(lags) * 1000}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the in-memory blacklist store")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--lag-samples", type=int, default=5)
+    parser.add_argument("--database-url", help="Database to load (default: temporary SQLite)")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    from src.infrastructure.memory_repository import InMemoryBlacklistRepository
+    from src.infrastructure.repositories import BlacklistRepository
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp_dir, 'memory.db')}"
+        app = build_app(database_url, "canonical")
+        with app.app_context():
+            reset_schema()
+            load_rows(args.rows)
+
+            database = BlacklistRepository()
+            # The sync thread starts with the first lookup; the initial load is timed on its own
+            store = InMemoryBlacklistRepository(database, poll_interval=args.poll_interval)
+            started = time.perf_counter()
+            store.sync()
+            load_seconds = time.perf_counter() - started
+            stats = store.stats()
+
+            # Memory is traced on a second copy, since tracing slows the load down severalfold
+            tracemalloc.start()
+            traced_copy = InMemoryBlacklistRepository(database)
+            traced_copy.sync()
+            traced, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del traced_copy
+
+            hits = [f"USER{i * 7919 % args.rows}@Bench.Example.com" for i in range(args.lookups)]
+            misses = [f"absent{i}@bench.example.com" for i in range(args.lookups)]
+            database_lookups = min(args.lookups, 5000)
+            result = {
+                "rows": args.rows,
+                "load_seconds": load_seconds,
+                "traced_bytes_per_million": traced / args.rows * 1_000_000,
+                "estimated_bytes_per_million": stats["memory_bytes_per_million"],
+                "memory": {"hit": time_lookups(store, hits), "miss": time_lookups(store, misses)},
+                "database": {
+                    "hit": time_lookups(database, hits[:database_lookups]),
+                    "miss": time_lookups(database, misses[:database_lookups]),
+                },
+                "lag": measure_lag(store, args.poll_interval, args.lag_samples),
+            }
+
+    print(f"Loaded {args.rows} rows in {result['load_seconds']:.2f} s")
+    print(
+        f"Memory per 1M entries: {result['traced_bytes_per_million'] / 2**20:.1f} MiB traced, "
+        f"{result['estimated_bytes_per_million'] / 2**20:.1f} MiB estimated by stats()"
+    )
+    for source in ("memory", "database"):
+        print(
+            f"{source:>9}: hit p50 {result[source]['hit']['p50_us']:7.1f} us p99 {result[source]['hit']['p99_us']:7.1f} us  "
+            f"miss p50 {result[source]['miss']['p50_us']:7.1f} us p99 {result[source]['miss']['p99_us']:7.1f} us"
+        )
+    print(f"Replication lag at a {args.poll_interval} s poll interval: "
+          f"mean {result['lag']['mean_ms']:.0f} ms, max {result['lag']['max_ms']:.0f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Bytes on the wire and CPU per 1,000 entries for each response format and encoding
+
+Usage:
+    python -m benchmarks.bench_serialization [--entries 1000] [--repeat 200] [--output FILE]
+
+Builds ``--entries`` synthetic bulk check results (the body of
+``POST /blacklists/check``) and export rows (``GET /blacklists``), then, for
+JSON and MessagePack bodies, each uncompressed, gzip and zstd compressed at the
+configured levels, reports the body size and the CPU time to serialize and
+compress it, scaled to 1,000 entries. Bodies are compressed whole; the
+streamed export flushes every 100 rows, which costs a little more. Formats
+whose package is not installed are skipped.
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from src.adapters.content_negotiation import msgpack, zstandard
+from src.config import Config
+
+
+APP_UUIDS = [str(uuid.UUID(int=random.Random(n).getrandbits(128), version=4)) for n in range(20)]
+REASONS = ["spam", "fraud", "chargeback", "user request", "bounced repeatedly"]
+
+
+def entry(i):
+    # Varied enough that compression ratios are not flattered by repetition
+    local = hashlib.blake2b(str(i).encode(), digest_size=5).hexdigest()
+    created_at = datetime(2024, 1, 1) + timedelta(seconds=i * 7919 % 31536000, microseconds=i * 104729 % 10**6)
+    return {
+        "email": f"{local}.{i}@domain{i % 50}.example.com",
+        "app_uuid": APP_UUIDS[i % len(APP_UUIDS)],
+        "blocked_reason": REASONS[i % len(REASONS)],
+        "fecha_creacion": created_at.isoformat(),
+    }
+
+
+def check_results(count):
+    results = []
+    for i in range(count):
+        row = entry(i)
+        results.append(dict(row, blacklisted=True) if i % 3 == 0 else {"blacklisted": False, "email": row["email"]})
+    return {"results": results, "lookup_ms": 1.5}
+
+
+def export_rows(count):
+    return [entry(i) for i in range(count)]
+
+
+def serializers():
+    # Same calls as the Flask-RESTful representations and the NDJSON export
+    found = {
+        "json": lambda data: (
+            "".join(json.dumps(row) + "\n" for row in data) if isinstance(data, list) else json.dumps(data) + "\n"
+        ).encode("utf-8"),
+    }
+    if msgpack is not None:
+        found["msgpack"] = lambda data: msgpack.packb(data, use_bin_type=True)
+    return found
+
+
+def gzip_compress(body):
+    compressor = zlib.compressobj(Config.RESPONSE_COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+def encoders():
+    found = {"identity": lambda body: body, "gzip": gzip_compress}
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=Config.RESPONSE_COMPRESSION_ZSTD_LEVEL)
+        found["zstd"] = compressor.compress
+    return found
+
+
+def cpu_us(function, argument, repeat):
+    started = time.process_time()
+    for _ in range(repeat):
+        result = function(argument)
+    return (time.process_time() - started) / repeat * 1e6, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare response formats and encodings")
+    parser.add_argument("--entries", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    scale = 1000 / args.entries
+    result = {}
+    for payload, data in (("check", check_results(args.entries)), ("export", export_rows(args.entries))):
+        for format_name, serialize in serializers().items():
+            serialize_us, body = cpu_us(serialize, data, args.repeat)
+            for encoding, encode in encoders().items():
+                encode_us, encoded = cpu_us(encode, body, args.repeat)
+                result[f"{payload}/{format_name}/{encoding}"] = {
+                    "bytes_per_1000": len(encoded) * scale,
+                    "serialize_us_per_1000": serialize_us * scale,
+                    "compress_us_per_1000": encode_us * scale if encoding != "identity" else 0.0,
+                }
+
+    print(f"{'payload/format/encoding':<28} {'bytes':>9} {'serialize':>11} {'compress':>10}   (per 1,000 entries)")
+    for name, row in result.items():
+        print(f"{name:<28} {row['bytes_per_1000']:9.0f} {row['serialize_us_per_1000']:8.0f} us "
+              f"{row['compress_us_per_1000']:7.0f} us")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
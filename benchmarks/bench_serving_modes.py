@@ -0,0 +1,170 @@
+"""
+Compare the sync (gunicorn + Flask) and async (uvicorn + ASGI) serving modes
+
+Usage:
+    python -m benchmarks.bench_serving_modes [--workers 2] [--concurrency 64]
+        [--duration 15] [--write-ratio 0.1] [--database-url URL] [--output FILE]
+
+Both servers are started against the same database with the same number of
+worker processes and driven with the same closed-loop workload: a mix of
+``GET /blacklists/<email>`` checks (hits and misses) and ``POST /blacklists``
+inserts. Requests/sec, p50/p99 latency and error counts are printed per mode.
+The async mode only implements the direct database lookup path, so both
+servers run with ``EQUAL_STACK_ENV``: database repository mode, no lookup
+cache, bloom filter, write-behind or admission control. The comparison then
+measures the serving model alone rather than different lookup stacks.
+Use ``--database-url`` with a local PostgreSQL for representative numbers;
+the default throwaway SQLite file serializes writers.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from .http_client import HTTPConnection, wait_until_ready, percentile
+from .loadgen import migrate
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVER_COMMANDS = {
+    "sync": lambda port, workers: [
+        sys.executable, "-m", "gunicorn", "--workers", str(workers),
+        "--bind", f"127.0.0.1:{port}", "application:application",
+    ],
+    "async": lambda port, workers: [
+        sys.executable, "-m", "uvicorn", "--workers", str(workers), "--no-access-log",
+        "--host", "127.0.0.1", "--port", str(port), "asgi:application",
+    ],
+}
+
+# Turns off the WSGI-only lookup layers so both modes serve the same stack
+EQUAL_STACK_ENV = {
+    "BLACKLIST_REPOSITORY_MODE": "database",
+    "BLACKLIST_CACHE_ENABLED": "false",
+    "BLACKLIST_BLOOM_FILTER_ENABLED": "false",
+    "BLACKLIST_WRITE_BEHIND_ENABLED": "false",
+    "ADMISSION_CONTROL_ENABLED": "false",
+}
+
+
+async def run_workload(port, concurrency, duration, write_ratio, seeded_emails):
+    """Drive the server with a closed-loop check/insert mix and return latency samples"""
+    setup = HTTPConnection("127.0.0.1", port)
+    _, token_data = await setup.request_json("POST", "/token")
+    headers = {"Authorization": f"Bearer {token_data['token']}"}
+    await setup.close()
+
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        nonlocal errors
+        connection = HTTPConnection("127.0.0.1", port)
+        rng = random.Random()
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                if rng.random() < write_ratio:
+                    status, _ = await connection.request_json("POST", "/blacklists", {
+                        "email": f"{uuid.uuid4().hex}@bench.example.com",
+                        "app_uuid": "bench",
+                        "blocked_reason": "benchmark"
+                    }, headers)
+                    ok = status == 201
+                else:
+                    email = rng.choice(seeded_emails) if rng.random() < 0.5 else f"miss-{rng.randrange(10**9)}@example.com"
+                    status, _, _ = await connection.request("GET", f"/blacklists/{email}", headers)
+                    ok = status == 200
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+        await connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def seed(port, count):
+    connection = HTTPConnection("127.0.0.1", port)
+    _, token_data = await connection.request_json("POST", "/token")
+    headers = {"Authorization": f"Bearer {token_data['token']}"}
+    emails = [f"seed-{i}@example.com" for i in range(count)]
+    for email in emails:
+        await connection.request_json("POST", "/blacklists", {
+            "email": email, "app_uuid": "bench", "blocked_reason": "seed"
+        }, headers)
+    await connection.close()
+    return emails
+
+
+def bench_mode(mode, args, port, database_url):
+    migrate(database_url)
+    env = dict(os.environ, DATABASE_URL=database_url, PYTHONPATH=PROJECT_ROOT, **EQUAL_STACK_ENV)
+    server = subprocess.Popen(
+        SERVER_COMMANDS[mode](port, args.workers), cwd=PROJECT_ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        asyncio.run(wait_until_ready("127.0.0.1", port))
+        seeded_emails = asyncio.run(seed(port, args.seed))
+        latencies, errors, elapsed = asyncio.run(
+            run_workload(port, args.concurrency, args.duration, args.write_ratio, seeded_emails)
+        )
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "workers": args.workers,
+        "concurrency": args.concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async serving modes")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=200, help="Entries inserted before measuring")
+    parser.add_argument("--database-url", help="Database shared by both modes (default: temporary SQLite)")
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"], choices=sorted(SERVER_COMMANDS))
+    parser.add_argument("--port", type=int, default=5100)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for offset, mode in enumerate(args.modes):
+            database_url = args.database_url or f"sqlite:///{os.path.join(tmp_dir, mode + '.db')}"
+            result = bench_mode(mode, args, args.port + offset, database_url)
+            results.append(result)
+            print(
+                f"{mode:>5}: {result['requests_per_second']:8.1f} req/s  "
+                f"p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms  "
+                f"errors {result['errors']}/{result['requests']}"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
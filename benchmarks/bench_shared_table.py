@@ -0,0 +1,163 @@
+"""
+Worker memory and lookup latency of the shared digest table
+
+Usage:
+    python -m benchmarks.bench_shared_table [--rows 1000000] [--workers 4]
+        [--lookups 20000] [--database-url URL] [--output FILE]
+
+Loads a synthetic ``blacklist`` table (temporary SQLite unless
+``--database-url`` is given) and builds the digest table from it, then:
+
+- forks ``--workers`` processes per repository mode, as gunicorn forks its
+  workers from a preloaded master, has each one load its lookup structure and
+  touch it with a round of lookups, and reports the growth of each worker's
+  RSS and its resulting PSS (proportional set size, which splits shared pages
+  between the processes mapping them) from ``/proc/<pid>/smaps_rollup``
+- times hit/miss lookups through ``SharedTableBlacklistRepository``, the
+  in-memory store and plain ``BlacklistRepository``
+
+PSS is the figure to compare against a container memory limit: the table's
+pages are counted once across workers, an in-memory copy once per worker.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from .bench_lookup_key import build_app, load_rows, reset_schema, time_lookups
+
+
+def memory_kib(pid):
+    """Rss and Pss of a process in KiB (Linux only)"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as handle:
+        for line in handle:
+            fields = line.split()
+            if fields[0] in ("Rss:", "Pss:"):
+                values[fields[0][:-1].lower()] = int(fields[1])
+    return values
+
+
+def worker(make_repository, emails, ready, go):
+    from src.infrastructure.models import db
+
+    # As gunicorn's post_fork does: never reuse the parent's pooled connections
+    db.engine.dispose(close=False)
+    os.write(ready, b"x")
+    os.read(go, 1)
+    repository = make_repository()
+    for email in emails:
+        repository.is_email_blacklisted(email)
+    os.write(ready, b"x")
+    os.read(go, 1)
+    os._exit(0)
+
+
+def wait_for(fd, count):
+    while count > 0:
+        count -= len(os.read(fd, count))
+
+
+def measure_workers(make_repository, emails, workers):
+    """Fork workers that load a repository and return their average RSS growth and PSS in KiB"""
+    ready_read, ready_write = os.pipe()
+    go_read, go_write = os.pipe()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            worker(make_repository, emails, ready_write, go_read)
+        pids.append(pid)
+
+    wait_for(ready_read, workers)
+    before = {pid: memory_kib(pid) for pid in pids}
+    os.write(go_write, b"x" * workers)
+    wait_for(ready_read, workers)
+    after = {pid: memory_kib(pid) for pid in pids}
+    os.write(go_write, b"x" * workers)
+
+    for pid in pids:
+        os.waitpid(pid, 0)
+    for fd in (ready_read, ready_write, go_read, go_write):
+        os.close(fd)
+    return {
+        "rss_growth": sum(after[pid]["rss"] - before[pid]["rss"] for pid in pids) / workers,
+        "pss": sum(after[pid]["pss"] for pid in pids) / workers,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the shared digest table against per-worker copies")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--database-url", help="Database to load (default: temporary SQLite)")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    from src.infrastructure.memory_repository import InMemoryBlacklistRepository
+    from src.infrastructure.repositories import BlacklistRepository
+    from src.infrastructure.shared_digest_table import SharedTableBlacklistRepository, build_from_repository
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp_dir, 'shared.db')}"
+        table_path = os.path.join(tmp_dir, "digests.bin")
+        app = build_app(database_url, "canonical")
+        with app.app_context():
+            reset_schema()
+            load_rows(args.rows)
+            database = BlacklistRepository()
+            build_from_repository(database, table_path)
+
+            def shared():
+                return SharedTableBlacklistRepository(database, table_path, poll_interval=3600)
+
+            def memory():
+                # Loaded up front, as the sync thread would before lookups stop falling back
+                repository = InMemoryBlacklistRepository(database, poll_interval=3600)
+                repository.sync()
+                return repository
+
+            hits = [f"USER{i * 7919 % args.rows}@Bench.Example.com" for i in range(args.lookups)]
+            misses = [f"absent{i}@bench.example.com" for i in range(args.lookups)]
+            # Misses probe table slots all over the file, so every page ends up resident
+            touch = misses[:min(args.lookups, 50000)]
+            result = {
+                "rows": args.rows,
+                "workers": args.workers,
+                "table_bytes": os.path.getsize(table_path),
+                "worker_kib": {
+                    "shared": measure_workers(shared, touch, args.workers),
+                    "memory": measure_workers(memory, touch, args.workers),
+                },
+                "latency": {},
+            }
+
+            database_lookups = min(args.lookups, 5000)
+            for source, repository, count in (
+                ("shared", shared(), args.lookups),
+                ("memory", memory(), args.lookups),
+                ("database", database, database_lookups),
+            ):
+                result["latency"][source] = {
+                    "hit": time_lookups(repository, hits[:count]),
+                    "miss": time_lookups(repository, misses[:count]),
+                }
+
+    print(f"{args.rows} rows, digest table {result['table_bytes'] / 2**20:.1f} MiB, {args.workers} workers")
+    for source, growth in result["worker_kib"].items():
+        print(f"{source:>9}: per worker RSS +{growth['rss_growth'] / 1024:7.1f} MiB, PSS {growth['pss'] / 1024:7.1f} MiB")
+    for source, latency in result["latency"].items():
+        print(
+            f"{source:>9}: hit p50 {latency['hit']['p50_us']:7.1f} us p99 {latency['hit']['p99_us']:7.1f} us  "
+            f"miss p50 {latency['miss']['p50_us']:7.1f} us p99 {latency['miss']['p99_us']:7.1f} us"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Startup time of the WSGI application
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--database-url URL]
+        [--output FILE]
+
+Measures, over several fresh processes:
+
+- ``import``: seconds to import ``application`` (which builds the app)
+- ``first_ping`` / ``first_ready``: seconds from starting
+  ``gunicorn --config gunicorn.conf.py`` until ``/ping`` and ``/health/ready``
+  first answer 200, i.e. until a load balancer would mark the task healthy
+
+The schema is migrated once beforehand, as the container does before serving.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from .http_client import HTTPConnection
+from .loadgen import PROJECT_ROOT, migrate
+
+IMPORT_SCRIPT = (
+    "import time; started = time.perf_counter(); import application; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def measure_import(env):
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT], cwd=PROJECT_ROOT, env=env,
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+async def wait_for_status(port, path, deadline):
+    while time.perf_counter() < deadline:
+        connection = HTTPConnection("127.0.0.1", port, timeout=2.0)
+        try:
+            status, _, _ = await connection.request("GET", path)
+            if status == 200:
+                return time.perf_counter()
+        except Exception:
+            pass
+        finally:
+            await connection.close()
+        await asyncio.sleep(0.01)
+    raise TimeoutError(f"{path} did not answer 200 in time")
+
+
+def measure_first_response(env, port, timeout=60.0):
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}"],
+        cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        ping_at = asyncio.run(wait_for_status(port, "/ping", started + timeout))
+        ready_at = asyncio.run(wait_for_status(port, "/health/ready", started + timeout))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return ping_at - started, ready_at - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure application import and time to first response")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url", help="Database to start against (default: temporary SQLite)")
+    parser.add_argument("--port", type=int, default=5500)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp_dir, 'startup.db')}"
+        migrate(database_url)
+        env = dict(os.environ, DATABASE_URL=database_url, PYTHONPATH=PROJECT_ROOT)
+
+        samples = {"import": [], "first_ping": [], "first_ready": []}
+        for run in range(args.runs):
+            samples["import"].append(measure_import(env))
+            first_ping, first_ready = measure_first_response(env, args.port + run)
+            samples["first_ping"].append(first_ping)
+            samples["first_ready"].append(first_ready)
+
+    results = {
+        name: {"median_s": statistics.median(values), "min_s": min(values), "max_s": max(values)}
+        for name, values in samples.items()
+    }
+    for name, result in results.items():
+        print(f"{name:>12}: median {result['median_s']:.3f} s  min {result['min_s']:.3f} s  max {result['max_s']:.3f} s")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Minimal asyncio HTTP/1.1 client used by the benchmark and load tools
+
+It keeps connections alive when the server allows it, reconnects when the
+server answers with ``Connection: close`` (gunicorn sync workers do), and
+understands both Content-Length and chunked bodies. Only the standard library
+is needed, so the tools run in the same environment as the application.
+"""
+import asyncio
+import json
+from typing import Dict, Optional, Tuple
+
+
+class HTTPConnection:
+    """A single reusable HTTP/1.1 connection"""
+
+    def __init__(self, host: str, port: int, timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        headers: Optional[Dict[str, str]] = None,
+        body: bytes = b"",
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """Send a request and return (status, headers, body)"""
+        try:
+            return await asyncio.wait_for(self._request(method, path, headers or {}, body), self.timeout)
+        except Exception:
+            await self.close()
+            raise
+
+    async def request_json(self, method: str, path: str, payload=None, headers=None) -> Tuple[int, object]:
+        """Send a JSON request and decode the JSON response"""
+        headers = dict(headers or {})
+        body = b""
+        if payload is not None:
+            body = json.dumps(payload).encode("utf-8")
+            headers.setdefault("Content-Type", "application/json")
+        status, _, response_body = await self.request(method, path, headers, body)
+        return status, json.loads(response_body) if response_body else None
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+        self._reader = self._writer = None
+
+    async def _request(self, method, path, headers, body):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(body)}"]
+        lines.extend(f"{key}: {value}" for key, value in headers.items())
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError("Server closed the connection")
+        status = int(status_line.split()[1])
+
+        response_headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            response_headers[key.strip().lower()] = value.strip()
+
+        if method == "HEAD" or status in (204, 304):
+            response_body = b""
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            response_body = await self._read_chunked()
+        elif "content-length" in response_headers:
+            response_body = await self._reader.readexactly(int(response_headers["content-length"]))
+        else:
+            response_body = await self._reader.read()
+            response_headers["connection"] = "close"
+
+        if response_headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, response_headers, response_body
+
+    async def _read_chunked(self) -> bytes:
+        chunks = []
+        while True:
+            size = int((await self._reader.readline()).split(b";")[0].strip(), 16)
+            if size == 0:
+                await self._reader.readline()
+                return b"".join(chunks)
+            chunks.append(await self._reader.readexactly(size))
+            await self._reader.readline()
+
+
+async def wait_until_ready(host: str, port: int, timeout: float = 30.0, path: str = "/ping") -> None:
+    """Poll the server until it answers 200 on path"""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        connection = HTTPConnection(host, port, timeout=2.0)
+        try:
+            status, _, _ = await connection.request("GET", path)
+            if status == 200:
+                return
+        except Exception:
+            pass
+        finally:
+            await connection.close()
+        if asyncio.get_running_loop().time() > deadline:
+            raise TimeoutError(f"Server on {host}:{port} did not become ready")
+        await asyncio.sleep(0.2)
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
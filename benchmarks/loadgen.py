@@ -0,0 +1,289 @@
+"""
+Open-loop load generator against a locally started server
+
+Usage:
+    python -m benchmarks.loadgen [--server gunicorn|dev] [--workers 2]
+        [--worker-class sync] [--threads 1] [--rate 200] [--duration 20]
+        [--write-ratio 0.1] [--concurrency 32] [--sweep 100 200 400 800 1600]
+        [--database-url URL] [--url http://host:port] [--output FILE]
+
+The server is started as a subprocess (gunicorn with the given worker model,
+or the Flask development server) unless ``--url`` points at one already
+running. A token is obtained from ``/token`` and a mix of ``POST /blacklists``
+inserts and ``GET /blacklists/<email>`` checks is sent at ``--rate``
+requests/sec.
+
+Scheduling is open loop: request ``i`` is due at ``start + i / rate`` whether
+or not earlier requests finished, and its latency is measured from that due
+time. When the server falls behind, the time requests spend waiting for one of
+the ``--concurrency`` connections shows up in the tail instead of silently
+lowering the offered load (coordinated omission).
+
+With ``--sweep`` the run is repeated at each offered rate, lowest first,
+with the same ``--concurrency``, and the knee of the curve is reported: the
+first rate at which throughput stops following the offered load (it falls
+more than 5% short) or p99 latency climbs past ``--latency-knee`` times its
+value at the lowest rate. The rate before it is the saturation point, the
+highest load the server sustains.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from urllib.parse import urlparse
+from .http_client import HTTPConnection, wait_until_ready, percentile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+SATURATION_TOLERANCE = 0.05
+LATENCY_KNEE_FACTOR = 3.0
+
+DEV_SERVER_SCRIPT = (
+    "import sys; from src.app import create_app; "
+    "create_app('production').run(host='127.0.0.1', port=int(sys.argv[1]), threaded=True)"
+)
+
+
+def server_command(args, port):
+    if args.server == "dev":
+        return [sys.executable, "-c", DEV_SERVER_SCRIPT, str(port)]
+    return [
+        sys.executable, "-m", "gunicorn", "--workers", str(args.workers),
+        "--worker-class", args.worker_class, "--threads", str(args.threads),
+        "--bind", f"127.0.0.1:{port}", "application:application",
+    ]
+
+
+def migrate(database_url):
+    """Bring the benchmark database schema up to date, as the container does before serving"""
+    env = dict(os.environ, DATABASE_URL=database_url, PYTHONPATH=PROJECT_ROOT)
+    subprocess.run(
+        [sys.executable, "-m", "src.infrastructure.migrations", "upgrade", "--config", "production"],
+        cwd=PROJECT_ROOT, env=env, check=True, stdout=subprocess.DEVNULL,
+    )
+
+
+def start_server(args, port, database_url):
+    migrate(database_url)
+    env = dict(os.environ, DATABASE_URL=database_url, PYTHONPATH=PROJECT_ROOT)
+    server = subprocess.Popen(
+        server_command(args, port), cwd=PROJECT_ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        asyncio.run(wait_until_ready("127.0.0.1", port))
+    except Exception:
+        server.terminate()
+        raise
+    return server
+
+
+async def get_token(host, port):
+    connection = HTTPConnection(host, port)
+    try:
+        _, token_data = await connection.request_json("POST", "/token")
+    finally:
+        await connection.close()
+    return token_data["token"]
+
+
+async def seed(host, port, headers, count):
+    connection = HTTPConnection(host, port)
+    emails = [f"loadgen-seed-{i}@example.com" for i in range(count)]
+    for email in emails:
+        await connection.request_json("POST", "/blacklists", {
+            "email": email, "app_uuid": "loadgen", "blocked_reason": "seed"
+        }, headers)
+    await connection.close()
+    return emails
+
+
+async def run_open_loop(host, port, headers, rate, duration, concurrency, write_ratio, seeded_emails):
+    """Send requests on a fixed schedule and measure latency from each due time"""
+    connections = asyncio.Queue()
+    for _ in range(concurrency):
+        connections.put_nowait(HTTPConnection(host, port))
+
+    latencies = []
+    outcomes = Counter()
+    rng = random.Random()
+
+    async def fire(due, is_write, email):
+        connection = await connections.get()
+        try:
+            if is_write:
+                status, _ = await connection.request_json("POST", "/blacklists", {
+                    "email": email, "app_uuid": "loadgen", "blocked_reason": "load test"
+                }, headers)
+            else:
+                status, _, _ = await connection.request("GET", f"/blacklists/{email}", headers)
+            outcomes[str(status)] += 1
+        except Exception as e:
+            outcomes[type(e).__name__] += 1
+        finally:
+            connections.put_nowait(connection)
+        latencies.append(time.perf_counter() - due)
+
+    total = int(rate * duration)
+    started = time.perf_counter()
+    tasks = []
+    for i in range(total):
+        due = started + i / rate
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if rng.random() < write_ratio:
+            tasks.append(asyncio.create_task(fire(due, True, f"{uuid.uuid4().hex}@loadgen.example.com")))
+        else:
+            email = rng.choice(seeded_emails) if seeded_emails and rng.random() < 0.5 \
+                else f"miss-{rng.randrange(10**9)}@example.com"
+            tasks.append(asyncio.create_task(fire(due, False, email)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    while not connections.empty():
+        await connections.get_nowait().close()
+    return latencies, outcomes, elapsed
+
+
+def summarize(latencies, outcomes, elapsed, rate, concurrency):
+    latencies.sort()
+    histogram = Counter()
+    for latency in latencies:
+        latency_ms = latency * 1000
+        bucket = next((f"<={bound}ms" for bound in HISTOGRAM_BOUNDS_MS if latency_ms <= bound), "+Inf")
+        histogram[bucket] += 1
+
+    ok = sum(count for status, count in outcomes.items() if status in ("200", "201"))
+    return {
+        "concurrency": concurrency,
+        "target_rate": rate,
+        "requests": len(latencies),
+        "achieved_rate": ok / elapsed if elapsed else 0.0,
+        "error_rate": 1 - ok / len(latencies) if latencies else 0.0,
+        "outcomes": dict(outcomes),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p90_ms": percentile(latencies, 0.90) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "p999_ms": percentile(latencies, 0.999) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        "histogram": {
+            bucket: histogram[bucket]
+            for bucket in [f"<={bound}ms" for bound in HISTOGRAM_BOUNDS_MS] + ["+Inf"]
+        },
+    }
+
+
+def print_summary(result):
+    print(
+        f"offered {result['target_rate']:>7.0f} req/s, {result['concurrency']} connections: "
+        f"achieved {result['achieved_rate']:8.1f} req/s  "
+        f"p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  p99.9 {result['p999_ms']:8.2f} ms  "
+        f"errors {result['error_rate']:.2%}"
+    )
+    width = max(result["histogram"].values()) or 1
+    for bucket, count in result["histogram"].items():
+        if count:
+            print(f"    {bucket:>9} {count:>8} {'#' * max(1, count * 40 // width)}")
+
+
+def find_saturation(results, latency_knee=LATENCY_KNEE_FACTOR):
+    """Highest offered rate sustained before the knee, and the knee itself
+
+    The knee is the first rate whose throughput falls more than the tolerance
+    short of the offered load, or whose p99 exceeds ``latency_knee`` times the
+    p99 at the lowest rate. Either may be None: no rate was sustained, or the
+    sweep never reached the knee.
+    """
+    ordered = sorted(results, key=lambda r: r["target_rate"])
+    baseline_p99 = ordered[0]["p99_ms"]
+    saturation = None
+    for result in ordered:
+        plateaued = result["achieved_rate"] < result["target_rate"] * (1 - SATURATION_TOLERANCE)
+        if plateaued or result["p99_ms"] > baseline_p99 * latency_knee:
+            return saturation, result
+        saturation = result
+    return saturation, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Open-loop load generator for the blacklist API")
+    parser.add_argument("--server", choices=["gunicorn", "dev"], default="gunicorn")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--worker-class", default="sync", choices=("sync", "gthread"), help="gunicorn worker class")
+    parser.add_argument("--threads", type=int, default=1, help="Threads per gthread worker")
+    parser.add_argument("--url", help="Target an already running server instead of starting one")
+    parser.add_argument("--database-url", help="Database for the started server (default: temporary SQLite)")
+    parser.add_argument("--port", type=int, default=5200)
+    parser.add_argument("--rate", type=float, default=200.0, help="Offered load in requests/sec")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, default=32, help="Connections available to the schedule")
+    parser.add_argument("--sweep", type=float, nargs="+", help="Repeat the run at each offered rate to find the knee")
+    parser.add_argument("--latency-knee", type=float, default=LATENCY_KNEE_FACTOR,
+                        help="p99 growth over the lowest rate that marks the knee")
+    parser.add_argument("--seed", type=int, default=200, help="Entries inserted before measuring")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        server = None
+        if args.url:
+            target = urlparse(args.url)
+            host, port = target.hostname, target.port or 80
+        else:
+            host, port = "127.0.0.1", args.port
+            database_url = args.database_url or f"sqlite:///{os.path.join(tmp_dir, 'loadgen.db')}"
+            server = start_server(args, port, database_url)
+
+        try:
+            headers = {"Authorization": f"Bearer {asyncio.run(get_token(host, port))}"}
+            seeded_emails = asyncio.run(seed(host, port, headers, args.seed))
+            results = []
+            for rate in sorted(args.sweep or [args.rate]):
+                latencies, outcomes, elapsed = asyncio.run(run_open_loop(
+                    host, port, headers, rate, args.duration, args.concurrency, args.write_ratio, seeded_emails
+                ))
+                result = summarize(latencies, outcomes, elapsed, rate, args.concurrency)
+                results.append(result)
+                print_summary(result)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+    report = {"server": args.url or args.server, "workers": args.workers, "results": results}
+    if args.sweep:
+        saturation, knee = find_saturation(results, args.latency_knee)
+        report["saturation"] = saturation
+        report["knee"] = knee
+        if saturation is None:
+            print(f"Not sustained even at {results[0]['target_rate']:.0f} req/s; sweep lower rates")
+        else:
+            print(
+                f"Saturation at {saturation['target_rate']:.0f} req/s offered: "
+                f"{saturation['achieved_rate']:.1f} req/s, p99 {saturation['p99_ms']:.2f} ms"
+            )
+        if knee is None:
+            print("No knee within the sweep; sweep higher rates")
+        else:
+            print(
+                f"Knee at {knee['target_rate']:.0f} req/s offered: "
+                f"{knee['achieved_rate']:.1f} req/s, p99 {knee['p99_ms']:.2f} ms"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
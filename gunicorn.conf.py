@@ -0,0 +1,140 @@
+"""
+Gunicorn configuration for the production WSGI server
+
+    gunicorn --config gunicorn.conf.py
+
+Every setting can be overridden through the environment:
+
+- ``GUNICORN_WORKERS``: worker processes (default derived from the CPUs
+  available to the container, including a cgroup CPU quota such as a Fargate
+  task's CPU units)
+- ``GUNICORN_WORKER_CLASS``: ``sync`` or ``gthread`` (default). The
+  background threads (write-behind flusher, health refresher, cache and table
+  pollers) and the per-thread pool sizing assume OS threads, so cooperative
+  workers such as gevent are not supported
+- ``GUNICORN_THREADS``: threads per gthread worker (default 4)
+- ``GUNICORN_KEEPALIVE``: seconds an idle keep-alive connection is held; keep
+  it above the load balancer idle timeout (default 75)
+- ``GUNICORN_MAX_REQUESTS`` / ``GUNICORN_MAX_REQUESTS_JITTER``: recycle a worker
+  after this many requests, staggered so workers do not restart together
+- ``GUNICORN_TIMEOUT``: seconds before a silent worker is killed and restarted
+
+The application is preloaded, so imports and ``create_app`` run once in the
+master and workers share those pages copy-on-write. Each forked worker drops
+the database connections inherited from the master in ``post_fork``. With
+``BLACKLIST_REPOSITORY_MODE=shared`` the master also runs the digest table
+builder as a child process for as long as it lives.
+"""
+import math
+import os
+import subprocess
+import sys
+
+
+def available_cpus() -> float:
+    """CPUs this process may use, honouring affinity and a cgroup CPU quota"""
+    try:
+        cpus = float(len(os.sched_getaffinity(0)))
+    except AttributeError:
+        cpus = float(os.cpu_count() or 1)
+
+    for path in ("/sys/fs/cgroup/cpu.max", "/sys/fs/cgroup/cpu/cpu.cfs_quota_us"):
+        try:
+            with open(path, encoding="utf-8") as handle:
+                fields = handle.read().split()
+            if path.endswith("cpu.max"):
+                quota, period = fields[0], fields[1]
+            else:
+                with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us", encoding="utf-8") as handle:
+                    quota, period = fields[0], handle.read().strip()
+            if quota not in ("max", "-1"):
+                cpus = min(cpus, int(quota) / int(period))
+            break
+        except (OSError, ValueError, IndexError):
+            continue
+    return cpus
+
+
+def default_workers(cpus: float, worker_class: str) -> int:
+    """Worker processes for the given CPU budget and worker class"""
+    if worker_class == "sync":
+        # Sync workers block on every database round trip, so oversubscribe
+        return max(2, 2 * math.ceil(cpus) + 1)
+    # Threaded workers already overlap I/O within a process
+    return max(1, math.ceil(cpus))
+
+
+wsgi_app = "application:application"
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+SUPPORTED_WORKER_CLASSES = ("sync", "gthread")
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+if worker_class not in SUPPORTED_WORKER_CLASSES:
+    raise ValueError(f"GUNICORN_WORKER_CLASS must be sync or gthread, not {worker_class!r}")
+workers = int(os.environ.get("GUNICORN_WORKERS", default_workers(available_cpus(), worker_class)))
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+
+preload_app = True
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "75"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+_table_builder = None
+
+
+def when_ready(server):
+    """Start the shared digest table builder in shared repository mode"""
+    global _table_builder
+    config = server.app.wsgi().config
+    if config.get("BLACKLIST_REPOSITORY_MODE") != "shared":
+        return
+    _table_builder = subprocess.Popen([
+        sys.executable, "-m", "src.infrastructure.shared_digest_table", "build",
+        "--config", config["CONFIG_NAME"],
+        "--path", config["BLACKLIST_SHARED_TABLE_PATH"],
+        "--loop", str(config["BLACKLIST_SHARED_TABLE_REBUILD_INTERVAL"]),
+    ])
+    server.log.info("Started digest table builder (pid %s)", _table_builder.pid)
+
+
+def on_exit(server):
+    """Stop the shared digest table builder"""
+    if _table_builder is not None and _table_builder.poll() is None:
+        _table_builder.terminate()
+        try:
+            _table_builder.wait(timeout=graceful_timeout)
+        except subprocess.TimeoutExpired:
+            _table_builder.kill()
+
+
+def post_fork(server, worker):
+    """Discard pooled connections inherited from the master without closing them"""
+    from src.infrastructure.models import db
+
+    app = server.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    """Drop the live-only Prometheus samples of an exited worker"""
+    from src.infrastructure.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
+
+
+def worker_exit(server, worker):
+    """Write the entries still queued in write-behind mode before the worker exits"""
+    app = server.app.wsgi()
+    write_behind = app.container.get_service("write_behind_repository")
+    if write_behind is not None:
+        write_behind.close(timeout=graceful_timeout)
@@ -0,0 +1,223 @@
+import json
+import re
+from datetime import datetime
+from typing import Optional
+from flask import Flask
+from marshmallow import ValidationError
+from .schemas import (
+    health_status_schema,
+    blacklist_request_schema,
+    blacklist_response_schema,
+    blacklist_check_response_schema
+)
+from ..application.async_blacklist_service import AsyncBlacklistService
+from ..infrastructure.metrics import render_metrics, CONTENT_TYPE
+from ..utils.jwt_utils import VerifiedTokenCache, authenticate_request, issue_token
+
+CHECK_ROUTE = re.compile(r"^/blacklists/(?P<email>[^/]+)$")
+INGEST_ROUTE = re.compile(r"^/blacklists/ingest/[^/]+$")
+# Routes of create_app that only the WSGI application serves
+WSGI_ONLY_ROUTES = {
+    ("GET", "/blacklists"),
+    ("POST", "/blacklists/batch"),
+    ("POST", "/blacklists/check"),
+    ("GET", "/admin/profiling"),
+    ("PUT", "/admin/profiling"),
+}
+
+
+class PlainResponse:
+    """Non-JSON response body with its content type"""
+
+    def __init__(self, body: bytes, content_type: str):
+        self.body = body
+        self.content_type = content_type
+
+
+class HTTPError(Exception):
+    """Error carrying the HTTP status and JSON body to return"""
+
+    def __init__(self, status: int, body: dict):
+        super().__init__(body)
+        self.status = status
+        self.body = body
+
+
+class BlacklistASGIApp:
+    """ASGI application serving the ping, health, metrics, token, insert and check routes
+
+    Routes, auth rules and response bodies match the Flask application built by
+    ``create_app`` so both serving modes are interchangeable behind the load
+    balancer. The batch, bulk check, export, ingest status and profiling routes
+    are answered with 501 and stay on the WSGI application.
+
+    Tokens are issued and verified by the same helpers as the Flask application
+    (``issue_token`` and ``authenticate_request``), run in a request context of
+    ``auth_app``, a bare Flask app with the JWT settings, so a token issued by
+    either mode is accepted by the other. The schema is not touched at startup;
+    like the WSGI application it relies on ``python -m
+    src.infrastructure.migrations upgrade``.
+    """
+
+    def __init__(
+        self,
+        blacklist_service: AsyncBlacklistService,
+        auth_app: Flask,
+        repository=None,
+        token_cache: Optional[VerifiedTokenCache] = None,
+    ):
+        self.blacklist_service = blacklist_service
+        self.auth_app = auth_app
+        self._repository = repository
+        self._token_cache = token_cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        try:
+            status, body = await self._dispatch(scope, receive)
+        except HTTPError as e:
+            status, body = e.status, e.body
+        except Exception:
+            status, body = 500, {"error": "Internal server error", "message": "An error occurred"}
+
+        if isinstance(body, PlainResponse):
+            payload, content_type = body.body, body.content_type
+        else:
+            payload, content_type = json.dumps(body).encode("utf-8") + b"\n", "application/json"
+        if scope["method"] == "HEAD":
+            payload = b""
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", content_type.encode("latin-1")),
+                (b"content-length", str(len(payload)).encode("ascii")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": payload})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._repository is not None:
+                    await self._repository.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _dispatch(self, scope, receive):
+        method, path = scope["method"], scope["path"]
+
+        if path == "/ping" and method in ("GET", "HEAD"):
+            if method == "HEAD":
+                return 200, ""
+            return 200, {"status": "ok", "message": "pong", "timestamp": datetime.utcnow().isoformat()}
+
+        if path == "/health" and method == "GET":
+            health_status = await self.blacklist_service.get_health_status()
+            return 200, health_status_schema.dump(health_status)
+
+        if path == "/health/live" and method in ("GET", "HEAD"):
+            return 200, {"status": "alive", "timestamp": datetime.utcnow().isoformat()}
+
+        if path == "/health/ready" and method == "GET":
+            health_status = await self.blacklist_service.get_health_status()
+            return (200 if health_status.status == "healthy" else 503), health_status_schema.dump(health_status)
+
+        if path == "/metrics" and method == "GET":
+            return 200, PlainResponse(render_metrics(), CONTENT_TYPE)
+
+        if (method, path) in WSGI_ONLY_ROUTES or (method == "GET" and INGEST_ROUTE.match(path)):
+            return 501, {
+                "error": "Not implemented",
+                "message": "This route is only served by the WSGI application"
+            }
+
+        if path == "/token" and method == "POST":
+            with self.auth_app.app_context():
+                return 200, issue_token()
+
+        if path == "/blacklists" and method == "POST":
+            self._require_auth_token(scope)
+            return await self._add_email(scope, receive)
+
+        match = CHECK_ROUTE.match(path)
+        if match and method == "GET":
+            self._require_auth_token(scope)
+            email = match.group("email")
+            if not email or "@" not in email:
+                return 400, {"error": "Invalid email format"}
+            result = await self.blacklist_service.check_email_blacklist_status(email)
+            return 200, blacklist_check_response_schema.dump(result)
+
+        known_paths = ("/ping", "/health", "/health/live", "/health/ready", "/metrics", "/token", "/blacklists")
+        if path in known_paths or match or any(path == route for _, route in WSGI_ONLY_ROUTES):
+            return 405, {"message": "The method is not allowed for the requested URL."}
+        return 404, {"message": "The requested URL was not found on the server."}
+
+    async def _add_email(self, scope, receive):
+        try:
+            json_data = json.loads(await self._read_body(receive) or b"null")
+        except ValueError:
+            json_data = None
+        if not json_data:
+            return 400, {"error": "No JSON data provided"}
+
+        try:
+            validated_data = blacklist_request_schema.load(json_data)
+        except ValidationError as err:
+            return 400, {"error": "Validation error", "details": err.messages}
+
+        result = await self.blacklist_service.add_email_to_blacklist(
+            email=validated_data["email"],
+            app_uuid=validated_data["app_uuid"],
+            blocked_reason=validated_data["blocked_reason"],
+            client_ip=self._get_client_ip(scope)
+        )
+
+        if "error" in result:
+            return 409, result
+        return 201, blacklist_response_schema.dump(result)
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    def _require_auth_token(self, scope) -> dict:
+        """Verify the Bearer token with the same helper as require_auth_token"""
+        headers = [(key.decode("latin-1"), value.decode("latin-1")) for key, value in scope.get("headers", [])]
+        with self.auth_app.test_request_context(scope["path"], method=scope["method"], headers=headers):
+            claims, error = authenticate_request(self._token_cache)
+        if error is not None:
+            raise HTTPError(401, error)
+        return claims
+
+    @staticmethod
+    def _header(scope, name: bytes) -> Optional[str]:
+        for key, value in scope.get("headers", []):
+            if key.lower() == name:
+                return value.decode("latin-1")
+        return None
+
+    def _get_client_ip(self, scope) -> Optional[str]:
+        """Get client IP address from the ASGI scope"""
+        forwarded_for = self._header(scope, b"x-forwarded-for")
+        if forwarded_for:
+            return forwarded_for.split(",")[0].strip()
+        real_ip = self._header(scope, b"x-real-ip")
+        if real_ip:
+            return real_ip
+        client = scope.get("client")
+        return client[0] if client else None
@@ -1,35 +1,74 @@
-from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+import csv
+import hashlib
+import io
+import json
+import time
+from flask import request, jsonify, current_app, Response, stream_with_context
 from flask_restful import Resource
 from marshmallow import ValidationError
+from werkzeug.exceptions import HTTPException
 from functools import wraps
 from ..application.blacklist_service import BlacklistService
+from .content_negotiation import get_request_data, negotiated_etag
 from .schemas import (
     blacklist_request_schema,
     blacklist_response_schema,
-    blacklist_check_response_schema
+    blacklist_check_response_schema,
+    blacklist_export_query_schema,
+    blacklist_bulk_check_request_schema,
+    blacklist_bulk_check_response_schema,
+    blacklist_batch_request_schema,
+    blacklist_batch_response_schema,
+    blacklist_ingest_response_schema
 )
-from ..utils.jwt_utils import get_singleton_token
+from ..infrastructure.metrics import record_blacklist_lookup
+from ..utils.jwt_utils import authenticate_request, issue_token
+
+EXPORT_FIELDS = ('email', 'app_uuid', 'blocked_reason', 'fecha_creacion')
+EXPORT_FLUSH_ROWS = 100
+
+
+def check_etag(result, list_version):
+    """Strong ETag of a check result
+
+    Entries are never updated or deleted, so a blacklisted answer is tagged by
+    its entry alone; a "not blacklisted" answer only holds until the list
+    changes, so it is tagged by the list version it was computed at.
+    """
+    if not result['blacklisted']:
+        return f'absent-{list_version}'
+    entry = '\0'.join((result['blocked_reason'], result['app_uuid'], result['fecha_creacion']))
+    return 'entry-' + hashlib.blake2b(entry.encode('utf-8'), digest_size=12).hexdigest()
+
+
+def not_modified(etag, max_age):
+    """304 response for a matching If-None-Match, built without the body"""
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.max_age = max_age
+    return response
 
 def require_auth_token(f):
-    @jwt_required()
+    """Decorator to require Bearer token authentication"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        # Get user identity from JWT token
-        user_identity = get_jwt_identity()
-
-        # Optional: Add additional validation
-        if not user_identity:
-            return {'error': 'Invalid token identity'}, 401
+        # Verify the JWT, skipping signature checks for recently verified tokens
+        container = getattr(current_app, 'container', None)
+        token_cache = container.get_service('verified_token_cache') if container else None
+        jwt_data, error = authenticate_request(token_cache)
+        if error is not None:
+            return error, 401
+        if jwt_data is None:
+            return f(*args, **kwargs)
 
         # Add user info to request context for potential use
         request.user_info = {
-            'identity': user_identity,
-            'jwt_data': get_jwt_identity()
+            'identity': jwt_data[current_app.config['JWT_IDENTITY_CLAIM']],
+            'jwt_data': jwt_data
         }
 
         return f(*args, **kwargs)
-    """Decorator to require Bearer token authentication"""
 
     return decorated_function
 
@@ -45,12 +84,24 @@ class BlacklistController(Resource):
         """Add an email to the blacklist"""
         try:
             # Validate request data
-            json_data = request.get_json()
+            json_data = get_request_data()
             if not json_data:
                 return {'error': 'No JSON data provided'}, 400
             
             # Validate using schema
             validated_data = blacklist_request_schema.load(json_data)
+
+            # Write-behind mode: queue the insert and answer before it is committed
+            if self.blacklist_service.write_behind_enabled:
+                queued = self.blacklist_service.enqueue_email_to_blacklist(
+                    email=validated_data['email'],
+                    app_uuid=validated_data['app_uuid'],
+                    blocked_reason=validated_data['blocked_reason']
+                )
+                if queued is None:
+                    return {'error': 'Ingest queue is full, retry later'}, 503, {'Retry-After': '1'}
+                location = f"/blacklists/ingest/{queued['tracking_id']}"
+                return blacklist_ingest_response_schema.dump(queued), 202, {'Location': location}
             
             # Call service
             result = self.blacklist_service.add_email_to_blacklist(
@@ -68,6 +119,143 @@ class BlacklistController(Resource):
             
         except ValidationError as err:
             return {'error': 'Validation error', 'details': err.messages}, 400
+        except HTTPException as err:
+            # Undecodable or unsupported request body
+            return {'error': err.description}, err.code
+        except Exception as e:
+            return {'error': 'Internal server error'}, 500
+
+    @require_auth_token
+    def get(self):
+        """Stream blacklist entries as NDJSON or CSV"""
+        try:
+            filters = blacklist_export_query_schema.load(request.args)
+        except ValidationError as err:
+            return {'error': 'Validation error', 'details': err.messages}, 400
+
+        export_format = filters.pop('format')
+        entries = self.blacklist_service.export_blacklist(
+            page_size=current_app.config.get('BLACKLIST_EXPORT_PAGE_SIZE', 1000),
+            **filters
+        )
+
+        if export_format == 'csv':
+            body, mimetype = _csv_lines(entries), 'text/csv'
+        else:
+            body, mimetype = _ndjson_lines(entries), 'application/x-ndjson'
+
+        response = Response(stream_with_context(body), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename=blacklist.{export_format}'
+        return response
+
+
+def _ndjson_lines(entries):
+    """Serialize entries as newline-delimited JSON, a few rows per chunk"""
+    buffer = []
+    for entry in entries:
+        buffer.append(json.dumps(entry, ensure_ascii=False))
+        if len(buffer) >= EXPORT_FLUSH_ROWS:
+            yield '\n'.join(buffer) + '\n'
+            buffer = []
+    if buffer:
+        yield '\n'.join(buffer) + '\n'
+
+
+def _csv_lines(entries):
+    """Serialize entries as CSV with a header row, a few rows per chunk"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    rows = 0
+    for entry in entries:
+        writer.writerow(entry)
+        rows += 1
+        if rows % EXPORT_FLUSH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+class BlacklistBatchController(Resource):
+    """Controller for batch blacklist operations"""
+
+    def __init__(self, blacklist_service: BlacklistService):
+        self.blacklist_service = blacklist_service
+
+    @require_auth_token
+    def post(self):
+        """Add a list of emails to the blacklist in one transaction"""
+        try:
+            json_data = get_request_data()
+            if not isinstance(json_data, list) or not json_data:
+                return {'error': 'A non-empty JSON array is required'}, 400
+
+            max_items = current_app.config.get('BLACKLIST_BATCH_MAX_ITEMS', 10000)
+            if len(json_data) > max_items:
+                return {'error': f'Batch exceeds the maximum of {max_items} items'}, 413
+
+            # Validate the whole list, keeping per-item errors
+            try:
+                validated = dict(enumerate(blacklist_batch_request_schema.load(json_data)))
+                errors = {}
+            except ValidationError as err:
+                errors = err.messages if isinstance(err.messages, dict) else {}
+                validated = {
+                    index: blacklist_request_schema.load(item)
+                    for index, item in enumerate(json_data)
+                    if index not in errors
+                }
+
+            results = [None] * len(json_data)
+            for index, details in errors.items():
+                item = json_data[index] if isinstance(json_data[index], dict) else {}
+                results[index] = {
+                    'index': index,
+                    'email': item.get('email') if isinstance(item.get('email'), str) else None,
+                    'status': 'invalid',
+                    'details': details
+                }
+
+            indexes = sorted(validated)
+            if indexes:
+                outcomes = self.blacklist_service.add_emails_to_blacklist([validated[i] for i in indexes])
+                for index, outcome in zip(indexes, outcomes):
+                    results[index] = dict(outcome, index=index)
+
+            statuses = [result['status'] for result in results]
+            report = {
+                'total': len(results),
+                'created': statuses.count('created'),
+                'duplicates': statuses.count('duplicate'),
+                'invalid': statuses.count('invalid'),
+                'results': results
+            }
+            return blacklist_batch_response_schema.dump(report), 200
+
+        except HTTPException as err:
+            # Undecodable or unsupported request body
+            return {'error': err.description}, err.code
+        except Exception as e:
+            return {'error': 'Internal server error'}, 500
+
+
+class BlacklistIngestStatusController(Resource):
+    """Controller for write-behind ingest status lookups"""
+
+    def __init__(self, blacklist_service: BlacklistService):
+        self.blacklist_service = blacklist_service
+
+    @require_auth_token
+    def get(self, tracking_id):
+        """Return whether a queued insert is pending, created, a duplicate, failed or unknown to this worker"""
+        try:
+            result = self.blacklist_service.get_ingest_status(tracking_id)
+            if result is None:
+                return {'error': 'Unknown tracking id'}, 404
+
+            return blacklist_ingest_response_schema.dump(result), 200
+
         except Exception as e:
             return {'error': 'Internal server error'}, 500
 
@@ -80,18 +268,80 @@ class BlacklistCheckController(Resource):
 
     @require_auth_token
     def get(self, email):
-        """Check if an email is in the blacklist"""
+        """Check if an email is in the blacklist, answering If-None-Match revalidation with 304"""
         try:
             # Validate email format
             if not email or '@' not in email:
                 return {'error': 'Invalid email format'}, 400
-            
+
+            # Read before the lookup, so a concurrent insert changes the version the answer is tagged with
+            list_version = self.blacklist_service.get_list_version()
+            max_age = current_app.config.get('BLACKLIST_CHECK_CACHE_MAX_AGE', 0)
+            if list_version is not None:
+                absent_etag = negotiated_etag(f'absent-{list_version}')
+                if request.if_none_match.contains(absent_etag):
+                    return not_modified(absent_etag, max_age)
+
             # Call service
             result = self.blacklist_service.check_email_blacklist_status(email)
-            
+            record_blacklist_lookup(result['blacklisted'])
+
+            if list_version is None and not result['blacklisted']:
+                # Not answered from the primary, so there is no version this answer is known to hold at
+                return blacklist_check_response_schema.dump(result), 200
+            etag = negotiated_etag(check_etag(result, list_version))
+            if request.if_none_match.contains(etag):
+                return not_modified(etag, max_age)
+
             # Return response
-            return blacklist_check_response_schema.dump(result), 200
-            
+            return blacklist_check_response_schema.dump(result), 200, {
+                'ETag': f'"{etag}"',
+                'Cache-Control': f'private, max-age={max_age}',
+            }
+
+        except Exception as e:
+            return {'error': 'Internal server error'}, 500
+
+
+class BlacklistBulkCheckController(Resource):
+    """Controller for checking the blacklist status of several emails"""
+
+    def __init__(self, blacklist_service: BlacklistService):
+        self.blacklist_service = blacklist_service
+
+    @require_auth_token
+    def post(self):
+        """Check a list of emails against the blacklist"""
+        try:
+            json_data = get_request_data()
+            if not json_data:
+                return {'error': 'No JSON data provided'}, 400
+
+            validated_data = blacklist_bulk_check_request_schema.load(json_data)
+            emails = validated_data['emails']
+
+            max_emails = current_app.config.get('BLACKLIST_CHECK_MAX_EMAILS', 1000)
+            if len(emails) > max_emails:
+                return {'error': f'Request exceeds the maximum of {max_emails} emails'}, 413
+
+            started = time.perf_counter()
+            results = self.blacklist_service.check_emails_blacklist_status(emails)
+            lookup_ms = (time.perf_counter() - started) * 1000
+            hits = sum(1 for result in results if result['blacklisted'])
+            record_blacklist_lookup(True, hits)
+            record_blacklist_lookup(False, len(results) - hits)
+
+            return blacklist_bulk_check_response_schema.dump({
+                'count': len(results),
+                'lookup_ms': round(lookup_ms, 3),
+                'results': results
+            }), 200
+
+        except ValidationError as err:
+            return {'error': 'Validation error', 'details': err.messages}, 400
+        except HTTPException as err:
+            # Undecodable or unsupported request body
+            return {'error': err.description}, err.code
         except Exception as e:
             return {'error': 'Internal server error'}, 500
 
@@ -105,11 +355,6 @@ class TokenController(Resource):
     def post(self):
         """Return the same static JWT token each call"""
         try:
-            token = get_singleton_token()
-            return {
-                'token': token,
-                'message': 'Token generated successfully',
-                'usage': 'Use this token in Authorization header: Bearer <token>'
-            }, 200
+            return issue_token(), 200
         except Exception as e:
             return {'error': 'Failed to generate token'}, 500
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+Content negotiation for the blacklist endpoints
+
+- ``application/msgpack`` request bodies are accepted wherever JSON is, and
+  ``Accept: application/msgpack`` selects a MessagePack response through a
+  Flask-RESTful representation. Both need the ``msgpack`` package; without it
+  only JSON is offered.
+- Responses of at least ``RESPONSE_COMPRESSION_MIN_SIZE`` bytes are compressed
+  with zstd (when the ``zstandard`` package is installed) or gzip, whichever
+  the client accepts with the higher quality. Streamed responses such as the
+  export are compressed chunk by chunk and flushed after each chunk, so
+  clients keep receiving rows as they are produced.
+
+Strong ETags must differ between representations, so ``negotiated_etag``
+tags the negotiated media type and encoding onto an entity tag.
+"""
+import zlib
+from flask import current_app, make_response, request
+from werkzeug.exceptions import BadRequest
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+COMPRESSED_PATH_PREFIX = '/blacklists'
+COMPRESSIBLE_MIMETYPES = (JSON_MIMETYPE, MSGPACK_MIMETYPE, 'application/x-ndjson', 'text/csv')
+
+
+def output_msgpack(data, code, headers=None):
+    """Makes a Flask response with a MessagePack encoded body"""
+    response = make_response(msgpack.packb(data, use_bin_type=True), code)
+    response.headers.extend(headers or {})
+    return response
+
+
+def get_request_data():
+    """Request body decoded from MessagePack or JSON according to its Content-Type"""
+    if request.mimetype == MSGPACK_MIMETYPE and msgpack is not None:
+        try:
+            return msgpack.unpackb(request.get_data(), raw=False)
+        except ValueError as e:
+            raise BadRequest('Failed to decode MessagePack body') from e
+    return request.get_json()
+
+
+def response_mediatype():
+    """Media type Flask-RESTful will pick for the response to the current request"""
+    offered = [JSON_MIMETYPE, MSGPACK_MIMETYPE] if msgpack is not None else [JSON_MIMETYPE]
+    return request.accept_mimetypes.best_match(offered, default=JSON_MIMETYPE)
+
+
+def response_encoding():
+    """Content-Encoding for compressed responses to the current request, or None"""
+    if not current_app.config.get('RESPONSE_COMPRESSION_ENABLED', False):
+        return None
+    accepted = request.accept_encodings
+    candidates = [('gzip', accepted['gzip'])]
+    if zstandard is not None:
+        candidates.insert(0, ('zstd', accepted['zstd']))
+    encoding, quality = max(candidates, key=lambda candidate: candidate[1])
+    return encoding if quality > 0 else None
+
+
+def negotiated_etag(etag):
+    """Entity tag made unique to the negotiated media type and content encoding"""
+    if response_mediatype() == MSGPACK_MIMETYPE:
+        etag += '-msgpack'
+    encoding = response_encoding()
+    return f'{etag}-{encoding}' if encoding else etag
+
+
+def _compressor(encoding):
+    """(compress, flush, finish) functions of a streaming compressor"""
+    if encoding == 'zstd':
+        compressor = zstandard.ZstdCompressor(
+            level=current_app.config.get('RESPONSE_COMPRESSION_ZSTD_LEVEL', 3)
+        ).compressobj()
+        return (
+            compressor.compress,
+            lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compressor.flush,
+        )
+    # wbits 31 selects the gzip container
+    compressor = zlib.compressobj(current_app.config.get('RESPONSE_COMPRESSION_GZIP_LEVEL', 6), zlib.DEFLATED, 31)
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+def _compressed_stream(chunks, source, compressor):
+    # Runs after the request context is gone, so the compressor is created beforehand
+    compress, flush, finish = compressor
+    try:
+        for chunk in chunks:
+            if chunk:
+                yield compress(chunk) + flush()
+        yield finish()
+    finally:
+        close = getattr(source, 'close', None)
+        if close is not None:
+            close()
+
+
+def compress_response(response):
+    """Compress a blacklist endpoint response the client accepts compressed"""
+    if (
+        not request.path.startswith(COMPRESSED_PATH_PREFIX)
+        or response.status_code < 200 or response.status_code in (204, 304)
+        or 'Content-Encoding' in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = response_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compressed_stream(response.iter_encoded(), response.response, _compressor(encoding))
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < current_app.config.get('RESPONSE_COMPRESSION_MIN_SIZE', 1024):
+            return response
+        compress, _, finish = _compressor(encoding)
+        response.set_data(compress(body) + finish())
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_content_negotiation(app, api) -> None:
+    """Register the MessagePack representation and response compression"""
+    if msgpack is not None:
+        api.representations[MSGPACK_MIMETYPE] = output_msgpack
+
+    @app.after_request
+    def _negotiate(response):
+        if request.path.startswith(COMPRESSED_PATH_PREFIX) and msgpack is not None:
+            response.vary.add('Accept')
+        return compress_response(response)
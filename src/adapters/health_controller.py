@@ -1,5 +1,7 @@
+from datetime import datetime
 from flask_restful import Resource
 from src.application.health_service import HealthService
+from src.infrastructure.health_refresher import HealthRefresher
 from .schemas import health_status_schema
 
 
@@ -8,17 +10,44 @@ class HealthController(Resource):
 
     def __init__(self):
         self.health_service: HealthService = None  # Will be injected by dependency container
+        self.health_refresher: HealthRefresher = None  # Will be injected by dependency container
 
     def set_health_service(self, health_service: HealthService):
         """Set health service (dependency injection)"""
         self.health_service = health_service
 
+    def set_health_refresher(self, health_refresher: HealthRefresher):
+        """Set health refresher (dependency injection)"""
+        self.health_refresher = health_refresher
+
     def get(self):
-        """Get detailed health status"""
-        health_status = self.health_service.get_health_status()
+        """Get detailed health status, served from the background refresher"""
+        health_status = self.health_refresher.get_status()
         return health_status_schema.dump(health_status)
 
 
+class ReadinessController(HealthController):
+    """Controller for the readiness probe: 503 while dependencies are unhealthy"""
+
+    def get(self):
+        """Get the cached health status with a status code the load balancer acts on"""
+        health_status = self.health_refresher.get_status()
+        status_code = 200 if health_status.status == "healthy" else 503
+        return health_status_schema.dump(health_status), status_code
+
+
+class LivenessController(Resource):
+    """Controller for the liveness probe: the process answers, no dependency checks"""
+
+    def get(self):
+        """Report that the process is alive"""
+        return {"status": "alive", "timestamp": datetime.utcnow().isoformat()}
+
+    def head(self):
+        """HEAD request for liveness - useful for load balancers"""
+        return "", 200
+
+
 class PingController(Resource):
     """Controller for simple ping health check"""
 
@@ -0,0 +1,11 @@
+from flask import Response
+from flask_restful import Resource
+from ..infrastructure.metrics import render_metrics, CONTENT_TYPE
+
+
+class MetricsController(Resource):
+    """Controller exposing Prometheus metrics"""
+
+    def get(self):
+        """Render metrics in the Prometheus text format"""
+        return Response(render_metrics(), content_type=CONTENT_TYPE)
@@ -0,0 +1,38 @@
+from flask import request
+from flask_restful import Resource
+from ..infrastructure.profiling import RequestProfiler
+from .blacklist_controller import require_auth_token
+
+
+class ProfilingController(Resource):
+    """Controller for toggling request profiling at runtime"""
+
+    def __init__(self):
+        self.request_profiler: RequestProfiler = None  # Will be injected by dependency container
+
+    def set_request_profiler(self, request_profiler: RequestProfiler):
+        """Set request profiler (dependency injection)"""
+        self.request_profiler = request_profiler
+
+    @require_auth_token
+    def get(self):
+        """Get the current profiling settings"""
+        return self.request_profiler.status(), 200
+
+    @require_auth_token
+    def put(self):
+        """Change the profiling sample rate, for requests signed with PROFILING_SECRET
+
+        Bearer tokens are handed out by the unauthenticated ``POST /token``, so
+        they are not enough to turn profiling on for everyone's requests.
+        """
+        if not self.request_profiler.is_signed_request():
+            return {'error': 'Changing the sample rate requires a signed X-Profile-Request header'}, 403
+
+        json_data = request.get_json(silent=True) or {}
+        sample_rate = json_data.get('sample_rate')
+        if isinstance(sample_rate, bool) or not isinstance(sample_rate, (int, float)) or not 0 <= sample_rate <= 1:
+            return {'error': 'sample_rate must be a number between 0 and 1'}, 400
+
+        self.request_profiler.set_sample_rate(float(sample_rate))
+        return self.request_profiler.status(), 200
@@ -7,6 +7,7 @@ class HealthStatusSchema(Schema):
     status = fields.Str()
     message = fields.Str()
     timestamp = fields.DateTime()
+    details = fields.Dict()
 
 
 class BlacklistRequestSchema(Schema):
@@ -38,8 +39,70 @@ class BlacklistCheckResponseSchema(Schema):
     fecha_creacion = fields.Str()
 
 
+class BlacklistExportQuerySchema(Schema):
+    """Schema for blacklist export query parameters"""
+
+    format = fields.Str(load_default="ndjson", validate=validate.OneOf(["ndjson", "csv"]))
+    app_uuid = fields.Str(validate=validate.Length(min=1, max=36))
+    created_from = fields.DateTime()
+    created_to = fields.DateTime()
+
+
+class BlacklistBulkCheckRequestSchema(Schema):
+    """Schema for bulk blacklist check request"""
+
+    emails = fields.List(
+        fields.Email(validate=validate.Length(min=1, max=255)),
+        required=True,
+        validate=validate.Length(min=1)
+    )
+
+
+class BlacklistBulkCheckResponseSchema(Schema):
+    """Schema for bulk blacklist check response"""
+
+    count = fields.Int(required=True)
+    lookup_ms = fields.Float(required=True)
+    results = fields.List(fields.Nested(BlacklistCheckResponseSchema))
+
+
+class BlacklistBatchItemResultSchema(Schema):
+    """Schema for the outcome of a single batch item"""
+
+    index = fields.Int(required=True)
+    email = fields.Str(allow_none=True)
+    status = fields.Str(required=True)
+    fecha_creacion = fields.Str(allow_none=True)
+    details = fields.Dict()
+
+
+class BlacklistBatchResponseSchema(Schema):
+    """Schema for batch blacklist creation response"""
+
+    total = fields.Int(required=True)
+    created = fields.Int(required=True)
+    duplicates = fields.Int(required=True)
+    invalid = fields.Int(required=True)
+    results = fields.List(fields.Nested(BlacklistBatchItemResultSchema))
+
+
+class BlacklistIngestResponseSchema(Schema):
+    """Schema for write-behind ingest responses and status lookups"""
+
+    tracking_id = fields.Str(required=True)
+    status = fields.Str(required=True)
+    email = fields.Str()
+    fecha_creacion = fields.Str(allow_none=True)
+
+
 # Schema instances
 health_status_schema = HealthStatusSchema()
 blacklist_request_schema = BlacklistRequestSchema()
 blacklist_response_schema = BlacklistResponseSchema()
 blacklist_check_response_schema = BlacklistCheckResponseSchema()
+blacklist_export_query_schema = BlacklistExportQuerySchema()
+blacklist_bulk_check_request_schema = BlacklistBulkCheckRequestSchema()
+blacklist_bulk_check_response_schema = BlacklistBulkCheckResponseSchema()
+blacklist_batch_request_schema = BlacklistRequestSchema(many=True)
+blacklist_batch_response_schema = BlacklistBatchResponseSchema()
+blacklist_ingest_response_schema = BlacklistIngestResponseSchema()
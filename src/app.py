@@ -1,37 +1,34 @@
 from flask import Flask, jsonify
 from flask_restful import Api
 from flask_jwt_extended import JWTManager
-from flask_jwt_extended.exceptions import (
-    NoAuthorizationError,
-    InvalidHeaderError,
-    JWTDecodeError,
-    CSRFError,
-    WrongTokenError,
-)
-from jwt.exceptions import (
-    InvalidSignatureError,
-    ExpiredSignatureError,
-    DecodeError,
-    InvalidTokenError,
-)
+from jwt.exceptions import InvalidSignatureError
 from .config import config
 from .infrastructure.models import db
+from .infrastructure.pool_metrics import instrument_engine_options
+from .infrastructure.metrics import init_request_metrics, record_jwt_failure
 from .container import DIContainer
+from .adapters.content_negotiation import init_content_negotiation
+from .utils.jwt_utils import jwt_error_body
 
 
 def create_app(config_name="default"):
     """Application factory pattern with hexagonal architecture"""
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    # Lets helper processes started from the app (see gunicorn.conf.py) load the same configuration
+    app.config["CONFIG_NAME"] = config_name
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = instrument_engine_options(app.config.get("SQLALCHEMY_ENGINE_OPTIONS"))
 
     # Initialize extensions
     db.init_app(app)
     jwt = JWTManager(app)
+    init_request_metrics(app)
 
     # JWT Error Handlers - These handle flask-jwt-extended managed errors
     @jwt.invalid_token_loader
     def invalid_token_callback(error_string):
         """Handle invalid token errors"""
+        record_jwt_failure("invalid_token")
         return jsonify({
             'error': 'Invalid identity',
             'message': error_string
@@ -40,6 +37,7 @@ def create_app(config_name="default"):
     @jwt.unauthorized_loader
     def missing_token_callback(error_string):
         """Handle missing token errors"""
+        record_jwt_failure("missing_token")
         return jsonify({
             'error': 'Invalid identity',
             'message': 'Authorization token is missing'
@@ -48,6 +46,7 @@ def create_app(config_name="default"):
     @jwt.expired_token_loader
     def expired_token_callback(jwt_header, jwt_payload):
         """Handle expired token errors"""
+        record_jwt_failure("expired")
         return jsonify({
             'error': 'Invalid identity',
             'message': 'Token has expired'
@@ -56,46 +55,34 @@ def create_app(config_name="default"):
     @jwt.revoked_token_loader
     def revoked_token_callback(jwt_header, jwt_payload):
         """Handle revoked token errors"""
+        record_jwt_failure("revoked")
         return jsonify({
             'error': 'Invalid identity',
             'message': 'Token has been revoked'
         }), 401
 
     # Initialize dependency injection container
-    container = DIContainer()
+    container = DIContainer(app.config)
+
+    # Opt-in request profiling (no-op unless sampled or signed)
+    container.get_service("request_profiler").init_app(app)
+
+    # Opt-in concurrency limits in front of the blacklist endpoints
+    admission_controller = container.get_service("admission_controller")
+    if admission_controller is not None:
+        admission_controller.init_app(app)
 
     # Initialize Flask-RESTful API with custom error handler
     api = Api(app, catch_all_404s=True)
+    init_content_negotiation(app, api)
 
     # Override Flask-RESTful's error handler to catch JWT exceptions
     def custom_error_handler(error):
         """Custom error handler for Flask-RESTful that catches JWT exceptions"""
-        # Handle PyJWT exceptions (signature verification, etc.)
-        if isinstance(error, (InvalidSignatureError, DecodeError, InvalidTokenError)):
-            return jsonify({
-                'error': 'Invalid identity',
-                'message': 'Token signature verification failed'
-            }), 401
-        
-        # Handle expired tokens
-        if isinstance(error, ExpiredSignatureError):
-            return jsonify({
-                'error': 'Invalid identity',
-                'message': 'Token has expired'
-            }), 401
-        
-        # Handle flask-jwt-extended exceptions
-        if isinstance(error, (NoAuthorizationError, InvalidHeaderError, JWTDecodeError)):
-            return jsonify({
-                'error': 'Invalid identity',
-                'message': str(error)
-            }), 401
-        
-        if isinstance(error, (CSRFError, WrongTokenError)):
-            return jsonify({
-                'error': 'Invalid identity',
-                'message': 'Token validation failed'
-            }), 401
+        # Handle PyJWT and flask-jwt-extended exceptions (signature verification, expiry, headers, etc.)
+        body = jwt_error_body(error)
+        if body is not None:
+            return jsonify(body), 401
         
         # Log other exceptions
         app.logger.error(f"Unhandled exception: {str(error)}", exc_info=True)
@@ -118,6 +105,7 @@ def create_app(config_name="default"):
     # Also register Flask error handlers as backup
     @app.errorhandler(InvalidSignatureError)
     def handle_invalid_signature(e):
+        record_jwt_failure("invalid_signature")
         return jsonify({
             'error': 'Invalid identity',
             'message': 'Token signature verification failed'
@@ -131,9 +119,16 @@ def create_app(config_name="default"):
     # Add API resources with dependency injection
     api.add_resource(container.get_ping_controller(), "/ping")
     api.add_resource(container.get_health_controller(), "/health")
+    api.add_resource(container.get_liveness_controller(), "/health/live")
+    api.add_resource(container.get_readiness_controller(), "/health/ready")
+    api.add_resource(container.get_metrics_controller(), "/metrics")
+    api.add_resource(container.get_profiling_controller(), "/admin/profiling")
     
     # Add blacklist endpoints
     api.add_resource(container.get_blacklist_controller(), "/blacklists")
+    api.add_resource(container.get_blacklist_batch_controller(), "/blacklists/batch")
+    api.add_resource(container.get_blacklist_bulk_check_controller(), "/blacklists/check")
+    api.add_resource(container.get_blacklist_ingest_status_controller(), "/blacklists/ingest/<string:tracking_id>")
     api.add_resource(container.get_blacklist_check_controller(), "/blacklists/<string:email>")
 
     # Add token endpoint
@@ -142,13 +137,13 @@ def create_app(config_name="default"):
     # Store container in app context for access in controllers
     app.container = container
 
-    # Create database tables
-    with app.app_context():
-        db.create_all()
-
     return app
 
 
 if __name__ == "__main__":
+    from .infrastructure.migrations import upgrade
+
     app = create_app("development")
+    with app.app_context():
+        upgrade()
     app.run(debug=True, host="0.0.0.0", port=5000)
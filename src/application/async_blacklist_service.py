@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import Optional, Dict, Any
+from ..domain.entities import Blacklist, HealthStatus
+from ..domain.ports import AsyncBlacklistRepositoryPort
+from .blacklist_service import BlacklistService
+
+
+class AsyncBlacklistService:
+    """Asynchronous application service for blacklist operations
+
+    Mirrors BlacklistService for the ASGI serving mode. The client IP is passed
+    in explicitly because there is no Flask request context here.
+    """
+
+    def __init__(self, blacklist_repository: AsyncBlacklistRepositoryPort):
+        self.blacklist_repository = blacklist_repository
+
+    async def add_email_to_blacklist(
+        self, email: str, app_uuid: str, blocked_reason: str, client_ip: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Add an email to the blacklist"""
+
+        blacklist = Blacklist(
+            email=email,
+            app_uuid=app_uuid,
+            blocked_reason=blocked_reason,
+            ip=client_ip
+        )
+
+        success = await self.blacklist_repository.add_email_to_blacklist(blacklist)
+
+        return BlacklistService._build_add_result(blacklist, success)
+
+    async def check_email_blacklist_status(self, email: str) -> Dict[str, Any]:
+        """Check if an email is in the blacklist"""
+
+        blacklist_entry = await self.blacklist_repository.is_email_blacklisted(email)
+
+        return BlacklistService._build_check_result(email, blacklist_entry)
+
+    async def get_health_status(self) -> HealthStatus:
+        """Get overall health status of the application"""
+        try:
+            if await self.blacklist_repository.check_database_health():
+                return HealthStatus(
+                    status="healthy", message="All systems operational", timestamp=datetime.utcnow()
+                )
+            return HealthStatus(
+                status="unhealthy", message="Some systems are down", timestamp=datetime.utcnow()
+            )
+        except Exception as e:
+            return HealthStatus(
+                status="error",
+                message=f"Health check failed: {str(e)}",
+                timestamp=datetime.utcnow(),
+            )
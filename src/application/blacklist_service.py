@@ -1,14 +1,27 @@
-from typing import Optional, Dict, Any
-from flask import request
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterator
 from ..domain.entities import Blacklist
-from ..domain.ports import BlacklistRepositoryPort
+from ..domain.ports import BlacklistRepositoryPort, BlacklistIngestQueuePort, BlacklistVersionPort
+from ..utils.request_utils import get_client_ip
 
 
 class BlacklistService:
     """Application service for blacklist operations"""
 
-    def __init__(self, blacklist_repository: BlacklistRepositoryPort):
+    def __init__(
+        self,
+        blacklist_repository: BlacklistRepositoryPort,
+        ingest_queue: Optional[BlacklistIngestQueuePort] = None,
+        list_version: Optional[BlacklistVersionPort] = None,
+    ):
         self.blacklist_repository = blacklist_repository
+        self.ingest_queue = ingest_queue
+        self.list_version = list_version
+
+    @property
+    def write_behind_enabled(self) -> bool:
+        """Whether single inserts are queued for background writes"""
+        return self.ingest_queue is not None
 
     def add_email_to_blacklist(
         self, email: str, app_uuid: str, blocked_reason: str
@@ -29,24 +42,121 @@ class BlacklistService:
         # Try to add to blacklist
         success = self.blacklist_repository.add_email_to_blacklist(blacklist)
         
+        return self._build_add_result(blacklist, success)
+
+    def enqueue_email_to_blacklist(
+        self, email: str, app_uuid: str, blocked_reason: str
+    ) -> Optional[Dict[str, Any]]:
+        """Queue an email for the write-behind flusher, returning None when the queue is full"""
+
+        blacklist = Blacklist(
+            email=email,
+            app_uuid=app_uuid,
+            blocked_reason=blocked_reason,
+            ip=self._get_client_ip()
+        )
+
+        tracking_id = self.ingest_queue.enqueue(blacklist)
+        if tracking_id is None:
+            return None
+
+        return {
+            "tracking_id": tracking_id,
+            "status": "pending",
+            "email": blacklist.email,
+            "fecha_creacion": blacklist.created_at.isoformat()
+        }
+
+    def get_ingest_status(self, tracking_id: str) -> Optional[Dict[str, Any]]:
+        """Return the status of a queued insert, or None for an unknown tracking id"""
+        if self.ingest_queue is None:
+            return None
+        return self.ingest_queue.get_status(tracking_id)
+
+    def add_emails_to_blacklist(self, entries: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Add several emails to the blacklist in one transaction"""
+
+        client_ip = self._get_client_ip()
+
+        blacklists = [
+            Blacklist(
+                email=entry["email"],
+                app_uuid=entry["app_uuid"],
+                blocked_reason=entry["blocked_reason"],
+                ip=client_ip
+            )
+            for entry in entries
+        ]
+
+        created = self.blacklist_repository.add_emails_to_blacklist(blacklists)
+
+        return [
+            {
+                "email": blacklist.email,
+                "status": "created" if was_created else "duplicate",
+                "fecha_creacion": blacklist.created_at.isoformat() if was_created else None
+            }
+            for blacklist, was_created in zip(blacklists, created)
+        ]
+
+    def check_email_blacklist_status(self, email: str) -> Dict[str, Any]:
+        """Check if an email is in the blacklist"""
+        
+        blacklist_entry = self.blacklist_repository.is_email_blacklisted(email)
+        
+        return self._build_check_result(email, blacklist_entry)
+
+    def get_list_version(self) -> Optional[int]:
+        """Version "not blacklisted" answers can be tagged with, or None when they cannot be versioned"""
+        if self.list_version is None:
+            return None
+        return self.list_version.current()
+
+    def check_emails_blacklist_status(self, emails: List[str]) -> List[Dict[str, Any]]:
+        """Check several emails with a single repository lookup, keeping input order"""
+
+        blacklist_entries = self.blacklist_repository.get_blacklisted_emails(emails)
+
+        return [self._build_check_result(email, blacklist_entries.get(email)) for email in emails]
+
+    def export_blacklist(
+        self,
+        app_uuid: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        page_size: int = 1000,
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream blacklist entries matching the filters"""
+
+        for blacklist_entry in self.blacklist_repository.iter_blacklist(
+            app_uuid=app_uuid, created_from=created_from, created_to=created_to, page_size=page_size
+        ):
+            yield {
+                "email": blacklist_entry.email,
+                "app_uuid": blacklist_entry.app_uuid,
+                "blocked_reason": blacklist_entry.blocked_reason,
+                "fecha_creacion": blacklist_entry.created_at.isoformat()
+            }
+
+    @staticmethod
+    def _build_add_result(blacklist: Blacklist, success: bool) -> Dict[str, Any]:
+        """Build the add response for a blacklist entity"""
         if success:
             return {
-                "mensaje": f"Email {email} agregado a la lista negra",
-                "email": email,
-                "app_uuid": app_uuid,
-                "blocked_reason": blocked_reason,
+                "mensaje": f"Email {blacklist.email} agregado a la lista negra",
+                "email": blacklist.email,
+                "app_uuid": blacklist.app_uuid,
+                "blocked_reason": blacklist.blocked_reason,
                 "fecha_creacion": blacklist.created_at.isoformat()
             }
         else:
             return {
-                "error": f"Email {email} ya existe en la lista negra"
+                "error": f"Email {blacklist.email} ya existe en la lista negra"
             }
 
-    def check_email_blacklist_status(self, email: str) -> Dict[str, Any]:
-        """Check if an email is in the blacklist"""
-        
-        blacklist_entry = self.blacklist_repository.is_email_blacklisted(email)
-        
+    @staticmethod
+    def _build_check_result(email: str, blacklist_entry: Optional[Blacklist]) -> Dict[str, Any]:
+        """Build the check response for an email and its blacklist entry"""
         if blacklist_entry:
             return {
                 "blacklisted": True,
@@ -63,10 +173,4 @@ class BlacklistService:
 
     def _get_client_ip(self) -> Optional[str]:
         """Get client IP address from request"""
-        # Check if running behind a proxy
-        if request.environ.get('HTTP_X_FORWARDED_FOR'):
-            return request.environ['HTTP_X_FORWARDED_FOR'].split(',')[0].strip()
-        elif request.environ.get('HTTP_X_REAL_IP'):
-            return request.environ['HTTP_X_REAL_IP']
-        else:
-            return request.environ.get('REMOTE_ADDR')
\ No newline at end of file
+        return get_client_ip()
\ No newline at end of file
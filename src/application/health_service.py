@@ -15,13 +15,21 @@ class HealthService:
             db_healthy = self._health_check_port.check_database_health()
             services_healthy = self._health_check_port.check_external_services_health()
 
+            details = {"database_pool": self._health_check_port.get_database_pool_status()}
+
             if db_healthy and services_healthy:
                 return HealthStatus(
-                    status="healthy", message="All systems operational", timestamp=datetime.utcnow()
+                    status="healthy",
+                    message="All systems operational",
+                    timestamp=datetime.utcnow(),
+                    details=details,
                 )
             else:
                 return HealthStatus(
-                    status="unhealthy", message="Some systems are down", timestamp=datetime.utcnow()
+                    status="unhealthy",
+                    message="Some systems are down",
+                    timestamp=datetime.utcnow(),
+                    details=details,
                 )
         except Exception as e:
             return HealthStatus(
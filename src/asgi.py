@@ -0,0 +1,47 @@
+import logging
+from flask import Flask
+from flask_jwt_extended import JWTManager
+from .config import config
+from .adapters.asgi_app import BlacklistASGIApp
+from .application.async_blacklist_service import AsyncBlacklistService
+from .domain.canonical_email import email_canonicalizer
+from .infrastructure.async_repositories import AsyncBlacklistRepository, create_async_engine_from_config
+from .utils.jwt_utils import VerifiedTokenCache
+
+logger = logging.getLogger(__name__)
+
+# Settings of the WSGI application's lookup path that the async mode does not implement
+WSGI_ONLY_SETTINGS = {
+    "BLACKLIST_REPOSITORY_MODE": "database",
+    "BLACKLIST_CACHE_ENABLED": False,
+    "BLACKLIST_BLOOM_FILTER_ENABLED": False,
+    "BLACKLIST_WRITE_BEHIND_ENABLED": False,
+    "ADMISSION_CONTROL_ENABLED": False,
+}
+
+
+def create_asgi_app(config_name="default"):
+    """Application factory for the optional async (ASGI) serving mode"""
+    # Only used for its JWT settings and request contexts, so tokens follow the WSGI application's rules
+    auth_app = Flask(__name__)
+    auth_app.config.from_object(config[config_name])
+    JWTManager(auth_app)
+    app_config = auth_app.config
+
+    for key, default in WSGI_ONLY_SETTINGS.items():
+        if app_config.get(key, default) != default:
+            logger.warning("%s is not supported in async serving mode; lookups go to the database", key)
+
+    engine = create_async_engine_from_config(app_config)
+    blacklist_repository = AsyncBlacklistRepository(
+        engine,
+        canonicalize=email_canonicalizer(app_config),
+        lookup_key=app_config.get("BLACKLIST_LOOKUP_KEY", "canonical"),
+    )
+    blacklist_service = AsyncBlacklistService(blacklist_repository)
+
+    token_cache = None
+    if app_config.get("JWT_VERIFIED_CACHE_ENABLED", False):
+        token_cache = VerifiedTokenCache(max_size=app_config.get("JWT_VERIFIED_CACHE_MAX_SIZE", 1024))
+
+    return BlacklistASGIApp(blacklist_service, auth_app, blacklist_repository, token_cache)
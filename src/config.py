@@ -1,19 +1,135 @@
 import os
 
 
+def _engine_options(pool_size: int, max_overflow: int) -> dict:
+    """SQLAlchemy engine options, overridable through environment variables"""
+    return {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", pool_size)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", max_overflow)),
+        "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true",
+    }
+
+
 class Config:
     """Base configuration"""
 
     SECRET_KEY = os.environ.get("SECRET_KEY") or "dev-secret-key-change-in-production"
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL") or "sqlite:///app.db"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Read replicas (comma-separated URLs), registered as the replica_<n> binds
+    DATABASE_READ_URLS = [url.strip() for url in os.environ.get("DATABASE_READ_URL", "").split(",") if url.strip()]
+    SQLALCHEMY_BINDS = {f"replica_{index}": url for index, url in enumerate(DATABASE_READ_URLS)}
+    DATABASE_READ_YOUR_WRITES_WINDOW = float(os.environ.get("DATABASE_READ_YOUR_WRITES_WINDOW", "5"))
+    DATABASE_REPLICA_RETRY_INTERVAL = float(os.environ.get("DATABASE_REPLICA_RETRY_INTERVAL", "30"))
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(pool_size=5, max_overflow=10)
     JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY") or "jwt-secret-key-change-in-production"
+    JWT_VERIFIED_CACHE_ENABLED = os.environ.get("JWT_VERIFIED_CACHE_ENABLED", "true").lower() == "true"
+    JWT_VERIFIED_CACHE_MAX_SIZE = int(os.environ.get("JWT_VERIFIED_CACHE_MAX_SIZE", "1024"))
+
+    # Health probes
+    HEALTH_REFRESH_INTERVAL = float(os.environ.get("HEALTH_REFRESH_INTERVAL", "5"))
+    HEALTH_MAX_STALENESS = float(os.environ["HEALTH_MAX_STALENESS"]) if os.environ.get("HEALTH_MAX_STALENESS") else None
+    HEALTH_PROBE_TIMEOUT_MS = int(os.environ.get("HEALTH_PROBE_TIMEOUT_MS", "1000"))
+
+    # Async (ASGI) serving mode
+    ASYNC_DATABASE_URL = os.environ.get("ASYNC_DATABASE_URL")
+    ASYNC_DB_POOL_SIZE = int(os.environ.get("ASYNC_DB_POOL_SIZE", "10"))
+    ASYNC_DB_MAX_OVERFLOW = int(os.environ.get("ASYNC_DB_MAX_OVERFLOW", "10"))
+
+    # Request profiling
+    PROFILING_DIR = os.environ.get("PROFILING_DIR") or "/tmp/blacklist-profiles"
+    PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", "0"))
+    PROFILING_MAX_BYTES = int(os.environ.get("PROFILING_MAX_BYTES", str(100 * 1024 * 1024)))
+    PROFILING_SECRET = os.environ.get("PROFILING_SECRET")
+    PROFILING_CONTROL_FILE = os.environ.get("PROFILING_CONTROL_FILE") or os.path.join(PROFILING_DIR, "control.json")
+
+    # Email canonicalization (Gmail dots/plus tags folded when enabled)
+    BLACKLIST_EMAIL_PROVIDER_NORMALIZATION = (
+        os.environ.get("BLACKLIST_EMAIL_PROVIDER_NORMALIZATION", "false").lower() == "true"
+    )
+
+    # Lookup key: "canonical" (varchar index) or "digest" (16-byte BLAKE2b index)
+    BLACKLIST_LOOKUP_KEY = os.environ.get("BLACKLIST_LOOKUP_KEY", "canonical").lower()
+
+    # Batch inserts
+    BLACKLIST_BATCH_MAX_ITEMS = int(os.environ.get("BLACKLIST_BATCH_MAX_ITEMS", "10000"))
+    BLACKLIST_BATCH_CHUNK_SIZE = int(os.environ.get("BLACKLIST_BATCH_CHUNK_SIZE", "500"))
+
+    # Bulk checks
+    BLACKLIST_CHECK_MAX_EMAILS = int(os.environ.get("BLACKLIST_CHECK_MAX_EMAILS", "1000"))
+    BLACKLIST_CHECK_CHUNK_SIZE = int(os.environ.get("BLACKLIST_CHECK_CHUNK_SIZE", "500"))
+
+    # Admission control of the blacklist endpoints (per worker). ADMISSION_MODE "aimd" adapts the
+    # limits to request latency, from ADMISSION_MIN_LIMIT up to the configured limits
+    ADMISSION_CONTROL_ENABLED = os.environ.get("ADMISSION_CONTROL_ENABLED", "false").lower() == "true"
+    ADMISSION_MODE = os.environ.get("ADMISSION_MODE", "fixed").lower()
+    ADMISSION_READ_LIMIT = int(os.environ.get("ADMISSION_READ_LIMIT", "8"))
+    ADMISSION_WRITE_LIMIT = int(os.environ.get("ADMISSION_WRITE_LIMIT", "4"))
+    ADMISSION_READ_QUEUE = int(os.environ.get("ADMISSION_READ_QUEUE", "8"))
+    ADMISSION_WRITE_QUEUE = int(os.environ.get("ADMISSION_WRITE_QUEUE", "4"))
+    ADMISSION_EXPORT_LIMIT = int(os.environ.get("ADMISSION_EXPORT_LIMIT", "2"))
+    ADMISSION_EXPORT_QUEUE = int(os.environ.get("ADMISSION_EXPORT_QUEUE", "0"))
+    ADMISSION_QUEUE_TIMEOUT = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", "0.5"))
+    ADMISSION_MIN_LIMIT = int(os.environ.get("ADMISSION_MIN_LIMIT", "1"))
+    ADMISSION_LATENCY_TARGET = float(os.environ.get("ADMISSION_LATENCY_TARGET", "0.25"))
+    ADMISSION_RETRY_AFTER = int(os.environ.get("ADMISSION_RETRY_AFTER", "1"))
+
+    # Response compression of the blacklist endpoints (zstd needs the zstandard package)
+    RESPONSE_COMPRESSION_ENABLED = os.environ.get("RESPONSE_COMPRESSION_ENABLED", "true").lower() == "true"
+    RESPONSE_COMPRESSION_MIN_SIZE = int(os.environ.get("RESPONSE_COMPRESSION_MIN_SIZE", "1024"))
+    RESPONSE_COMPRESSION_GZIP_LEVEL = int(os.environ.get("RESPONSE_COMPRESSION_GZIP_LEVEL", "6"))
+    RESPONSE_COMPRESSION_ZSTD_LEVEL = int(os.environ.get("RESPONSE_COMPRESSION_ZSTD_LEVEL", "3"))
+
+    # HTTP caching of single checks: Cache-Control max-age, and how often the list version behind
+    # the ETag of "not blacklisted" answers is re-read from the database
+    BLACKLIST_CHECK_CACHE_MAX_AGE = int(os.environ.get("BLACKLIST_CHECK_CACHE_MAX_AGE", "0"))
+    BLACKLIST_LIST_VERSION_REFRESH_INTERVAL = float(os.environ.get("BLACKLIST_LIST_VERSION_REFRESH_INTERVAL", "1"))
+
+    # Streaming export
+    BLACKLIST_EXPORT_PAGE_SIZE = int(os.environ.get("BLACKLIST_EXPORT_PAGE_SIZE", "1000"))
+
+    # Repository mode: "database", "memory" (whole table kept in each worker, synced by polling)
+    # or "shared" (digest table file mapped by every worker, see shared_digest_table.py)
+    BLACKLIST_REPOSITORY_MODE = os.environ.get("BLACKLIST_REPOSITORY_MODE", "database").lower()
+    BLACKLIST_MEMORY_POLL_INTERVAL = float(os.environ.get("BLACKLIST_MEMORY_POLL_INTERVAL", "1"))
+    BLACKLIST_MEMORY_MAX_STALENESS = float(os.environ.get("BLACKLIST_MEMORY_MAX_STALENESS", "30"))
+    BLACKLIST_MEMORY_BATCH_SIZE = int(os.environ.get("BLACKLIST_MEMORY_BATCH_SIZE", "10000"))
+    BLACKLIST_MEMORY_RESCAN_IDS = int(os.environ.get("BLACKLIST_MEMORY_RESCAN_IDS", "1000"))
+    BLACKLIST_MEMORY_RECONCILE_INTERVAL = float(os.environ.get("BLACKLIST_MEMORY_RECONCILE_INTERVAL", "60"))
+    BLACKLIST_SHARED_TABLE_PATH = os.environ.get("BLACKLIST_SHARED_TABLE_PATH", "/tmp/blacklist-digests.bin")
+    BLACKLIST_SHARED_TABLE_REBUILD_INTERVAL = float(os.environ.get("BLACKLIST_SHARED_TABLE_REBUILD_INTERVAL", "300"))
+    BLACKLIST_SHARED_TABLE_POLL_INTERVAL = float(os.environ.get("BLACKLIST_SHARED_TABLE_POLL_INTERVAL", "1"))
+    BLACKLIST_SHARED_TABLE_MAX_STALENESS = float(os.environ.get("BLACKLIST_SHARED_TABLE_MAX_STALENESS", "30"))
+
+    # Blacklist lookup cache
+    BLACKLIST_CACHE_ENABLED = os.environ.get("BLACKLIST_CACHE_ENABLED", "false").lower() == "true"
+    BLACKLIST_CACHE_MAX_SIZE = int(os.environ.get("BLACKLIST_CACHE_MAX_SIZE", "10000"))
+    BLACKLIST_CACHE_POSITIVE_TTL = float(os.environ.get("BLACKLIST_CACHE_POSITIVE_TTL", "300"))
+    BLACKLIST_CACHE_NEGATIVE_TTL = float(os.environ.get("BLACKLIST_CACHE_NEGATIVE_TTL", "30"))
+
+    # Bloom filter short-circuit for definite misses
+    BLACKLIST_BLOOM_FILTER_ENABLED = os.environ.get("BLACKLIST_BLOOM_FILTER_ENABLED", "false").lower() == "true"
+    BLACKLIST_BLOOM_FILTER_FALSE_POSITIVE_RATE = float(
+        os.environ.get("BLACKLIST_BLOOM_FILTER_FALSE_POSITIVE_RATE", "0.01")
+    )
+    BLACKLIST_BLOOM_FILTER_REBUILD_INTERVAL = float(os.environ.get("BLACKLIST_BLOOM_FILTER_REBUILD_INTERVAL", "300"))
+    BLACKLIST_BLOOM_FILTER_MIN_CAPACITY = int(os.environ.get("BLACKLIST_BLOOM_FILTER_MIN_CAPACITY", "100000"))
+
+    # Write-behind ingest: POST /blacklists answers 202 and a background thread batches the inserts
+    BLACKLIST_WRITE_BEHIND_ENABLED = os.environ.get("BLACKLIST_WRITE_BEHIND_ENABLED", "false").lower() == "true"
+    BLACKLIST_WRITE_BEHIND_MAX_QUEUE = int(os.environ.get("BLACKLIST_WRITE_BEHIND_MAX_QUEUE", "10000"))
+    BLACKLIST_WRITE_BEHIND_BATCH_SIZE = int(os.environ.get("BLACKLIST_WRITE_BEHIND_BATCH_SIZE", "500"))
+    BLACKLIST_WRITE_BEHIND_FLUSH_INTERVAL = float(os.environ.get("BLACKLIST_WRITE_BEHIND_FLUSH_INTERVAL", "0.05"))
+    BLACKLIST_WRITE_BEHIND_STATUS_RETENTION = int(os.environ.get("BLACKLIST_WRITE_BEHIND_STATUS_RETENTION", "100000"))
 
 
 class DevelopmentConfig(Config):
     """Development configuration"""
 
     DEBUG = True
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(pool_size=2, max_overflow=5)
 
 
 class TestingConfig(Config):
@@ -21,13 +137,20 @@ class TestingConfig(Config):
 
     TESTING = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    # In-memory SQLite uses a StaticPool, which takes no sizing options
+    SQLALCHEMY_ENGINE_OPTIONS = {"pool_pre_ping": True}
     WTF_CSRF_ENABLED = False
+    BLACKLIST_BLOOM_FILTER_ENABLED = False
+    PROFILING_CONTROL_FILE = None
+    # Probe on every /health call instead of from a background thread
+    HEALTH_REFRESH_INTERVAL = 0
 
 
 class ProductionConfig(Config):
     """Production configuration"""
 
     DEBUG = False
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(pool_size=10, max_overflow=10)
 
 
 config = {
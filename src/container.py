@@ -1,34 +1,217 @@
 from src.application.health_service import HealthService
 from src.application.blacklist_service import BlacklistService
+from src.domain.canonical_email import email_canonicalizer
 from src.infrastructure.health_check import SQLAlchemyHealthCheck
 from src.infrastructure.repositories import BlacklistRepository
-from src.adapters.health_controller import HealthController, PingController
-from src.adapters.blacklist_controller import BlacklistController, BlacklistCheckController, TokenController
+from src.infrastructure.cached_repository import CachedBlacklistRepository
+from src.infrastructure.bloom_filter import BloomFilterBlacklistRepository
+from src.infrastructure.memory_repository import InMemoryBlacklistRepository
+from src.infrastructure.shared_digest_table import SharedTableBlacklistRepository
+from src.infrastructure.health_refresher import HealthRefresher
+from src.infrastructure.list_version import BlacklistListVersion
+from src.infrastructure.write_behind import WriteBehindBlacklistRepository
+from src.infrastructure.read_routing import ReadReplicaRouter, replica_bind_keys
+from src.infrastructure.profiling import RequestProfiler
+from src.infrastructure.admission import AdmissionController, ConcurrencyLimiter
+from src.utils.jwt_utils import VerifiedTokenCache
+from src.adapters.health_controller import (
+    HealthController,
+    LivenessController,
+    PingController,
+    ReadinessController,
+)
+from src.adapters.metrics_controller import MetricsController
+from src.adapters.profiling_controller import ProfilingController
+from src.adapters.blacklist_controller import (
+    BlacklistController,
+    BlacklistBatchController,
+    BlacklistCheckController,
+    BlacklistBulkCheckController,
+    BlacklistIngestStatusController,
+    TokenController,
+)
 
 
 class DIContainer:
     """Dependency Injection Container"""
 
-    def __init__(self):
+    def __init__(self, config=None):
+        self._config = config or {}
         self._services = {}
         self._setup_services()
 
     def _setup_services(self):
         """Setup all service dependencies"""
         # Infrastructure layer
-        health_check = SQLAlchemyHealthCheck()
-        blacklist_repository = BlacklistRepository()
+        health_check = SQLAlchemyHealthCheck(
+            statement_timeout_ms=self._config.get("HEALTH_PROBE_TIMEOUT_MS", 1000),
+        )
+        canonicalize = email_canonicalizer(self._config)
+        read_router = None
+        bind_keys = replica_bind_keys(self._config.get("SQLALCHEMY_BINDS"))
+        if bind_keys:
+            read_router = ReadReplicaRouter(
+                bind_keys,
+                read_your_writes_window=self._config.get("DATABASE_READ_YOUR_WRITES_WINDOW", 5.0),
+                retry_interval=self._config.get("DATABASE_REPLICA_RETRY_INTERVAL", 30.0),
+            )
+        list_version = BlacklistListVersion(
+            refresh_interval=self._config.get("BLACKLIST_LIST_VERSION_REFRESH_INTERVAL", 1.0),
+        )
+        blacklist_repository = BlacklistRepository(
+            batch_chunk_size=self._config.get("BLACKLIST_BATCH_CHUNK_SIZE", 500),
+            lookup_chunk_size=self._config.get("BLACKLIST_CHECK_CHUNK_SIZE", 500),
+            canonicalize=canonicalize,
+            lookup_key=self._config.get("BLACKLIST_LOOKUP_KEY", "canonical"),
+            read_router=read_router,
+            list_version=list_version,
+        )
+        bloom_filter_repository = None
+        memory_repository = None
+        shared_table_repository = None
+        repository_mode = self._config.get("BLACKLIST_REPOSITORY_MODE", "database")
+        if repository_mode == "memory":
+            # Lookups never reach the database, so the bloom filter and cache would only add overhead
+            memory_repository = InMemoryBlacklistRepository(
+                blacklist_repository,
+                poll_interval=self._config.get("BLACKLIST_MEMORY_POLL_INTERVAL", 1.0),
+                max_staleness=self._config.get("BLACKLIST_MEMORY_MAX_STALENESS", 30.0),
+                batch_size=self._config.get("BLACKLIST_MEMORY_BATCH_SIZE", 10000),
+                rescan_ids=self._config.get("BLACKLIST_MEMORY_RESCAN_IDS", 1000),
+                reconcile_interval=self._config.get("BLACKLIST_MEMORY_RECONCILE_INTERVAL", 60.0),
+                canonicalize=canonicalize,
+            )
+            blacklist_repository = memory_repository
+        elif repository_mode == "shared":
+            # Misses never reach the database and hits need the row anyway, so no bloom filter or cache
+            shared_table_repository = SharedTableBlacklistRepository(
+                blacklist_repository,
+                self._config.get("BLACKLIST_SHARED_TABLE_PATH", "/tmp/blacklist-digests.bin"),
+                poll_interval=self._config.get("BLACKLIST_SHARED_TABLE_POLL_INTERVAL", 1.0),
+                max_staleness=self._config.get("BLACKLIST_SHARED_TABLE_MAX_STALENESS", 30.0),
+                batch_size=self._config.get("BLACKLIST_MEMORY_BATCH_SIZE", 10000),
+                rescan_ids=self._config.get("BLACKLIST_MEMORY_RESCAN_IDS", 1000),
+                reconcile_interval=self._config.get("BLACKLIST_MEMORY_RECONCILE_INTERVAL", 60.0),
+                canonicalize=canonicalize,
+            )
+            blacklist_repository = shared_table_repository
+        elif self._config.get("BLACKLIST_BLOOM_FILTER_ENABLED", False):
+            bloom_filter_repository = BloomFilterBlacklistRepository(
+                blacklist_repository,
+                false_positive_rate=self._config.get("BLACKLIST_BLOOM_FILTER_FALSE_POSITIVE_RATE", 0.01),
+                rebuild_interval=self._config.get("BLACKLIST_BLOOM_FILTER_REBUILD_INTERVAL", 300),
+                min_capacity=self._config.get("BLACKLIST_BLOOM_FILTER_MIN_CAPACITY", 100000),
+                canonicalize=canonicalize,
+            )
+            blacklist_repository = bloom_filter_repository
+        cached_repository = None
+        if repository_mode not in ("memory", "shared") and self._config.get("BLACKLIST_CACHE_ENABLED", False):
+            cached_repository = CachedBlacklistRepository(
+                blacklist_repository,
+                max_size=self._config.get("BLACKLIST_CACHE_MAX_SIZE", 10000),
+                positive_ttl=self._config.get("BLACKLIST_CACHE_POSITIVE_TTL", 300),
+                negative_ttl=self._config.get("BLACKLIST_CACHE_NEGATIVE_TTL", 30),
+                canonicalize=canonicalize,
+            )
+            blacklist_repository = cached_repository
+        write_behind_repository = None
+        if self._config.get("BLACKLIST_WRITE_BEHIND_ENABLED", False):
+            write_behind_repository = WriteBehindBlacklistRepository(
+                blacklist_repository,
+                self._config.get("SECRET_KEY"),
+                max_queue_size=self._config.get("BLACKLIST_WRITE_BEHIND_MAX_QUEUE", 10000),
+                batch_size=self._config.get("BLACKLIST_WRITE_BEHIND_BATCH_SIZE", 500),
+                flush_interval=self._config.get("BLACKLIST_WRITE_BEHIND_FLUSH_INTERVAL", 0.05),
+                status_retention=self._config.get("BLACKLIST_WRITE_BEHIND_STATUS_RETENTION", 100000),
+                canonicalize=canonicalize,
+            )
+            blacklist_repository = write_behind_repository
+
+        request_profiler = RequestProfiler(
+            output_dir=self._config.get("PROFILING_DIR", "/tmp/blacklist-profiles"),
+            sample_rate=self._config.get("PROFILING_SAMPLE_RATE", 0.0),
+            max_bytes=self._config.get("PROFILING_MAX_BYTES", 100 * 1024 * 1024),
+            secret=self._config.get("PROFILING_SECRET"),
+            control_file=self._config.get("PROFILING_CONTROL_FILE"),
+        )
+
+        admission_controller = None
+        if self._config.get("ADMISSION_CONTROL_ENABLED", False):
+            limiter_options = dict(
+                queue_timeout=self._config.get("ADMISSION_QUEUE_TIMEOUT", 0.5),
+                adaptive=self._config.get("ADMISSION_MODE", "fixed") == "aimd",
+                min_limit=self._config.get("ADMISSION_MIN_LIMIT", 1),
+                latency_target=self._config.get("ADMISSION_LATENCY_TARGET", 0.25),
+            )
+            admission_controller = AdmissionController(
+                ConcurrencyLimiter(
+                    "read",
+                    self._config.get("ADMISSION_READ_LIMIT", 8),
+                    max_queue=self._config.get("ADMISSION_READ_QUEUE", 8),
+                    **limiter_options,
+                ),
+                ConcurrencyLimiter(
+                    "write",
+                    self._config.get("ADMISSION_WRITE_LIMIT", 4),
+                    max_queue=self._config.get("ADMISSION_WRITE_QUEUE", 4),
+                    **limiter_options,
+                ),
+                # Exports hold their slot while they stream, so their limit is fixed
+                ConcurrencyLimiter(
+                    "export",
+                    self._config.get("ADMISSION_EXPORT_LIMIT", 2),
+                    max_queue=self._config.get("ADMISSION_EXPORT_QUEUE", 0),
+                    queue_timeout=limiter_options["queue_timeout"],
+                ),
+                retry_after=self._config.get("ADMISSION_RETRY_AFTER", 1),
+            )
+
+        verified_token_cache = None
+        if self._config.get("JWT_VERIFIED_CACHE_ENABLED", False):
+            verified_token_cache = VerifiedTokenCache(
+                max_size=self._config.get("JWT_VERIFIED_CACHE_MAX_SIZE", 1024),
+            )
 
         # Application layer
         health_service = HealthService(health_check)
-        blacklist_service = BlacklistService(blacklist_repository)
+        health_refresher = HealthRefresher(
+            health_service,
+            interval=self._config.get("HEALTH_REFRESH_INTERVAL", 5.0),
+            max_staleness=self._config.get("HEALTH_MAX_STALENESS"),
+        )
+        # "Not blacklisted" answers are only tagged with the list version when the
+        # lookup reads the primary: a replica, cache, bloom filter or in-memory copy
+        # can still miss rows counted by a version read after them, and entries
+        # pending in the write-behind queue are not counted by any version yet
+        lookups_from_primary = (
+            repository_mode == "database"
+            and bloom_filter_repository is None
+            and cached_repository is None
+            and read_router is None
+            and write_behind_repository is None
+        )
+        blacklist_service = BlacklistService(
+            blacklist_repository,
+            ingest_queue=write_behind_repository,
+            list_version=list_version if lookups_from_primary else None,
+        )
 
         # Store services for injection into controllers
         self._services = {
             "health_check": health_check,
             "health_service": health_service,
+            "health_refresher": health_refresher,
             "blacklist_repository": blacklist_repository,
+            "read_router": read_router,
+            "list_version": list_version,
+            "bloom_filter_repository": bloom_filter_repository,
+            "memory_repository": memory_repository,
+            "shared_table_repository": shared_table_repository,
+            "write_behind_repository": write_behind_repository,
             "blacklist_service": blacklist_service,
+            "request_profiler": request_profiler,
+            "admission_controller": admission_controller,
+            "verified_token_cache": verified_token_cache,
         }
 
     def get_service(self, name: str):
@@ -45,6 +228,10 @@ class DIContainer:
                 # Inject dependencies based on controller type
                 if hasattr(self, "set_health_service"):
                     self.set_health_service(container.get_service("health_service"))
+                if hasattr(self, "set_health_refresher"):
+                    self.set_health_refresher(container.get_service("health_refresher"))
+                if hasattr(self, "set_request_profiler"):
+                    self.set_request_profiler(container.get_service("request_profiler"))
 
         # Preserve the original class name for Flask-RESTful
         InjectedController.__name__ = controller_class.__name__
@@ -66,14 +253,35 @@ class DIContainer:
     def get_health_controller(self):
         return self.create_controller_class(HealthController)
 
+    def get_readiness_controller(self):
+        return self.create_controller_class(ReadinessController)
+
+    def get_liveness_controller(self):
+        return self.create_controller_class(LivenessController)
+
     def get_ping_controller(self):
         return self.create_controller_class(PingController)
 
+    def get_metrics_controller(self):
+        return self.create_controller_class(MetricsController)
+
+    def get_profiling_controller(self):
+        return self.create_controller_class(ProfilingController)
+
     def get_blacklist_controller(self):
         return self.create_blacklist_controller_class(BlacklistController)
 
+    def get_blacklist_batch_controller(self):
+        return self.create_blacklist_controller_class(BlacklistBatchController)
+
     def get_blacklist_check_controller(self):
         return self.create_blacklist_controller_class(BlacklistCheckController)
 
+    def get_blacklist_bulk_check_controller(self):
+        return self.create_blacklist_controller_class(BlacklistBulkCheckController)
+
+    def get_blacklist_ingest_status_controller(self):
+        return self.create_blacklist_controller_class(BlacklistIngestStatusController)
+
     def get_blacklist_token_controller(self):
         return self.create_blacklist_controller_class(TokenController)
\ No newline at end of file
@@ -0,0 +1,35 @@
+import hashlib
+from functools import partial
+from typing import Callable
+
+GMAIL_DOMAINS = frozenset({"gmail.com", "googlemail.com"})
+EMAIL_DIGEST_SIZE = 16
+
+
+def canonicalize_email(email: str, provider_rules: bool = False) -> str:
+    """Return the canonical form of an email used for lookups and uniqueness
+
+    Emails are trimmed and lowercased. With ``provider_rules`` enabled,
+    addresses at providers that ignore them also lose dots and ``+tag``
+    suffixes in the local part (Gmail, with googlemail.com folded into
+    gmail.com), so those aliases map to the same entry.
+    """
+    canonical = email.strip().lower()
+    if not provider_rules:
+        return canonical
+
+    local, separator, domain = canonical.rpartition("@")
+    if separator and domain in GMAIL_DOMAINS:
+        local = local.split("+", 1)[0].replace(".", "")
+        canonical = f"{local}@gmail.com"
+    return canonical
+
+
+def email_canonicalizer(config) -> Callable[[str], str]:
+    """Build the canonicalize function selected by the configuration"""
+    return partial(canonicalize_email, provider_rules=config.get("BLACKLIST_EMAIL_PROVIDER_NORMALIZATION", False))
+
+
+def email_digest(canonical_email: str) -> bytes:
+    """Fixed-width BLAKE2b digest of a canonical email, used as a compact lookup key"""
+    return hashlib.blake2b(canonical_email.encode("utf-8"), digest_size=EMAIL_DIGEST_SIZE).digest()
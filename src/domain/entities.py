@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict, Any
 
 
 @dataclass
@@ -10,6 +10,7 @@ class HealthStatus:
     status: str
     message: str
     timestamp: datetime
+    details: Optional[Dict[str, Any]] = None
 
     def __post_init__(self):
         if not hasattr(self, "timestamp") or self.timestamp is None:
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from datetime import datetime
+from typing import Optional, Iterator, List, Dict, Any
 from .entities import Blacklist
 
 
@@ -16,6 +17,11 @@ class HealthCheckPort(ABC):
         """Check if external services are healthy"""
         pass
 
+    @abstractmethod
+    def get_database_pool_status(self) -> Dict[str, Any]:
+        """Report connection pool usage (size, checked out, overflow, waits)"""
+        pass
+
 
 class BlacklistRepositoryPort(ABC):
     """Port for blacklist repository operations"""
@@ -25,7 +31,80 @@ class BlacklistRepositoryPort(ABC):
         """Add an email to the blacklist"""
         pass
 
+    @abstractmethod
+    def add_emails_to_blacklist(self, blacklists: List[Blacklist]) -> List[bool]:
+        """Add several emails in one transaction, returning whether each one was created"""
+        pass
+
     @abstractmethod
     def is_email_blacklisted(self, email: str) -> Optional[Blacklist]:
         """Check if an email is in the blacklist and return the blacklist entry"""
         pass
+
+    @abstractmethod
+    def get_blacklisted_emails(self, emails: List[str]) -> Dict[str, Blacklist]:
+        """Return the blacklist entries for the given emails that are blacklisted"""
+        pass
+
+    @abstractmethod
+    def iter_emails(self, batch_size: int = 5000) -> Iterator[str]:
+        """Iterate over the canonical form of every blacklisted email"""
+        pass
+
+    @abstractmethod
+    def count_rows(self) -> int:
+        """Number of emails ``iter_emails`` yields"""
+        pass
+
+    @abstractmethod
+    def iter_blacklist(
+        self,
+        app_uuid: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        page_size: int = 1000,
+    ) -> Iterator[Blacklist]:
+        """Iterate over blacklist entries in insertion order, optionally filtered"""
+        pass
+
+
+class BlacklistIngestQueuePort(ABC):
+    """Port for queued (write-behind) blacklist inserts"""
+
+    @abstractmethod
+    def enqueue(self, blacklist: Blacklist) -> Optional[str]:
+        """Queue an entry for a background write, returning a tracking id or None when full"""
+        pass
+
+    @abstractmethod
+    def get_status(self, tracking_id: str) -> Optional[Dict[str, Any]]:
+        """Return the status of a queued entry, or None for an unknown tracking id"""
+        pass
+
+
+class BlacklistVersionPort(ABC):
+    """Port for the version of the blacklist contents"""
+
+    @abstractmethod
+    def current(self) -> int:
+        """Return a version that grows whenever entries are added"""
+        pass
+
+
+class AsyncBlacklistRepositoryPort(ABC):
+    """Port for asynchronous blacklist repository operations"""
+
+    @abstractmethod
+    async def add_email_to_blacklist(self, blacklist: Blacklist) -> bool:
+        """Add an email to the blacklist"""
+        pass
+
+    @abstractmethod
+    async def is_email_blacklisted(self, email: str) -> Optional[Blacklist]:
+        """Check if an email is in the blacklist and return the blacklist entry"""
+        pass
+
+    @abstractmethod
+    async def check_database_health(self) -> bool:
+        """Check if database connection is healthy"""
+        pass
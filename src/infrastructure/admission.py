@@ -0,0 +1,206 @@
+"""
+Admission control for the blacklist endpoints
+
+When the database slows down, requests pile up inside the workers until the
+load balancer times them out. ``AdmissionController`` caps the blacklist
+requests each worker runs at once, with separate limits for reads (checks),
+exports and writes. A request over the limit waits in a short bounded queue
+for at most ``queue_timeout`` seconds; when the queue is full or the wait runs
+out it gets ``503`` with ``Retry-After`` straight away instead of adding to
+the pile. ``/ping``, ``/health`` and every other non-blacklist route bypass it.
+
+With ``adaptive=True`` each limit follows AIMD: it shrinks by
+``backoff_ratio`` (at most once per observed latency) whenever an admitted
+request takes longer than ``latency_target`` and grows by ``1 / limit`` per
+request that finishes in time while the limit is at least half used. The
+latency is the request's own service time up to the response being returned
+by the view, queue wait excluded, which in this service is database time and
+pool wait. Streamed responses keep their slot until the stream ends, but only
+the time to the first byte counts as latency. Exports (``GET /blacklists``)
+stream for as long as the client reads, so they take slots from their own
+fixed limiter and never shrink the read limit.
+
+Limits are per worker process. Under the ``gthread`` worker a request only
+reaches the limiter once a worker thread picks it up, so ``GUNICORN_THREADS``
+must exceed the limits for excess requests to be shed rather than queued in
+gunicorn.
+"""
+import threading
+import time
+from typing import Dict, Any, Optional
+from flask import g, jsonify, request
+from .metrics import record_admission_limit, record_admission_shed, record_admission_in_flight
+
+ADMISSION_PATH_PREFIX = "/blacklists"
+READ_ROUTES = ("/blacklists/check",)
+EXPORT_ROUTE = "/blacklists"
+
+
+class ConcurrencyLimiter:
+    """Thread-safe concurrency limit with a bounded FIFO wait queue"""
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        max_queue: int = 0,
+        queue_timeout: float = 0.5,
+        adaptive: bool = False,
+        min_limit: int = 1,
+        latency_target: float = 0.25,
+        backoff_ratio: float = 0.9,
+    ):
+        self.name = name
+        self._max_limit = max(1, limit)
+        self._min_limit = max(1, min(min_limit, self._max_limit))
+        self._limit = float(self._max_limit)
+        self._max_queue = max(0, max_queue)
+        self._queue_timeout = queue_timeout
+        self._adaptive = adaptive
+        self._latency_target = latency_target
+        self._backoff_ratio = backoff_ratio
+        self._in_flight = 0
+        self._waiting = 0
+        self._shed = 0
+        self._decreased_at = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self) -> Optional[str]:
+        """Take a slot, returning None on success or why the request was shed"""
+        with self._condition:
+            if self._in_flight < self.limit and not self._waiting:
+                self._admit()
+                return None
+            if self._waiting >= self._max_queue:
+                return self._reject("queue_full")
+
+            deadline = time.monotonic() + self._queue_timeout
+            self._waiting += 1
+            try:
+                while self._in_flight >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return self._reject("timeout")
+                    self._condition.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._admit()
+            return None
+
+    def release(self, latency: float) -> None:
+        """Free a slot taken by acquire, adapting the limit to the request's latency"""
+        with self._condition:
+            self._in_flight -= 1
+            record_admission_in_flight(self.name, -1)
+            if self._adaptive:
+                self._adapt(latency)
+            self._condition.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the current limit, in-flight and queued requests and the shed count"""
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "shed": self._shed,
+            }
+
+    def _admit(self) -> None:
+        # Caller holds self._condition; the limit is published from the worker, not the preloading master
+        self._in_flight += 1
+        record_admission_in_flight(self.name, 1)
+        record_admission_limit(self.name, self.limit)
+
+    def _reject(self, reason: str) -> str:
+        # Caller holds self._condition
+        self._shed += 1
+        record_admission_shed(self.name, reason)
+        return reason
+
+    def _adapt(self, latency: float) -> None:
+        # Caller holds self._condition
+        previous = self.limit
+        now = time.monotonic()
+        if latency > self._latency_target:
+            # Requests admitted before the decrease report the same slowdown; back off once per round trip
+            if now - self._decreased_at >= latency:
+                self._limit = max(float(self._min_limit), self._limit * self._backoff_ratio)
+                self._decreased_at = now
+        elif self._in_flight + 1 >= self._limit / 2:
+            self._limit = min(float(self._max_limit), self._limit + 1 / self._limit)
+        if self.limit != previous:
+            record_admission_limit(self.name, self.limit)
+            self._condition.notify_all()
+
+
+class AdmissionController:
+    """Routes blacklist requests through the read, export or write limiter"""
+
+    def __init__(
+        self,
+        read_limiter: ConcurrencyLimiter,
+        write_limiter: ConcurrencyLimiter,
+        export_limiter: Optional[ConcurrencyLimiter] = None,
+        retry_after: int = 1,
+    ):
+        self.read_limiter = read_limiter
+        self.write_limiter = write_limiter
+        self.export_limiter = export_limiter or read_limiter
+        self.retry_after = retry_after
+
+    def init_app(self, app) -> None:
+        """Register the request hooks on a Flask app"""
+        app.before_request(self._admit)
+        app.after_request(self._record_latency)
+        app.teardown_request(self._release)
+
+    def limiter_for_request(self) -> Optional[ConcurrencyLimiter]:
+        """Limiter guarding the current request, or None for routes that bypass admission control"""
+        rule = request.url_rule.rule if request.url_rule else None
+        if rule is None or not rule.startswith(ADMISSION_PATH_PREFIX):
+            return None
+        if rule == EXPORT_ROUTE and request.method in ("GET", "HEAD"):
+            return self.export_limiter
+        if request.method in ("GET", "HEAD") or rule in READ_ROUTES:
+            return self.read_limiter
+        return self.write_limiter
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the stats of every limiter"""
+        return {
+            "read": self.read_limiter.stats(),
+            "export": self.export_limiter.stats(),
+            "write": self.write_limiter.stats(),
+        }
+
+    def _admit(self):
+        limiter = self.limiter_for_request()
+        if limiter is None:
+            return None
+        reason = limiter.acquire()
+        if reason is not None:
+            response = jsonify({"error": "Service overloaded, retry later", "reason": reason})
+            response.status_code = 503
+            response.headers["Retry-After"] = str(self.retry_after)
+            return response
+        g._admission = (limiter, time.perf_counter())
+        return None
+
+    def _record_latency(self, response):
+        # The view has returned; a streamed body is produced after this and is not request latency
+        admitted = g.get("_admission")
+        if admitted is not None:
+            g._admission_latency = time.perf_counter() - admitted[1]
+        return response
+
+    def _release(self, exc=None) -> None:
+        admitted = g.pop("_admission", None)
+        if admitted is not None:
+            limiter, started = admitted
+            latency = g.pop("_admission_latency", None)
+            limiter.release(latency if latency is not None else time.perf_counter() - started)
@@ -0,0 +1,117 @@
+from typing import Callable, Optional
+from sqlalchemy import insert, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from ..domain.canonical_email import canonicalize_email, email_digest
+from ..domain.entities import Blacklist
+from ..domain.ports import AsyncBlacklistRepositoryPort
+from .models import BlacklistModel
+
+_ASYNC_DRIVERS = {
+    "postgres": "postgresql+psycopg",
+    "postgresql": "postgresql+psycopg",
+    "postgresql+psycopg2": "postgresql+psycopg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_database_url(database_url: str) -> str:
+    """Map a sync database URL to its async driver (psycopg 3 / aiosqlite)"""
+    scheme, separator, rest = database_url.partition("://")
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}{separator}{rest}"
+
+
+def create_async_engine_from_config(config) -> AsyncEngine:
+    """Create the async engine used by the ASGI serving mode"""
+    database_url = config.get("ASYNC_DATABASE_URL") or to_async_database_url(config["SQLALCHEMY_DATABASE_URI"])
+    engine_options = {"pool_pre_ping": True}
+    if not database_url.startswith("sqlite"):
+        engine_options.update(
+            pool_size=config.get("ASYNC_DB_POOL_SIZE", 10),
+            max_overflow=config.get("ASYNC_DB_MAX_OVERFLOW", 10),
+        )
+    return create_async_engine(database_url, **engine_options)
+
+
+class AsyncBlacklistRepository(AsyncBlacklistRepositoryPort):
+    """SQLAlchemy asyncio implementation of AsyncBlacklistRepositoryPort"""
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        canonicalize: Callable[[str], str] = canonicalize_email,
+        lookup_key: str = "canonical",
+    ):
+        self._engine = engine
+        self._canonicalize = canonicalize
+        self._use_digest = lookup_key == "digest"
+        self._table = BlacklistModel.__table__
+
+    async def add_email_to_blacklist(self, blacklist: Blacklist) -> bool:
+        """Add an email to the blacklist"""
+        canonical = self._canonicalize(blacklist.email)
+        try:
+            async with self._engine.begin() as connection:
+                await connection.execute(
+                    insert(self._table).values(
+                        email=blacklist.email,
+                        email_canonical=canonical,
+                        email_digest=email_digest(canonical),
+                        app_uuid=blacklist.app_uuid,
+                        blocked_reason=blacklist.blocked_reason,
+                        ip=blacklist.ip,
+                        created_at=blacklist.created_at
+                    )
+                )
+            return True
+        except IntegrityError:
+            # Email already exists in blacklist
+            return False
+        except Exception:
+            return False
+
+    async def is_email_blacklisted(self, email: str) -> Optional[Blacklist]:
+        """Check if an email is in the blacklist and return the blacklist entry; database errors propagate"""
+        statement = (
+            select(
+                self._table.c.email,
+                self._table.c.app_uuid,
+                self._table.c.blocked_reason,
+                self._table.c.ip,
+                self._table.c.created_at,
+            )
+            .where(self._lookup_clause(email))
+            .limit(1)
+        )
+        async with self._engine.connect() as connection:
+            row = (await connection.execute(statement)).first()
+
+        if row:
+            return Blacklist(
+                email=row.email,
+                app_uuid=row.app_uuid,
+                blocked_reason=row.blocked_reason,
+                ip=row.ip,
+                created_at=row.created_at
+            )
+
+        return None
+
+    def _lookup_clause(self, email: str):
+        canonical = self._canonicalize(email)
+        if self._use_digest:
+            return self._table.c.email_digest == email_digest(canonical)
+        return self._table.c.email_canonical == canonical
+
+    async def check_database_health(self) -> bool:
+        """Check if database connection is healthy"""
+        try:
+            async with self._engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+            return True
+        except Exception:
+            return False
+
+    async def dispose(self) -> None:
+        """Close every pooled connection"""
+        await self._engine.dispose()
@@ -0,0 +1,209 @@
+import hashlib
+import math
+import threading
+import time
+from typing import Callable, Optional, Dict, Any, Iterator, List
+from flask import current_app
+from ..domain.canonical_email import canonicalize_email
+from ..domain.entities import Blacklist
+from ..domain.ports import BlacklistRepositoryPort
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing"""
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, value: str) -> Iterator[int]:
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, value: str) -> None:
+        """Add a value to the filter"""
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class BloomFilterBlacklistRepository(BlacklistRepositoryPort):
+    """Bloom filter decorator that answers definite misses without a DB query
+
+    The filter is built from the blacklist table on a background thread
+    started by the first lookup (lookups go to the repository until it is
+    ready) and updated on every successful insert made through this process.
+    Rows inserted by other workers are picked up by a periodic rebuild, which
+    runs the same way the first time a lookup notices the filter is due.
+    """
+
+    def __init__(
+        self,
+        repository: BlacklistRepositoryPort,
+        false_positive_rate: float = 0.01,
+        rebuild_interval: float = 300.0,
+        min_capacity: int = 100000,
+        canonicalize: Callable[[str], str] = canonicalize_email,
+    ):
+        self._repository = repository
+        self._canonicalize = canonicalize
+        self._false_positive_rate = false_positive_rate
+        self._rebuild_interval = rebuild_interval
+        self._min_capacity = min_capacity
+        self._filter: Optional[BloomFilter] = None
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        self._pending_adds = []
+        self._next_rebuild_at = 0.0
+        self._last_rebuild_at: Optional[float] = None
+        self._lookups = 0
+        self._short_circuited = 0
+        self._false_positives = 0
+        self._rebuilds = 0
+
+    def add_email_to_blacklist(self, blacklist: Blacklist) -> bool:
+        """Add an email to the blacklist and to the filter on success"""
+        success = self._repository.add_email_to_blacklist(blacklist)
+        if success:
+            self._add_to_filter(blacklist.email)
+        return success
+
+    def add_emails_to_blacklist(self, blacklists: List[Blacklist]) -> List[bool]:
+        """Add several emails and add the created ones to the filter"""
+        created = self._repository.add_emails_to_blacklist(blacklists)
+        for blacklist, was_created in zip(blacklists, created):
+            if was_created:
+                self._add_to_filter(blacklist.email)
+        return created
+
+    def is_email_blacklisted(self, email: str) -> Optional[Blacklist]:
+        """Return None for definite misses, otherwise query the repository"""
+        self._schedule_rebuild_if_due()
+
+        bloom = self._filter
+        definite_miss = bloom is not None and self._canonicalize(email) not in bloom
+        with self._lock:
+            self._lookups += 1
+            if definite_miss:
+                self._short_circuited += 1
+        if definite_miss:
+            return None
+
+        blacklist = self._repository.is_email_blacklisted(email)
+        if blacklist is None and bloom is not None:
+            with self._lock:
+                self._false_positives += 1
+        return blacklist
+
+    def get_blacklisted_emails(self, emails: List[str]) -> Dict[str, Blacklist]:
+        """Drop definite misses and look up the remaining emails in the repository"""
+        self._schedule_rebuild_if_due()
+
+        unique_emails = list(dict.fromkeys(emails))
+        bloom = self._filter
+        candidates = [email for email in unique_emails if bloom is None or self._canonicalize(email) in bloom]
+        with self._lock:
+            self._lookups += len(unique_emails)
+            self._short_circuited += len(unique_emails) - len(candidates)
+
+        if not candidates:
+            return {}
+
+        found = self._repository.get_blacklisted_emails(candidates)
+        if bloom is not None:
+            with self._lock:
+                self._false_positives += len(candidates) - len(found)
+        return found
+
+    def iter_emails(self, batch_size: int = 5000) -> Iterator[str]:
+        """Iterate over the canonical form of every blacklisted email"""
+        return self._repository.iter_emails(batch_size)
+
+    def count_rows(self) -> int:
+        """Number of emails ``iter_emails`` yields"""
+        return self._repository.count_rows()
+
+    def iter_blacklist(self, *args, **kwargs) -> Iterator[Blacklist]:
+        """Iterate over blacklist entries, bypassing the lookup structure"""
+        return self._repository.iter_blacklist(*args, **kwargs)
+
+    def rebuild(self) -> None:
+        """Rebuild the filter from the repository (requires an app context)"""
+        with self._lock:
+            self._pending_adds = []
+            self._rebuilding = True
+
+        try:
+            # Sized from a count so the emails stream into the filter without being held in memory
+            bloom = BloomFilter(max(self._min_capacity, self._repository.count_rows() * 2), self._false_positive_rate)
+            for email in self._repository.iter_emails():
+                bloom.add(email)
+
+            with self._lock:
+                for email in self._pending_adds:
+                    bloom.add(email)
+                self._filter = bloom
+                self._rebuilds += 1
+                self._last_rebuild_at = time.time()
+        finally:
+            with self._lock:
+                self._pending_adds = []
+                self._rebuilding = False
+                retry_after = self._rebuild_interval if self._rebuild_interval > 0 else 30.0
+                self._next_rebuild_at = time.monotonic() + retry_after
+
+    def stats(self) -> Dict[str, Any]:
+        """Return lookup and short-circuit counters"""
+        with self._lock:
+            bloom = self._filter
+            return {
+                "ready": bloom is not None,
+                "entries": bloom.count if bloom else 0,
+                "capacity": bloom.capacity if bloom else 0,
+                "lookups": self._lookups,
+                "short_circuited": self._short_circuited,
+                "false_positives": self._false_positives,
+                "rebuilds": self._rebuilds,
+                "last_rebuild_at": self._last_rebuild_at,
+            }
+
+    def _add_to_filter(self, email: str) -> None:
+        email = self._canonicalize(email)
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(email)
+            if self._rebuilding:
+                self._pending_adds.append(email)
+
+    def _schedule_rebuild_if_due(self) -> None:
+        if self._rebuild_interval <= 0 and self._filter is not None:
+            return
+        if time.monotonic() < self._next_rebuild_at:
+            return
+
+        with self._lock:
+            if self._rebuilding or time.monotonic() < self._next_rebuild_at:
+                return
+            self._rebuilding = True
+
+        app = current_app._get_current_object()
+        thread = threading.Thread(target=self._rebuild_in_background, args=(app,), daemon=True)
+        thread.start()
+
+    def _rebuild_in_background(self, app) -> None:
+        try:
+            with app.app_context():
+                self.rebuild()
+        except Exception:
+            app.logger.exception("Bloom filter rebuild failed")
@@ -0,0 +1,332 @@
+"""
+Streaming bulk import of blacklist entries from CSV or NDJSON files
+
+Usage:
+    python -m src.infrastructure.bulk_import entries.csv [--format csv|ndjson]
+        [--chunk-size 10000] [--offset BYTES | --resume] [--checkpoint FILE]
+        [--rejects FILE] [--config production]
+
+The file is read record by record, so memory stays constant regardless of
+its size; quoted CSV fields may span several lines. On PostgreSQL (psycopg 3) each chunk is loaded with COPY into a
+temporary staging table and merged into ``blacklist`` with a set-based
+INSERT ... SELECT ... ON CONFLICT DO NOTHING; other databases fall back to a
+chunked executemany. After every committed chunk the byte offset of the next
+unread record is written to the checkpoint file, so an interrupted import can be
+resumed with ``--resume`` without reloading committed rows.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Iterator, List, Optional, Tuple
+from marshmallow import ValidationError
+from sqlalchemy.dialects import sqlite
+from src.adapters.schemas import blacklist_request_schema
+from src.domain.canonical_email import canonicalize_email, email_canonicalizer, email_digest
+from src.domain.entities import Blacklist
+from src.infrastructure.models import db, BlacklistModel
+from src.infrastructure.repositories import BlacklistRepository
+
+COLUMNS = ("email", "email_canonical", "email_digest", "app_uuid", "blocked_reason", "ip", "created_at")
+
+STAGING_TABLE_DDL = """
+CREATE TEMP TABLE IF NOT EXISTS blacklist_import_staging (
+    email VARCHAR(255) NOT NULL,
+    email_canonical VARCHAR(255) NOT NULL,
+    email_digest BYTEA NOT NULL,
+    app_uuid VARCHAR(36) NOT NULL,
+    blocked_reason TEXT NOT NULL,
+    ip VARCHAR(45),
+    created_at TIMESTAMP NOT NULL
+) ON COMMIT DELETE ROWS
+"""
+
+MERGE_STAGING_SQL = """
+INSERT INTO blacklist (email, email_canonical, email_digest, app_uuid, blocked_reason, ip, created_at)
+SELECT DISTINCT ON (email_canonical) email, email_canonical, email_digest, app_uuid, blocked_reason, ip, created_at
+FROM blacklist_import_staging
+ORDER BY email_canonical
+ON CONFLICT DO NOTHING
+"""
+
+
+def iter_records(path: str, file_format: str, offset: int = 0) -> Iterator[Tuple[Optional[dict], Optional[str], int]]:
+    """Yield (record, parse_error, next_offset) for every non-empty record after offset"""
+    with open(path, "rb") as handle:
+        if file_format == "csv":
+            yield from _iter_csv_records(handle, offset)
+            return
+
+        handle.seek(offset)
+        while True:
+            line = handle.readline()
+            if not line:
+                break
+            next_offset = handle.tell()
+
+            try:
+                text = line.decode("utf-8").strip()
+                if not text:
+                    continue
+                record = json.loads(text)
+                if not isinstance(record, dict):
+                    raise ValueError("Expected a JSON object")
+            except ValueError as e:
+                yield None, str(e), next_offset
+                continue
+
+            yield record, None, next_offset
+
+
+def _iter_csv_records(handle, offset: int) -> Iterator[Tuple[Optional[dict], Optional[str], int]]:
+    """CSV records read by a single reader, so quoted fields may span lines
+
+    The reader pulls one physical line at a time and stops at the end of a
+    record, so the position after the last line it pulled is the offset of the
+    next record. A line that is not valid UTF-8 is handed to the reader as an
+    empty line and the record it belongs to is rejected.
+    """
+    position = 0
+    decode_error = None
+
+    def lines():
+        nonlocal position, decode_error
+        for line in iter(handle.readline, b""):
+            position = handle.tell()
+            try:
+                yield line.decode("utf-8")
+            except UnicodeDecodeError as e:
+                decode_error = decode_error or str(e)
+                yield "\n"
+
+    header = next(csv.reader(lines()), [])
+    if header:
+        header[0] = header[0].lstrip("\ufeff")
+
+    handle.seek(max(offset, position))
+    position = handle.tell()
+    decode_error = None
+    reader = csv.reader(lines())
+    while True:
+        try:
+            values = next(reader)
+        except StopIteration:
+            break
+        except csv.Error as e:
+            decode_error = None
+            yield None, str(e), position
+            continue
+        if decode_error:
+            error, decode_error = decode_error, None
+            yield None, error, position
+            continue
+        if not any(value.strip() for value in values):
+            continue
+        yield dict(zip(header, (value.strip() for value in values))), None, position
+
+
+def validate_record(record: dict) -> Blacklist:
+    """Validate a raw record and convert it into a Blacklist entity"""
+    validated = blacklist_request_schema.load({
+        "email": record.get("email"),
+        "app_uuid": record.get("app_uuid"),
+        "blocked_reason": record.get("blocked_reason"),
+    })
+
+    ip = record.get("ip") or None
+    if ip is not None and (not isinstance(ip, str) or len(ip) > 45):
+        raise ValidationError({"ip": ["Invalid IP address."]})
+
+    return Blacklist(
+        email=validated["email"],
+        app_uuid=validated["app_uuid"],
+        blocked_reason=validated["blocked_reason"],
+        ip=ip,
+    )
+
+
+class BlacklistBulkImporter:
+    """Loads validated blacklist entries in chunks, checkpointing the file offset"""
+
+    def __init__(
+        self,
+        chunk_size: int = 10000,
+        checkpoint_path: Optional[str] = None,
+        rejects_path: Optional[str] = None,
+        out=sys.stdout,
+        canonicalize: Callable[[str], str] = canonicalize_email,
+    ):
+        self.canonicalize = canonicalize
+        self.chunk_size = max(1, chunk_size)
+        self.checkpoint_path = checkpoint_path
+        self.rejects_path = rejects_path
+        self.out = out
+        self.rows_read = 0
+        self.rows_inserted = 0
+        self.rows_rejected = 0
+        self._raw_connection = None
+
+    def run(self, path: str, file_format: str, offset: int = 0) -> dict:
+        """Import the file starting at the given byte offset and return the final report"""
+        started = time.perf_counter()
+        chunk: List[Blacklist] = []
+        next_offset = offset
+        rejects = open(self.rejects_path, "a", encoding="utf-8") if self.rejects_path else None
+
+        try:
+            for record, error, next_offset in iter_records(path, file_format, offset):
+                self.rows_read += 1
+                try:
+                    if error:
+                        raise ValidationError({"_line": [error]})
+                    chunk.append(validate_record(record))
+                except ValidationError as err:
+                    self.rows_rejected += 1
+                    if rejects:
+                        rejects.write(json.dumps({"offset": next_offset, "record": record, "errors": err.messages}) + "\n")
+
+                if len(chunk) >= self.chunk_size:
+                    self._commit_chunk(chunk, path, next_offset, started)
+                    chunk = []
+
+            self._commit_chunk(chunk, path, next_offset, started)
+        finally:
+            if rejects:
+                rejects.close()
+            if self._raw_connection is not None:
+                self._raw_connection.close()
+                self._raw_connection = None
+
+        return self._report(path, next_offset, started)
+
+    def _commit_chunk(self, chunk: List[Blacklist], path: str, next_offset: int, started: float) -> None:
+        if chunk:
+            self.rows_inserted += self._load_chunk(chunk)
+        report = self._report(path, next_offset, started)
+        self._write_checkpoint(report)
+        print(
+            f"{report['rows_read']} rows read, {report['rows_inserted']} inserted, "
+            f"{report['rows_rejected']} rejected, {report['rows_per_second']:.0f} rows/sec, "
+            f"offset {next_offset}",
+            file=self.out,
+        )
+
+    def _load_chunk(self, chunk: List[Blacklist]) -> int:
+        if db.engine.dialect.name == "postgresql" and db.engine.dialect.driver == "psycopg":
+            return self._copy_chunk(chunk)
+        if db.engine.dialect.name == "sqlite":
+            return self._executemany_chunk(chunk)
+        repository = BlacklistRepository(batch_chunk_size=self.chunk_size, canonicalize=self.canonicalize)
+        return sum(repository.add_emails_to_blacklist(chunk))
+
+    def _copy_chunk(self, chunk: List[Blacklist]) -> int:
+        """COPY the chunk into a staging table and merge it into blacklist"""
+        if self._raw_connection is None:
+            self._raw_connection = db.engine.raw_connection()
+        connection = self._raw_connection.driver_connection
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(STAGING_TABLE_DDL)
+                with cursor.copy(f"COPY blacklist_import_staging ({', '.join(COLUMNS)}) FROM STDIN") as copy:
+                    for blacklist in chunk:
+                        copy.write_row(self._row(blacklist))
+                cursor.execute(MERGE_STAGING_SQL)
+                inserted = cursor.rowcount
+            connection.commit()
+            return inserted
+        except Exception:
+            connection.rollback()
+            raise
+
+    def _executemany_chunk(self, chunk: List[Blacklist]) -> int:
+        """Insert the chunk with a single executemany, skipping existing emails"""
+        statement = sqlite.insert(BlacklistModel.__table__).on_conflict_do_nothing()
+        try:
+            result = db.session.connection().execute(statement, [dict(zip(COLUMNS, self._row(b))) for b in chunk])
+            db.session.commit()
+            return max(result.rowcount, 0)
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _row(self, blacklist: Blacklist) -> tuple:
+        canonical = self.canonicalize(blacklist.email)
+        return (
+            blacklist.email,
+            canonical,
+            email_digest(canonical),
+            blacklist.app_uuid,
+            blacklist.blocked_reason,
+            blacklist.ip,
+            blacklist.created_at,
+        )
+
+    def _report(self, path: str, next_offset: int, started: float) -> dict:
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        return {
+            "path": os.path.abspath(path),
+            "offset": next_offset,
+            "rows_read": self.rows_read,
+            "rows_inserted": self.rows_inserted,
+            "rows_rejected": self.rows_rejected,
+            "rows_per_second": self.rows_read / elapsed,
+            "elapsed_seconds": elapsed,
+            "updated_at": datetime.utcnow().isoformat(),
+        }
+
+    def _write_checkpoint(self, report: dict) -> None:
+        if not self.checkpoint_path:
+            return
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(report, handle)
+        os.replace(tmp_path, self.checkpoint_path)
+
+
+def read_checkpoint_offset(checkpoint_path: str, path: str) -> int:
+    """Return the committed offset stored in a checkpoint for the given file"""
+    try:
+        with open(checkpoint_path, encoding="utf-8") as handle:
+            checkpoint = json.load(handle)
+    except FileNotFoundError:
+        return 0
+    if checkpoint.get("path") != os.path.abspath(path):
+        raise SystemExit(f"Checkpoint {checkpoint_path} belongs to {checkpoint.get('path')}")
+    return int(checkpoint.get("offset", 0))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import blacklist entries")
+    parser.add_argument("path", help="CSV (with header) or NDJSON file to import")
+    parser.add_argument("--format", choices=("csv", "ndjson"), help="File format (default: from extension)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows per committed chunk")
+    parser.add_argument("--offset", type=int, default=0, help="Byte offset to start reading from")
+    parser.add_argument("--checkpoint", help="File where the committed offset is recorded")
+    parser.add_argument("--resume", action="store_true", help="Start from the offset in --checkpoint")
+    parser.add_argument("--rejects", help="NDJSON file where rejected rows are appended")
+    parser.add_argument("--config", default="default", help="Configuration name")
+    args = parser.parse_args(argv)
+
+    file_format = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    checkpoint_path = args.checkpoint or f"{args.path}.checkpoint"
+    offset = read_checkpoint_offset(checkpoint_path, args.path) if args.resume else args.offset
+
+    from src.app import create_app
+
+    app = create_app(args.config)
+    with app.app_context():
+        importer = BlacklistBulkImporter(
+            args.chunk_size, checkpoint_path, args.rejects, canonicalize=email_canonicalizer(app.config)
+        )
+        report = importer.run(args.path, file_format, offset)
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
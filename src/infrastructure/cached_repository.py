@@ -0,0 +1,182 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Optional, Dict, Any, Iterator, List
+from ..domain.canonical_email import canonicalize_email
+from ..domain.entities import Blacklist
+from ..domain.ports import BlacklistRepositoryPort
+
+_MISSING = object()
+
+
+class CachedBlacklistRepository(BlacklistRepositoryPort):
+    """Read-through LRU/TTL cache decorator for a BlacklistRepositoryPort
+
+    Both positive (entry found) and negative (not blacklisted) lookups are
+    cached, each with its own TTL. The cache is local to the process, so the
+    negative TTL bounds how long an email added by another worker can still
+    be reported as not blacklisted here. Entries are keyed by canonical email,
+    so every spelling of an address shares one entry and one invalidation.
+
+    A lookup that raises is not cached. Each miss records the key's load
+    generation before querying, and an invalidation in the meantime discards
+    it, so a result read before a concurrent insert is never stored after the
+    insert's invalidation.
+    """
+
+    def __init__(
+        self,
+        repository: BlacklistRepositoryPort,
+        max_size: int = 10000,
+        positive_ttl: float = 300.0,
+        negative_ttl: float = 30.0,
+        canonicalize: Callable[[str], str] = canonicalize_email,
+    ):
+        self._repository = repository
+        self._canonicalize = canonicalize
+        self._max_size = max(1, max_size)
+        self._positive_ttl = positive_ttl
+        self._negative_ttl = negative_ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._loading: Dict[str, int] = {}
+        self._generation = 0
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def add_email_to_blacklist(self, blacklist: Blacklist) -> bool:
+        """Add an email to the blacklist and invalidate its cached lookup"""
+        success = self._repository.add_email_to_blacklist(blacklist)
+        self.invalidate(blacklist.email)
+        return success
+
+    def add_emails_to_blacklist(self, blacklists: List[Blacklist]) -> List[bool]:
+        """Add several emails and invalidate their cached lookups"""
+        created = self._repository.add_emails_to_blacklist(blacklists)
+        for blacklist in blacklists:
+            self.invalidate(blacklist.email)
+        return created
+
+    def is_email_blacklisted(self, email: str) -> Optional[Blacklist]:
+        """Return the cached lookup for an email, querying the repository on a miss"""
+        cached = self._get(email)
+        if cached is not _MISSING:
+            return cached
+
+        generations = self._begin_load([email])
+        try:
+            blacklist = self._repository.is_email_blacklisted(email)
+            self._set(email, blacklist, generations)
+        finally:
+            self._end_load(generations)
+        return blacklist
+
+    def get_blacklisted_emails(self, emails: List[str]) -> Dict[str, Blacklist]:
+        """Resolve cached emails locally and look up the rest in one repository call"""
+        found = {}
+        misses = []
+        for email in dict.fromkeys(emails):
+            cached = self._get(email)
+            if cached is _MISSING:
+                misses.append(email)
+            elif cached is not None:
+                found[email] = cached
+
+        if misses:
+            generations = self._begin_load(misses)
+            try:
+                resolved = self._repository.get_blacklisted_emails(misses)
+                for email in misses:
+                    self._set(email, resolved.get(email), generations)
+            finally:
+                self._end_load(generations)
+            found.update(resolved)
+        return found
+
+    def iter_emails(self, batch_size: int = 5000) -> Iterator[str]:
+        """Iterate over the canonical form of every blacklisted email"""
+        return self._repository.iter_emails(batch_size)
+
+    def count_rows(self) -> int:
+        """Number of emails ``iter_emails`` yields"""
+        return self._repository.count_rows()
+
+    def iter_blacklist(self, *args, **kwargs) -> Iterator[Blacklist]:
+        """Iterate over blacklist entries, bypassing the lookup structure"""
+        return self._repository.iter_blacklist(*args, **kwargs)
+
+    def invalidate(self, email: str) -> None:
+        """Drop a single email from the cache"""
+        email = self._canonicalize(email)
+        with self._lock:
+            self._entries.pop(email, None)
+            self._loading.pop(email, None)
+
+    def clear(self) -> None:
+        """Drop every cached lookup, including the ones still being loaded"""
+        with self._lock:
+            self._entries.clear()
+            self._loading.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache hit/miss/eviction counters"""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self._max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+    def _get(self, email: str):
+        email = self._canonicalize(email)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None:
+                self._misses += 1
+                return _MISSING
+
+            expires_at, blacklist = entry
+            if expires_at <= now:
+                del self._entries[email]
+                self._misses += 1
+                return _MISSING
+
+            self._entries.move_to_end(email)
+            self._hits += 1
+            return blacklist
+
+    def _begin_load(self, emails: List[str]) -> Dict[str, int]:
+        # A newer load of the same key takes over; the older one is then not cached
+        loads = {}
+        with self._lock:
+            for email in emails:
+                email = self._canonicalize(email)
+                self._generation += 1
+                self._loading[email] = loads[email] = self._generation
+        return loads
+
+    def _end_load(self, loads: Dict[str, int]) -> None:
+        with self._lock:
+            for email, generation in loads.items():
+                if self._loading.get(email) == generation:
+                    del self._loading[email]
+
+    def _set(self, email: str, blacklist: Optional[Blacklist], loads: Dict[str, int]) -> None:
+        email = self._canonicalize(email)
+        ttl = self._positive_ttl if blacklist else self._negative_ttl
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            # Invalidated (or reloaded) since the lookup started: the result may predate a write
+            if self._loading.get(email) != loads.get(email):
+                return
+            self._entries[email] = (time.monotonic() + ttl, blacklist)
+            self._entries.move_to_end(email)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
@@ -1,15 +1,24 @@
+from typing import Dict, Any
+from sqlalchemy import text
 from src.domain.ports import HealthCheckPort
 from .models import db
+from .pool_metrics import get_pool_status
 
 
 class SQLAlchemyHealthCheck(HealthCheckPort):
     """SQLAlchemy implementation of HealthCheckPort"""
 
+    def __init__(self, statement_timeout_ms: int = 1000):
+        self._statement_timeout_ms = statement_timeout_ms
+
     def check_database_health(self) -> bool:
         """Check if database connection is healthy"""
         try:
-            # Simple database connectivity check
-            db.session.execute("SELECT 1")
+            # Use a dedicated connection so the probe never touches a request's session
+            with db.engine.connect() as connection:
+                if connection.dialect.name == "postgresql" and self._statement_timeout_ms > 0:
+                    connection.execute(text(f"SET LOCAL statement_timeout = {int(self._statement_timeout_ms)}"))
+                connection.execute(text("SELECT 1"))
             return True
         except Exception:
             return False
@@ -19,3 +28,7 @@ class SQLAlchemyHealthCheck(HealthCheckPort):
         # For now, just return True as we don't have external services
         # In a real application, this would check external APIs, message queues, etc.
         return True
+
+    def get_database_pool_status(self) -> Dict[str, Any]:
+        """Report connection pool usage (size, checked out, overflow, waits)"""
+        return get_pool_status(db.engine)
@@ -0,0 +1,109 @@
+"""
+Background refresh of the application health status
+
+Load balancer probes hit ``/health`` from every target every few seconds.
+Instead of probing the database on each of those requests, every worker
+process runs one daemon thread that evaluates ``HealthService`` every
+``interval`` seconds and keeps the last ``HealthStatus``; requests are served
+from that copy together with the probe latency and its age. The thread is
+started lazily by the first request in each process, so it also exists in
+workers forked from a preloaded master.
+"""
+import os
+import threading
+import time
+from dataclasses import replace
+from datetime import datetime
+from typing import Optional
+from flask import current_app
+from src.application.health_service import HealthService
+from src.domain.entities import HealthStatus
+
+
+class HealthRefresher:
+    """Serves a cached HealthStatus refreshed by a per-process background thread
+
+    With ``interval <= 0`` no thread is started and every call probes
+    synchronously. A status older than ``max_staleness`` seconds (the refresher
+    thread is stuck or dead) is reported as unhealthy.
+    """
+
+    def __init__(self, health_service: HealthService, interval: float = 5.0, max_staleness: Optional[float] = None):
+        self._health_service = health_service
+        self._interval = interval
+        self._max_staleness = max_staleness if max_staleness is not None else 3 * interval
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._status: Optional[HealthStatus] = None
+        self._checked_at = 0.0
+        self._probe_latency = 0.0
+        self._pid: Optional[int] = None
+
+    def get_status(self) -> HealthStatus:
+        """Return the latest health status with probe latency and staleness"""
+        if self._interval <= 0:
+            self.refresh()
+        else:
+            self._ensure_started()
+
+        with self._lock:
+            status, checked_at, probe_latency = self._status, self._checked_at, self._probe_latency
+
+        staleness = time.monotonic() - checked_at
+        details = dict(status.details or {})
+        details.update({
+            "probe_latency_ms": round(probe_latency * 1000, 3),
+            "checked_at": status.timestamp.isoformat(),
+            "staleness_seconds": round(staleness, 3),
+        })
+        if self._interval > 0 and staleness > self._max_staleness:
+            return replace(
+                status,
+                status="unhealthy",
+                message="Health status is stale",
+                timestamp=datetime.utcnow(),
+                details=details,
+            )
+        return replace(status, details=details)
+
+    def refresh(self) -> HealthStatus:
+        """Probe now and store the result (requires an app context)"""
+        started = time.monotonic()
+        status = self._health_service.get_health_status()
+        finished = time.monotonic()
+        with self._lock:
+            self._status = status
+            self._checked_at = finished
+            self._probe_latency = finished - started
+        return status
+
+    def stop(self) -> None:
+        """Stop the refresher thread of this process"""
+        self._stop.set()
+
+    def _ensure_started(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+
+        with self._start_lock:
+            if self._pid == pid:
+                return
+            # The first request in a process waits for one probe instead of serving nothing
+            if self._status is None or time.monotonic() - self._checked_at > self._interval:
+                self.refresh()
+
+            self._stop = threading.Event()
+            app = current_app._get_current_object()
+            thread = threading.Thread(target=self._run, args=(app, self._stop), daemon=True)
+            thread.start()
+            self._pid = pid
+
+    def _run(self, app, stop: threading.Event) -> None:
+        while not stop.wait(self._interval):
+            try:
+                with app.app_context():
+                    self.refresh()
+            except Exception:
+                app.logger.exception("Health refresh failed")
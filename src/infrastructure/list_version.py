@@ -0,0 +1,68 @@
+"""
+Version of the blacklist contents, for validating cached "not blacklisted" answers
+
+``GET /blacklists/<email>`` tags a negative answer with the list version it
+was computed at. A client revalidating with ``If-None-Match`` gets ``304`` as
+long as the version has not changed, which is checked without a query.
+
+Rows are never updated or deleted, so the contents only change by inserts. The
+version is derived from the largest id and the number of rows among the last
+``rescan_ids`` ids below it; the count catches a transaction that committed
+after a higher id had already been seen. It is read from the database at most
+once per ``refresh_interval`` seconds and right after an insert through the
+repository.
+
+The cached value lives in anonymous shared memory created with the app, so
+under gunicorn with ``preload_app`` one worker's insert or refresh applies to
+all of them. Inserts made by other hosts or by the bulk importer are seen after
+at most ``refresh_interval`` seconds.
+"""
+import mmap
+import struct
+import threading
+import time
+from sqlalchemy import func, select
+from ..domain.ports import BlacklistVersionPort
+from .models import db, BlacklistModel
+
+# version, time the query that read it started, time of the last local insert
+_STATE = struct.Struct("<qdd")
+
+
+class BlacklistListVersion(BlacklistVersionPort):
+    """Cached, monotonically increasing version of the blacklist contents"""
+
+    def __init__(self, refresh_interval: float = 1.0, rescan_ids: int = 1000):
+        self._refresh_interval = refresh_interval
+        self._rescan_ids = max(0, rescan_ids)
+        self._state = mmap.mmap(-1, _STATE.size)
+        self._lock = threading.Lock()
+
+    def current(self) -> int:
+        """Return the list version, reading it from the database when due (requires an app context)"""
+        version, refreshed_at, written_at = _STATE.unpack_from(self._state)
+        if refreshed_at > written_at and time.time() - refreshed_at < self._refresh_interval:
+            return version
+
+        with self._lock:
+            # Stamped with the time the query started, so an insert committed meanwhile forces another refresh
+            started = time.time()
+            fetched = self._fetch()
+            version, _, written_at = _STATE.unpack_from(self._state)
+            # Never go back to an older version, which would validate tags issued before an insert
+            version = max(version, fetched)
+            _STATE.pack_into(self._state, 0, version, started, written_at)
+        return version
+
+    def invalidate(self) -> None:
+        """Read the version from the database on the next call, after an insert has committed"""
+        version, refreshed_at, _ = _STATE.unpack_from(self._state)
+        _STATE.pack_into(self._state, 0, version, refreshed_at, time.time())
+
+    def _fetch(self) -> int:
+        max_id = db.session.execute(select(func.max(BlacklistModel.id))).scalar() or 0
+        recent = db.session.execute(
+            select(func.count()).select_from(BlacklistModel).where(BlacklistModel.id > max_id - self._rescan_ids)
+        ).scalar()
+        # recent <= rescan_ids, so this grows with either value
+        return max_id * (self._rescan_ids + 1) + recent
@@ -0,0 +1,280 @@
+"""
+In-memory replica of the blacklist table for answering checks without a query
+
+With ``BLACKLIST_REPOSITORY_MODE=memory`` every worker keeps the whole table
+in process memory and answers ``is_email_blacklisted`` and bulk checks from
+it. Writes go to ``BlacklistRepository`` and are applied locally on success.
+
+The copy is built by a background thread started by the first lookup in each
+worker; until it is loaded, lookups go to the database. The same thread then
+polls for rows with an id above the high-water mark every ``poll_interval``
+seconds, so inserts made by other workers or by the bulk importer show up
+after at most one interval. Each poll re-reads the last ``rescan_ids`` ids
+below the mark, which picks up rows whose transaction committed after a
+higher id had already been seen. A transaction that commits further behind,
+such as a bulk import chunk, is caught by the reconcile every
+``reconcile_interval`` seconds: it counts the table before a poll and, if the
+table then holds more rows than the copy, re-reads it from the first id.
+If no poll has succeeded for
+``max_staleness`` seconds, lookups go back to the database until one does.
+With ``poll_interval <= 0`` no thread is started and every lookup syncs first.
+
+Rows are stored column-wise rather than as one ``Blacklist`` per row: a dict
+from canonical email to row number, creation times as 64-bit integers in an
+``array`` and app uuid, reason and IP as indexes into a table of distinct
+strings, which are usually few. The original email is only stored when it differs
+from its canonical form.
+"""
+import os
+import sys
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta
+from typing import Callable, Optional, Dict, Any, Iterator, List
+from flask import current_app
+from ..domain.canonical_email import canonicalize_email
+from ..domain.entities import Blacklist
+from ..domain.ports import BlacklistRepositoryPort
+from .repositories import BlacklistRepository
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class InMemoryBlacklistRepository(BlacklistRepositoryPort):
+    """Answers lookups from a compact in-process copy of the blacklist table"""
+
+    def __init__(
+        self,
+        repository: BlacklistRepository,
+        poll_interval: float = 1.0,
+        max_staleness: float = 30.0,
+        batch_size: int = 10000,
+        rescan_ids: int = 1000,
+        reconcile_interval: float = 60.0,
+        canonicalize: Callable[[str], str] = canonicalize_email,
+    ):
+        self._repository = repository
+        self._poll_interval = poll_interval
+        self._max_staleness = max_staleness
+        self._batch_size = max(1, batch_size)
+        self._rescan_ids = max(0, rescan_ids)
+        self._reconcile_interval = reconcile_interval
+        self._canonicalize = canonicalize
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._pid: Optional[int] = None
+        self._reset()
+
+    def add_email_to_blacklist(self, blacklist: Blacklist) -> bool:
+        """Add an email through the database and to the local copy on success"""
+        success = self._repository.add_email_to_blacklist(blacklist)
+        if success:
+            self._store(self._canonicalize(blacklist.email), blacklist.email, blacklist.app_uuid,
+                        blacklist.blocked_reason, blacklist.ip, blacklist.created_at)
+        return success
+
+    def add_emails_to_blacklist(self, blacklists: List[Blacklist]) -> List[bool]:
+        """Add several emails through the database and the created ones to the local copy"""
+        created = self._repository.add_emails_to_blacklist(blacklists)
+        for blacklist, was_created in zip(blacklists, created):
+            if was_created:
+                self._store(self._canonicalize(blacklist.email), blacklist.email, blacklist.app_uuid,
+                            blacklist.blocked_reason, blacklist.ip, blacklist.created_at)
+        return created
+
+    def is_email_blacklisted(self, email: str) -> Optional[Blacklist]:
+        """Look an email up in memory, or in the database while the copy is not usable"""
+        if not self._usable():
+            self._fallback_reads += 1
+            return self._repository.is_email_blacklisted(email)
+        return self._entry(self._canonicalize(email))
+
+    def get_blacklisted_emails(self, emails: List[str]) -> Dict[str, Blacklist]:
+        """Look several emails up in memory, or in the database while the copy is not usable"""
+        if not self._usable():
+            self._fallback_reads += 1
+            return self._repository.get_blacklisted_emails(emails)
+        found = {}
+        for email in dict.fromkeys(emails):
+            entry = self._entry(self._canonicalize(email))
+            if entry is not None:
+                found[email] = entry
+        return found
+
+    def iter_emails(self, batch_size: int = 5000) -> Iterator[str]:
+        """Iterate over the canonical form of every blacklisted email"""
+        return self._repository.iter_emails(batch_size)
+
+    def count_rows(self) -> int:
+        """Number of emails ``iter_emails`` yields"""
+        return self._repository.count_rows()
+
+    def iter_blacklist(self, *args, **kwargs) -> Iterator[Blacklist]:
+        """Iterate over blacklist entries from the database"""
+        return self._repository.iter_blacklist(*args, **kwargs)
+
+    def sync(self) -> int:
+        """Apply rows above the high-water mark, returning how many were new (requires an app context)"""
+        expected = None
+        if self._loaded and self._reconcile_interval > 0 and time.monotonic() >= self._reconcile_at:
+            # Counted before the poll, so every row it counts has committed by the time the poll reads
+            expected = self._repository.count_rows()
+            self._reconcile_at = time.monotonic() + self._reconcile_interval
+
+        start = max(0, self._high_water_mark - self._rescan_ids) if self._loaded else self._high_water_mark
+        added = self._apply_rows_after(start)
+        if expected is not None and expected > len(self._index):
+            # Some row committed too far behind the mark for the rescan to see it
+            added += self._apply_rows_after(0)
+            self._reconciles += 1
+
+        with self._lock:
+            if not self._loaded:
+                self._reconcile_at = time.monotonic() + self._reconcile_interval
+            self._loaded = True
+            self._synced_at = time.monotonic()
+            self._syncs += 1
+        return added
+
+    def stop(self) -> None:
+        """Stop the sync thread of this process"""
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count, memory use, high-water mark and replication lag"""
+        with self._lock:
+            entries = len(self._index)
+            memory = (
+                self._string_bytes
+                + sys.getsizeof(self._index)
+                + sum(column.buffer_info()[1] * column.itemsize for column in self._columns())
+                + sys.getsizeof(self._emails)
+                + sys.getsizeof(self._values) + sys.getsizeof(self._value_ids)
+            )
+            lag = time.monotonic() - self._synced_at if self._loaded else None
+            return {
+                "loaded": self._loaded,
+                "usable": self._loaded and lag <= self._max_staleness,
+                "entries": entries,
+                "high_water_mark": self._high_water_mark,
+                "memory_bytes": memory,
+                "memory_bytes_per_million": round(memory / entries * 1_000_000) if entries else 0,
+                "replication_lag_seconds": round(lag, 3) if lag is not None else None,
+                "syncs": self._syncs,
+                "reconciles": self._reconciles,
+                "fallback_reads": self._fallback_reads,
+            }
+
+    def _apply_rows_after(self, last_id: int) -> int:
+        added = 0
+        while True:
+            rows = self._repository.fetch_rows_after(last_id, self._batch_size)
+            with self._lock:
+                for row_id, email, canonical, app_uuid, blocked_reason, ip, created_at in rows:
+                    if self._append(canonical, email, app_uuid, blocked_reason, ip, created_at):
+                        added += 1
+                    last_id = row_id
+            if last_id > self._high_water_mark:
+                self._high_water_mark = last_id
+            if len(rows) < self._batch_size:
+                return added
+
+    def _reset(self) -> None:
+        self._index: Dict[str, int] = {}
+        self._emails: Dict[int, str] = {}
+        self._created_at = array("q")
+        self._app_uuids = array("I")
+        self._reasons = array("I")
+        self._ips = array("I")
+        self._values: List[Optional[str]] = [None]
+        self._value_ids: Dict[Optional[str], int] = {None: 0}
+        self._string_bytes = 0
+        self._high_water_mark = 0
+        self._loaded = False
+        self._synced_at = 0.0
+        self._syncs = 0
+        self._reconciles = 0
+        self._reconcile_at = 0.0
+        self._fallback_reads = 0
+
+    def _columns(self):
+        return self._created_at, self._app_uuids, self._reasons, self._ips
+
+    def _value_id(self, value: Optional[str]) -> int:
+        value_id = self._value_ids.get(value)
+        if value_id is None:
+            value_id = len(self._values)
+            self._values.append(value)
+            self._value_ids[value] = value_id
+            self._string_bytes += sys.getsizeof(value)
+        return value_id
+
+    def _store(self, canonical: str, email: str, app_uuid: str, blocked_reason: str,
+               ip: Optional[str], created_at: datetime) -> bool:
+        """Append a row unless its canonical email is already present"""
+        with self._lock:
+            return self._append(canonical, email, app_uuid, blocked_reason, ip, created_at)
+
+    def _append(self, canonical: str, email: str, app_uuid: str, blocked_reason: str,
+                ip: Optional[str], created_at: datetime) -> bool:
+        # Caller holds self._lock
+        if canonical in self._index:
+            return False
+        row = len(self._created_at)
+        self._created_at.append((created_at - _EPOCH) // _MICROSECOND)
+        self._app_uuids.append(self._value_id(app_uuid))
+        self._reasons.append(self._value_id(blocked_reason))
+        self._ips.append(self._value_id(ip))
+        self._string_bytes += sys.getsizeof(canonical)
+        if email != canonical:
+            self._emails[row] = email
+            self._string_bytes += sys.getsizeof(email)
+        # Published last, once the row's columns are in place
+        self._index[canonical] = row
+        return True
+
+    def _entry(self, canonical: str) -> Optional[Blacklist]:
+        row = self._index.get(canonical)
+        if row is None:
+            return None
+        return Blacklist(
+            email=self._emails.get(row, canonical),
+            app_uuid=self._values[self._app_uuids[row]],
+            blocked_reason=self._values[self._reasons[row]],
+            ip=self._values[self._ips[row]],
+            created_at=_EPOCH + self._created_at[row] * _MICROSECOND,
+        )
+
+    def _usable(self) -> bool:
+        if self._poll_interval <= 0:
+            self.sync()
+        else:
+            self._ensure_started()
+        return self._loaded and time.monotonic() - self._synced_at <= self._max_staleness
+
+    def _ensure_started(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+
+        with self._start_lock:
+            if self._pid == pid:
+                return
+            self._stop = threading.Event()
+            app = current_app._get_current_object()
+            thread = threading.Thread(target=self._run, args=(app, self._stop), daemon=True)
+            thread.start()
+            self._pid = pid
+
+    def _run(self, app, stop: threading.Event) -> None:
+        while True:
+            try:
+                with app.app_context():
+                    self.sync()
+            except Exception:
+                app.logger.exception("In-memory blacklist sync failed")
+            if stop.wait(self._poll_interval):
+                return
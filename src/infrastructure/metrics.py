@@ -0,0 +1,128 @@
+"""
+Prometheus metrics for the HTTP, database and blacklist paths
+
+Metrics are defined once per process with prometheus_client. Under gunicorn,
+set ``PROMETHEUS_MULTIPROC_DIR`` to an empty, writable directory before the
+workers start; every worker then writes its samples to memory-mapped files in
+that directory and ``/metrics`` aggregates all of them, whichever worker
+serves the scrape.
+"""
+import os
+import time
+from flask import g, request
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    CONTENT_TYPE_LATEST,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status code", ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ["method", "route"], buckets=LATENCY_BUCKETS
+)
+DB_QUERIES = Counter("db_queries_total", "Database statements executed")
+DB_QUERY_DURATION = Histogram("db_query_duration_seconds", "Database statement latency", buckets=LATENCY_BUCKETS)
+JWT_FAILURES = Counter("jwt_verification_failures_total", "Rejected JWTs by reason", ["reason"])
+JWT_CACHE_LOOKUPS = Counter("jwt_verified_cache_lookups_total", "Verified-token cache lookups by outcome", ["result"])
+BLACKLIST_LOOKUPS = Counter("blacklist_lookups_total", "Blacklist lookups by outcome", ["result"])
+BLACKLIST_INGEST = Counter("blacklist_ingest_total", "Write-behind ingest entries by outcome", ["result"])
+ADMISSION_LIMIT = Gauge(
+    "admission_concurrency_limit", "Concurrency limit per worker by request kind", ["kind"], multiprocess_mode="liveall"
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight_requests", "Admitted requests in progress by kind", ["kind"], multiprocess_mode="livesum"
+)
+ADMISSION_SHED = Counter("admission_shed_total", "Requests rejected by admission control", ["kind", "reason"])
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+
+def init_request_metrics(app) -> None:
+    """Record request count and latency for every request served by app"""
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        started = getattr(g, "_metrics_started", None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            HTTP_REQUEST_DURATION.labels(request.method, route).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(request.method, route, str(response.status_code)).inc()
+        return response
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_metrics_query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("_metrics_query_started")
+    if started:
+        DB_QUERY_DURATION.observe(time.perf_counter() - started.pop())
+    DB_QUERIES.inc()
+
+
+def record_jwt_failure(reason: str) -> None:
+    """Count a rejected JWT"""
+    JWT_FAILURES.labels(reason).inc()
+
+
+def record_jwt_cache_lookup(hit: bool) -> None:
+    """Count a verified-token cache lookup as a hit or miss"""
+    JWT_CACHE_LOOKUPS.labels("hit" if hit else "miss").inc()
+
+
+def record_blacklist_lookup(blacklisted: bool, count: int = 1) -> None:
+    """Count blacklist lookups as hits (blacklisted) or misses"""
+    BLACKLIST_LOOKUPS.labels("hit" if blacklisted else "miss").inc(count)
+
+
+def record_blacklist_ingest(result: str) -> None:
+    """Count a write-behind entry as rejected, created, duplicate or failed"""
+    BLACKLIST_INGEST.labels(result).inc()
+
+
+def record_admission_limit(kind: str, limit: int) -> None:
+    """Publish the current concurrency limit of a request kind"""
+    ADMISSION_LIMIT.labels(kind).set(limit)
+
+
+def record_admission_in_flight(kind: str, delta: int) -> None:
+    """Track admitted requests of a kind entering (+1) or leaving (-1)"""
+    ADMISSION_IN_FLIGHT.labels(kind).inc(delta)
+
+
+def record_admission_shed(kind: str, reason: str) -> None:
+    """Count a request rejected because the queue was full or its wait timed out"""
+    ADMISSION_SHED.labels(kind, reason).inc()
+
+
+def render_metrics() -> bytes:
+    """Render metrics in the Prometheus text format, aggregating workers if needed"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop the live-only samples of an exited worker (gunicorn child_exit hook)"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
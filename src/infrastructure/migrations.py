@@ -1,16 +1,276 @@
 """
-Database migration script to create blacklist table
+Database migrations for the blacklist schema
+
+Usage:
+    python -m src.infrastructure.migrations upgrade [--config production]
+    python -m src.infrastructure.migrations current [--config production]
+
+Schema changes run as a one-shot command before the application servers
+start (the container runs ``upgrade`` and then gunicorn), so workers never
+introspect or alter the schema themselves. Applied versions are recorded in
+the ``schema_migrations`` table; ``upgrade`` applies the pending ones in
+order, each in its own transaction. On PostgreSQL an advisory lock keeps
+concurrently starting tasks from migrating at the same time.
+
+The canonicalization setting the stored ``email_canonical`` values were
+computed with is recorded in ``schema_settings``. When
+``BLACKLIST_EMAIL_PROVIDER_NORMALIZATION`` no longer matches it, ``upgrade``
+recomputes every row's canonical email and digest, so existing entries keep
+matching under the new rules.
 """
+import argparse
+import sys
+from datetime import datetime
+from typing import Callable, List, Tuple
 from flask import current_app
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text, update
+from sqlalchemy.engine import Connection
+from src.domain.canonical_email import email_canonicalizer, email_digest
 from src.infrastructure.models import db, BlacklistModel
 
+MIGRATION_LOCK_ID = 4304
+BACKFILL_BATCH_SIZE = 5000
+
+migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+schema_settings = Table(
+    "schema_settings",
+    migration_metadata,
+    Column("name", String(64), primary_key=True),
+    Column("value", String(255), nullable=False),
+)
+PROVIDER_NORMALIZATION_SETTING = "email_provider_normalization"
+
+
+def _create_tables(connection: Connection) -> None:
+    """Create the blacklist table and its original unique index on email"""
+    db.metadata.create_all(bind=connection)
+    connection.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_blacklist_email ON blacklist (email)"))
+
+
+def _add_email_canonical(connection: Connection) -> None:
+    """Add, backfill and uniquely index blacklist.email_canonical
+
+    When existing rows collide on their canonical form, the oldest keeps it
+    and the newer ones are left with NULL, so nothing is deleted and lookups
+    resolve to the original entry. On a large PostgreSQL table the index build
+    blocks writes for its duration; run it in a maintenance window.
+    """
+    table = BlacklistModel.__table__
+    columns = {column["name"] for column in inspect(connection).get_columns("blacklist")}
+    if "email_canonical" not in columns:
+        connection.execute(text("ALTER TABLE blacklist ADD COLUMN email_canonical VARCHAR(255)"))
+
+    canonicalize = email_canonicalizer(current_app.config)
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(table.c.id, table.c.email)
+            .where(table.c.id > last_id, table.c.email_canonical.is_(None))
+            .order_by(table.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            text("UPDATE blacklist SET email_canonical = :canonical WHERE id = :row_id"),
+            [{"canonical": canonicalize(row.email), "row_id": row.id} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    _clear_canonical_collisions(connection, email_canonical=None)
+
+    connection.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_blacklist_email_canonical ON blacklist (email_canonical)"
+    ))
+
+
+def _clear_canonical_collisions(connection: Connection, **cleared) -> None:
+    """Leave the oldest row of each canonical email indexed and clear the given columns of the others"""
+    collisions = connection.execute(text(
+        "SELECT b.id FROM blacklist b JOIN ("
+        "SELECT email_canonical, MIN(id) AS keep_id FROM blacklist "
+        "WHERE email_canonical IS NOT NULL GROUP BY email_canonical HAVING COUNT(*) > 1"
+        ") d ON b.email_canonical = d.email_canonical AND b.id <> d.keep_id"
+    )).scalars().all()
+    if collisions:
+        table = BlacklistModel.__table__
+        connection.execute(update(table).where(table.c.id.in_(collisions)).values(**cleared))
+        print(f"{len(collisions)} row(s) share a canonical email with an older entry and were left unindexed")
+
+
+def _add_email_digest(connection: Connection) -> None:
+    """Add and backfill blacklist.email_digest (BLAKE2b of email_canonical)
+
+    The unique index on it is managed by sync_lookup_key_indexes, since only
+    digest mode needs it.
+    """
+    table = BlacklistModel.__table__
+    columns = {column["name"] for column in inspect(connection).get_columns("blacklist")}
+    if "email_digest" not in columns:
+        column_type = "BYTEA" if connection.dialect.name == "postgresql" else "BLOB"
+        connection.execute(text(f"ALTER TABLE blacklist ADD COLUMN email_digest {column_type}"))
+
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(table.c.id, table.c.email_canonical)
+            .where(table.c.id > last_id, table.c.email_digest.is_(None), table.c.email_canonical.isnot(None))
+            .order_by(table.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            text("UPDATE blacklist SET email_digest = :digest WHERE id = :row_id"),
+            [{"digest": email_digest(row.email_canonical), "row_id": row.id} for row in rows],
+        )
+        last_id = rows[-1].id
+
+
+def sync_email_canonicalization(connection: Connection) -> None:
+    """Recompute canonical emails when the provider normalization setting changed
+
+    Rows canonicalized under the previous rules would otherwise stop matching
+    (turning normalization on leaves dotted and ``+tag`` Gmail rows under keys
+    no lookup produces). The unique indexes are dropped while the rows are
+    rewritten and recreated by sync_lookup_key_indexes; colliding rows are
+    resolved as in the original backfill, the oldest keeping the canonical
+    email. Databases upgraded before the setting was recorded are
+    recomputed once.
+    """
+    provider_rules = current_app.config.get("BLACKLIST_EMAIL_PROVIDER_NORMALIZATION", False)
+    setting = "true" if provider_rules else "false"
+    stored = connection.execute(
+        select(schema_settings.c.value).where(schema_settings.c.name == PROVIDER_NORMALIZATION_SETTING)
+    ).scalar()
+    if stored == setting:
+        return
+
+    connection.execute(text("DROP INDEX IF EXISTS ix_blacklist_email_canonical"))
+    connection.execute(text("DROP INDEX IF EXISTS ix_blacklist_email_digest"))
+
+    table = BlacklistModel.__table__
+    canonicalize = email_canonicalizer(current_app.config)
+    last_id, rewritten = 0, 0
+    while True:
+        rows = connection.execute(
+            select(table.c.id, table.c.email, table.c.email_canonical)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        changed = [
+            {"canonical": canonical, "digest": email_digest(canonical), "row_id": row.id}
+            for row, canonical in ((row, canonicalize(row.email)) for row in rows)
+            if canonical != row.email_canonical
+        ]
+        if changed:
+            connection.execute(
+                text("UPDATE blacklist SET email_canonical = :canonical, email_digest = :digest WHERE id = :row_id"),
+                changed,
+            )
+            rewritten += len(changed)
+        last_id = rows[-1].id
+
+    _clear_canonical_collisions(connection, email_canonical=None, email_digest=None)
+
+    if stored is None:
+        connection.execute(schema_settings.insert().values(name=PROVIDER_NORMALIZATION_SETTING, value=setting))
+    else:
+        connection.execute(
+            schema_settings.update()
+            .where(schema_settings.c.name == PROVIDER_NORMALIZATION_SETTING)
+            .values(value=setting)
+        )
+    print(f"Provider normalization set to {setting}: {rewritten} canonical email(s) recomputed")
+
+
+def sync_lookup_key_indexes(connection: Connection) -> None:
+    """Keep only the indexes the configured BLACKLIST_LOOKUP_KEY needs
+
+    In digest mode uniqueness and lookups rest on the email_digest index and
+    the varchar indexes on email and email_canonical are dropped, leaving the
+    plaintext unindexed; in canonical mode the email_canonical index and the
+    original unique index on email are (re)created and the digest one dropped. Runs at the end of every upgrade,
+    so switching modes only takes a configuration change and an upgrade.
+    """
+    if current_app.config.get("BLACKLIST_LOOKUP_KEY", "canonical") == "digest":
+        connection.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_blacklist_email_digest ON blacklist (email_digest)"
+        ))
+        connection.execute(text("DROP INDEX IF EXISTS ix_blacklist_email_canonical"))
+        connection.execute(text("DROP INDEX IF EXISTS ix_blacklist_email"))
+    else:
+        connection.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_blacklist_email_canonical ON blacklist (email_canonical)"
+        ))
+        connection.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_blacklist_email ON blacklist (email)"))
+        connection.execute(text("DROP INDEX IF EXISTS ix_blacklist_email_digest"))
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "create blacklist table", _create_tables),
+    (2, "add canonical email column", _add_email_canonical),
+    (3, "add email digest column", _add_email_digest),
+]
+
+
+def applied_versions(connection: Connection) -> List[int]:
+    """Versions already recorded in schema_migrations"""
+    migration_metadata.create_all(bind=connection)
+    return [row.version for row in connection.execute(schema_migrations.select().order_by(schema_migrations.c.version))]
+
+
+def upgrade() -> List[int]:
+    """Apply pending migrations in order and return their versions (requires an app context)"""
+    applied = []
+    for version, description, migrate in MIGRATIONS:
+        with db.engine.begin() as connection:
+            if connection.dialect.name == "postgresql":
+                connection.execute(text(f"SELECT pg_advisory_xact_lock({MIGRATION_LOCK_ID})"))
+            if version in applied_versions(connection):
+                continue
+            migrate(connection)
+            connection.execute(schema_migrations.insert().values(
+                version=version, description=description, applied_at=datetime.utcnow()
+            ))
+        applied.append(version)
+        print(f"Applied migration {version}: {description}")
+
+    with db.engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text(f"SELECT pg_advisory_xact_lock({MIGRATION_LOCK_ID})"))
+        migration_metadata.create_all(bind=connection)
+        sync_email_canonicalization(connection)
+        sync_lookup_key_indexes(connection)
+    return applied
+
+
+def current_version() -> int:
+    """Latest applied migration version, 0 for an empty database (requires an app context)"""
+    with db.engine.begin() as connection:
+        versions = applied_versions(connection)
+    return max(versions, default=0)
+
 
 def create_blacklist_table():
-    """Create blacklist table"""
-    with current_app.app_context():
-        # Create the blacklist table
-        db.create_all()
-        print("Blacklist table created successfully")
+    """Create the blacklist table with the lookup indexes of the configured BLACKLIST_LOOKUP_KEY
+
+    Skips the migration history, so it only suits throwaway databases such as
+    the test suite's; deployments run ``upgrade``.
+    """
+    with db.engine.begin() as connection:
+        db.metadata.create_all(bind=connection)
+        sync_lookup_key_indexes(connection)
 
 
 def drop_blacklist_table():
@@ -20,10 +280,23 @@ def drop_blacklist_table():
         print("Blacklist table dropped successfully")
 
 
-if __name__ == "__main__":
-    # This script can be run directly for manual migrations
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the blacklist database schema")
+    parser.add_argument("command", choices=("upgrade", "current"), help="Apply pending migrations or show the version")
+    parser.add_argument("--config", default="default", help="Configuration name")
+    args = parser.parse_args(argv)
+
     from src.app import create_app
-    
-    app = create_app()
+
+    app = create_app(args.config)
     with app.app_context():
-        create_blacklist_table()
\ No newline at end of file
+        if args.command == "upgrade":
+            applied = upgrade()
+            print(f"Schema at version {current_version()} ({len(applied)} migration(s) applied)")
+        else:
+            print(current_version())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,35 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from src.domain.canonical_email import EMAIL_DIGEST_SIZE, canonicalize_email, email_digest
 
 db = SQLAlchemy()
 
 
+def _default_email_canonical(context):
+    """Canonical email for rows inserted without one (no provider rules)"""
+    return canonicalize_email(context.get_current_parameters()["email"])
+
+
+def _default_email_digest(context):
+    """Digest of the canonical email for rows inserted without one"""
+    parameters = context.get_current_parameters()
+    return email_digest(parameters.get("email_canonical") or canonicalize_email(parameters["email"]))
+
+
 class BlacklistModel(db.Model):
     """SQLAlchemy model for blacklist entries"""
     
     __tablename__ = 'blacklist'
     
     id = db.Column(db.Integer, primary_key=True)
-    email = db.Column(db.String(255), nullable=False, unique=True, index=True)
+    # No unique indexes are declared here: the migrations create the ones the
+    # configured BLACKLIST_LOOKUP_KEY looks up by (see sync_lookup_key_indexes).
+    email = db.Column(db.String(255), nullable=False)
+    # Lowercased/normalized email used for lookups and uniqueness (see canonicalize_email).
+    # Only NULL for legacy rows whose canonical form collided with an older entry.
+    email_canonical = db.Column(db.String(255), nullable=True, default=_default_email_canonical)
+    # BLAKE2b digest of email_canonical, the lookup key when BLACKLIST_LOOKUP_KEY=digest.
+    email_digest = db.Column(db.LargeBinary(EMAIL_DIGEST_SIZE), nullable=True, default=_default_email_digest)
     app_uuid = db.Column(db.String(36), nullable=False)
     blocked_reason = db.Column(db.Text, nullable=False)
     ip = db.Column(db.String(45), nullable=True)  # Supports both IPv4 and IPv6
@@ -0,0 +1,103 @@
+import threading
+import time
+from typing import Dict, Any
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMetrics:
+    """Thread-safe counters describing connection pool usage"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+
+    def increment(self, name: str, amount=1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 6),
+                "timeouts": self.timeouts,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how often and how long checkouts wait for a connection
+
+    A checkout waits when every pooled connection is in use and the overflow
+    is exhausted; those are the requests that would benefit from a larger pool.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+        self._depth = threading.local()
+        event.listen(self, "checkout", self._on_checkout)
+        event.listen(self, "connect", self._on_connect)
+        event.listen(self, "invalidate", self._on_invalidate)
+
+    def _do_get(self):
+        # QueuePool._do_get recurses on contention; only time the outermost call
+        depth = getattr(self._depth, "value", 0)
+        if depth:
+            return super()._do_get()
+
+        will_wait = self._max_overflow > -1 and self.overflow() >= self._max_overflow and self.checkedin() == 0
+        started = time.perf_counter()
+        self._depth.value = 1
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.increment("timeouts")
+            raise
+        finally:
+            self._depth.value = 0
+            if will_wait:
+                self.metrics.increment("waits")
+                self.metrics.increment("wait_seconds", time.perf_counter() - started)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.metrics.increment("checkouts")
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.metrics.increment("connects")
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.metrics.increment("invalidations")
+
+
+def instrument_engine_options(engine_options: Dict[str, Any]) -> Dict[str, Any]:
+    """Return engine options using InstrumentedQueuePool unless a pool class is set
+
+    Flask-SQLAlchemy still swaps in StaticPool for in-memory SQLite.
+    """
+    options = dict(engine_options or {})
+    options.setdefault("poolclass", InstrumentedQueuePool)
+    return options
+
+
+def get_pool_status(engine) -> Dict[str, Any]:
+    """Describe the current state of an engine's connection pool"""
+    pool = engine.pool
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, name):
+            status[name.replace("checked", "checked_")] = getattr(pool, name)()
+    if hasattr(pool, "_max_overflow"):
+        status["max_overflow"] = pool._max_overflow
+    if hasattr(pool, "metrics"):
+        status.update(pool.metrics.snapshot())
+    return status
@@ -0,0 +1,190 @@
+"""
+On-demand cProfile sampling of live requests
+
+A request is profiled when it is picked by the configured sample rate or
+carries an ``X-Profile-Request`` header signed with ``PROFILING_SECRET``
+(hex HMAC-SHA256 of ``"<METHOD> <path>"``). Profiles are written to
+``PROFILING_DIR`` as ``<timestamp>_<method>_<route>_<duration>ms_<pid>.prof``
+and the oldest files are removed once the directory exceeds
+``PROFILING_MAX_BYTES``. Open them with ``python -m pstats`` or snakeviz.
+
+The sample rate can be changed at runtime by writing it to the control file
+(``PUT /admin/profiling`` does this, for requests signed like the header
+above), which every worker re-reads at most once per second. With a zero sample rate and no signed header the per-request cost
+is a float comparison.
+
+Only one request per process is profiled at a time: from Python 3.12 cProfile
+hooks into the process-wide ``sys.monitoring``, so a second profiler cannot be
+enabled while one is running, and a profile taken beside another would mix in
+the other threads' work anyway. Requests sampled while a profile is running are
+served unprofiled and counted in ``profiles_skipped``.
+"""
+import cProfile
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Optional, Dict, Any
+from flask import g, request
+
+PROFILE_HEADER = "X-Profile-Request"
+CONTROL_CHECK_INTERVAL = 1.0
+
+# Held while a request of this process is being profiled
+_profile_lock = threading.Lock()
+
+
+def sign_profile_request(secret: str, method: str, path: str) -> str:
+    """Return the X-Profile-Request header value for a request"""
+    return hmac.new(secret.encode("utf-8"), f"{method.upper()} {path}".encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+class RequestProfiler:
+    """Samples requests with cProfile and writes the profiles to disk"""
+
+    def __init__(
+        self,
+        output_dir: str,
+        sample_rate: float = 0.0,
+        max_bytes: int = 100 * 1024 * 1024,
+        secret: Optional[str] = None,
+        control_file: Optional[str] = None,
+    ):
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.secret = secret
+        self.control_file = control_file
+        self._control_mtime: Optional[float] = None
+        self._next_control_check = 0.0
+        self._cleanup_lock = threading.Lock()
+        self.profiles_written = 0
+        self.profiles_skipped = 0
+
+    def init_app(self, app) -> None:
+        """Register the request hooks on a Flask app"""
+        app.before_request(self._start)
+        app.teardown_request(self._stop)
+
+    def set_sample_rate(self, sample_rate: float) -> None:
+        """Change the sample rate for every worker sharing the control file"""
+        self.sample_rate = sample_rate
+        if self.control_file:
+            os.makedirs(os.path.dirname(os.path.abspath(self.control_file)), exist_ok=True)
+            tmp_path = f"{self.control_file}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                json.dump({"sample_rate": sample_rate}, handle)
+            os.replace(tmp_path, self.control_file)
+
+    def status(self) -> Dict[str, Any]:
+        """Describe the current profiling settings"""
+        self._refresh_control()
+        return {
+            "sample_rate": self.sample_rate,
+            "output_dir": self.output_dir,
+            "max_bytes": self.max_bytes,
+            "signed_header_enabled": bool(self.secret),
+            "profiles_written": self.profiles_written,
+            "profiles_skipped": self.profiles_skipped,
+        }
+
+    def should_profile(self) -> bool:
+        """Decide whether the current request is profiled"""
+        self._refresh_control()
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return True
+        return self.is_signed_request()
+
+    def is_signed_request(self) -> bool:
+        """Whether the current request carries an X-Profile-Request header signed with the secret"""
+        if not self.secret:
+            return False
+        signature = request.headers.get(PROFILE_HEADER)
+        if not signature:
+            return False
+        expected = sign_profile_request(self.secret, request.method, request.path)
+        return hmac.compare_digest(signature, expected)
+
+    def _refresh_control(self) -> None:
+        if not self.control_file:
+            return
+        now = time.monotonic()
+        if now < self._next_control_check:
+            return
+        self._next_control_check = now + CONTROL_CHECK_INTERVAL
+
+        try:
+            mtime = os.stat(self.control_file).st_mtime
+        except OSError:
+            return
+        if mtime == self._control_mtime:
+            return
+
+        try:
+            with open(self.control_file, encoding="utf-8") as handle:
+                self.sample_rate = float(json.load(handle).get("sample_rate", 0.0))
+            self._control_mtime = mtime
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def _start(self):
+        if not self.should_profile():
+            return
+        if not _profile_lock.acquire(blocking=False):
+            self.profiles_skipped += 1
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiling tool (a debugger, coverage) holds sys.monitoring
+            _profile_lock.release()
+            self.profiles_skipped += 1
+            return
+        g._profile = profile
+        g._profile_started = time.perf_counter()
+
+    def _stop(self, exc=None):
+        profile = g.pop("_profile", None)
+        if profile is None:
+            return
+        try:
+            profile.disable()
+        finally:
+            _profile_lock.release()
+        duration_ms = (time.perf_counter() - g.pop("_profile_started")) * 1000
+
+        route = request.url_rule.rule if request.url_rule else request.path
+        route = re.sub(r"[^A-Za-z0-9]+", "-", route).strip("-") or "root"
+        filename = f"{time.strftime('%Y%m%dT%H%M%S')}_{request.method}_{route}_{duration_ms:.0f}ms_{os.getpid()}.prof"
+
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            profile.dump_stats(os.path.join(self.output_dir, filename))
+            self.profiles_written += 1
+            self._enforce_disk_cap()
+        except OSError:
+            pass
+
+    def _enforce_disk_cap(self) -> None:
+        """Delete the oldest profiles until the directory fits in max_bytes"""
+        with self._cleanup_lock:
+            profiles = []
+            for entry in os.scandir(self.output_dir):
+                if entry.name.endswith(".prof") and entry.is_file():
+                    stat = entry.stat()
+                    profiles.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in profiles)
+            for _, size, path in sorted(profiles):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
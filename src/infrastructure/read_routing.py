@@ -0,0 +1,99 @@
+"""
+Routing of blacklist reads to read replicas
+
+``DATABASE_READ_URL`` lists one or more replicas, registered as the
+``replica_<n>`` SQLAlchemy binds. ``BlacklistRepository`` asks the router for
+an engine before each read: replicas are used round robin, except
+
+- for a client (by IP) that wrote within ``read_your_writes_window`` seconds,
+  which reads from the primary so it sees its own insert despite replication
+  lag, and
+- for a replica whose last query failed, which is skipped for
+  ``retry_interval`` seconds while reads go to the other replicas or the
+  primary.
+
+Recent writes are kept in a small table of timestamps indexed by a hash of the
+client IP, in anonymous shared memory created with the app. Under gunicorn
+with ``preload_app`` the workers fork from the master and share it, so a write
+served by one worker routes that client's reads to the primary in every
+worker. Hash collisions only send some extra reads to the primary.
+"""
+import itertools
+import mmap
+import struct
+import threading
+import time
+import zlib
+from typing import Optional, Dict, Any, List
+from sqlalchemy.engine import Engine
+from ..utils.request_utils import get_client_ip
+from .models import db
+
+REPLICA_BIND_PREFIX = "replica_"
+_TIMESTAMP = struct.Struct("d")
+
+
+def replica_bind_keys(binds: Optional[Dict[str, Any]]) -> List[str]:
+    """Keys of the read replica binds among the configured SQLALCHEMY_BINDS"""
+    return sorted(key for key in (binds or {}) if key and key.startswith(REPLICA_BIND_PREFIX))
+
+
+class ReadReplicaRouter:
+    """Chooses the engine for each blacklist read: a healthy replica or the primary"""
+
+    def __init__(
+        self,
+        bind_keys: List[str],
+        read_your_writes_window: float = 5.0,
+        retry_interval: float = 30.0,
+        write_slots: int = 65536,
+    ):
+        self._bind_keys = list(bind_keys)
+        self._window = read_your_writes_window
+        self._retry_interval = retry_interval
+        self._write_slots = max(1, write_slots)
+        self._writes = mmap.mmap(-1, self._write_slots * _TIMESTAMP.size)
+        self._down_until: Dict[str, float] = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def read_engine(self) -> Optional[Engine]:
+        """Engine of the replica to read from, or None to read from the primary (requires an app context)"""
+        if self._window > 0 and self._wrote_recently(get_client_ip()):
+            return None
+
+        now = time.monotonic()
+        healthy = [key for key in self._bind_keys if self._down_until.get(key, 0.0) <= now]
+        if not healthy:
+            return None
+        return db.engines[healthy[next(self._counter) % len(healthy)]]
+
+    def record_write(self) -> None:
+        """Route the current client's reads to the primary for the read-your-writes window"""
+        client_ip = get_client_ip()
+        if client_ip is not None:
+            _TIMESTAMP.pack_into(self._writes, self._slot(client_ip), time.time())
+
+    def mark_unhealthy(self, engine: Engine) -> None:
+        """Skip the replica behind ``engine`` until the retry interval has passed"""
+        for key in self._bind_keys:
+            if db.engines.get(key) is engine:
+                with self._lock:
+                    self._down_until[key] = time.monotonic() + self._retry_interval
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the replicas and which of them are currently skipped"""
+        now = time.monotonic()
+        return {
+            "replicas": len(self._bind_keys),
+            "unhealthy": sorted(key for key in self._bind_keys if self._down_until.get(key, 0.0) > now),
+        }
+
+    def _wrote_recently(self, client_ip: Optional[str]) -> bool:
+        if client_ip is None:
+            return False
+        (written_at,) = _TIMESTAMP.unpack_from(self._writes, self._slot(client_ip))
+        return time.time() - written_at < self._window
+
+    def _slot(self, client_ip: str) -> int:
+        return (zlib.crc32(client_ip.encode("utf-8")) % self._write_slots) * _TIMESTAMP.size
@@ -1,18 +1,53 @@
-from typing import Optional
-from sqlalchemy.exc import IntegrityError
+from datetime import datetime
+from typing import Any, Callable, Optional, Iterator, List, Dict
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from ..domain.canonical_email import canonicalize_email, email_digest
 from ..domain.entities import Blacklist
 from ..domain.ports import BlacklistRepositoryPort
 from .models import db, BlacklistModel
+from .list_version import BlacklistListVersion
+from .read_routing import ReadReplicaRouter
 
 
 class BlacklistRepository(BlacklistRepositoryPort):
-    """SQLAlchemy implementation of BlacklistRepositoryPort"""
+    """SQLAlchemy implementation of BlacklistRepositoryPort
+
+    Lookups and uniqueness use the canonical email, so differently cased or
+    formatted spellings of an address match the same entry. With
+    ``lookup_key="digest"`` lookups probe the 16-byte ``email_digest`` index
+    instead of the ``email_canonical`` varchar index. With a ``read_router``,
+    reads go to a read replica when the router picks one and fall back to the
+    primary if that replica fails. Inserts invalidate the cached
+    ``list_version``, if any.
+    """
+
+    def __init__(
+        self,
+        batch_chunk_size: int = 500,
+        lookup_chunk_size: int = 500,
+        canonicalize: Callable[[str], str] = canonicalize_email,
+        lookup_key: str = "canonical",
+        read_router: Optional[ReadReplicaRouter] = None,
+        list_version: Optional[BlacklistListVersion] = None,
+    ):
+        self._batch_chunk_size = max(1, batch_chunk_size)
+        self._lookup_chunk_size = max(1, lookup_chunk_size)
+        self._canonicalize = canonicalize
+        self._use_digest = lookup_key == "digest"
+        self._lookup_column = BlacklistModel.email_digest if self._use_digest else BlacklistModel.email_canonical
+        self._read_router = read_router
+        self._list_version = list_version
 
     def add_email_to_blacklist(self, blacklist: Blacklist) -> bool:
         """Add an email to the blacklist"""
+        canonical = self._canonicalize(blacklist.email)
         try:
             blacklist_model = BlacklistModel(
                 email=blacklist.email,
+                email_canonical=canonical,
+                email_digest=email_digest(canonical),
                 app_uuid=blacklist.app_uuid,
                 blocked_reason=blacklist.blocked_reason,
                 ip=blacklist.ip,
@@ -21,6 +56,7 @@ class BlacklistRepository(BlacklistRepositoryPort):
             
             db.session.add(blacklist_model)
             db.session.commit()
+            self._record_write()
             return True
         except IntegrityError:
             # Email already exists in blacklist
@@ -30,20 +66,228 @@ class BlacklistRepository(BlacklistRepositoryPort):
             db.session.rollback()
             return False
 
-    def is_email_blacklisted(self, email: str) -> Optional[Blacklist]:
-        """Check if an email is in the blacklist and return the blacklist entry"""
+    def add_emails_to_blacklist(self, blacklists: List[Blacklist]) -> List[bool]:
+        """Add several emails in one transaction, returning whether each one was created
+
+        Rows are inserted in chunks with a multi-row INSERT ... ON CONFLICT DO
+        NOTHING, so existing emails are skipped instead of aborting the batch.
+        Repeated emails within the batch (compared by canonical form) only
+        count as created once.
+        """
+        canonical_emails = [self._canonicalize(blacklist.email) for blacklist in blacklists]
+        first_index = {}
+        for index, canonical in enumerate(canonical_emails):
+            first_index.setdefault(canonical, index)
+        unique = [blacklists[index] for index in first_index.values()]
+
+        created = set()
         try:
-            blacklist_model = BlacklistModel.query.filter_by(email=email).first()
-            
-            if blacklist_model:
-                return Blacklist(
-                    email=blacklist_model.email,
-                    app_uuid=blacklist_model.app_uuid,
-                    blocked_reason=blacklist_model.blocked_reason,
-                    ip=blacklist_model.ip,
-                    created_at=blacklist_model.created_at
-                )
-            
-            return None
+            for start in range(0, len(unique), self._batch_chunk_size):
+                chunk = unique[start:start + self._batch_chunk_size]
+                created.update(self._insert_ignoring_duplicates(chunk))
+            db.session.commit()
         except Exception:
-            return None
+            db.session.rollback()
+            raise
+        self._record_write()
+
+        return [
+            canonical in created and first_index[canonical] == index
+            for index, canonical in enumerate(canonical_emails)
+        ]
+
+    def _insert_ignoring_duplicates(self, chunk: List[Blacklist]) -> List[str]:
+        """Insert a chunk of rows, returning the canonical emails that were actually inserted"""
+        rows = []
+        for blacklist in chunk:
+            canonical = self._canonicalize(blacklist.email)
+            rows.append({
+                "email": blacklist.email,
+                "email_canonical": canonical,
+                "email_digest": email_digest(canonical),
+                "app_uuid": blacklist.app_uuid,
+                "blocked_reason": blacklist.blocked_reason,
+                "ip": blacklist.ip,
+                "created_at": blacklist.created_at,
+            })
+
+        dialect = db.session.get_bind().dialect.name
+        if dialect == "postgresql":
+            statement = postgresql.insert(BlacklistModel).values(rows).on_conflict_do_nothing()
+        elif dialect == "sqlite":
+            statement = sqlite.insert(BlacklistModel).values(rows).on_conflict_do_nothing()
+        else:
+            return self._insert_row_by_row(rows)
+
+        result = db.session.execute(statement.returning(BlacklistModel.email_canonical))
+        return [canonical for (canonical,) in result]
+
+    def _insert_row_by_row(self, rows: List[dict]) -> List[str]:
+        """Fallback for dialects without ON CONFLICT support"""
+        inserted = []
+        for row in rows:
+            try:
+                with db.session.begin_nested():
+                    db.session.add(BlacklistModel(**row))
+                inserted.append(row["email_canonical"])
+            except IntegrityError:
+                pass
+        return inserted
+
+    def is_email_blacklisted(self, email: str) -> Optional[Blacklist]:
+        """Check if an email is in the blacklist and return the blacklist entry
+
+        Database errors propagate: a failed lookup must not read as "not blacklisted".
+        """
+        statement = select(BlacklistModel).where(self._lookup_column == self._lookup_value(email)).limit(1)
+        blacklist_model = self._read(lambda options: db.session.scalars(statement, **options).first())
+
+        if blacklist_model:
+            return self._to_entity(blacklist_model)
+
+        return None
+
+    def get_blacklisted_emails(self, emails: List[str]) -> Dict[str, Blacklist]:
+        """Return the blacklist entries for the given emails using chunked IN queries
+
+        The result is keyed by the emails as given, each matched on its canonical form.
+        """
+        requested = {}
+        for email in dict.fromkeys(emails):
+            requested.setdefault(self._lookup_value(email), []).append(email)
+        lookup_values = list(requested)
+
+        found = {}
+        for start in range(0, len(lookup_values), self._lookup_chunk_size):
+            statement = select(BlacklistModel).where(
+                self._lookup_column.in_(lookup_values[start:start + self._lookup_chunk_size])
+            )
+            for blacklist_model in self._read(lambda options: db.session.scalars(statement, **options).all()):
+                entity = self._to_entity(blacklist_model)
+                for email in requested[getattr(blacklist_model, self._lookup_column.key)]:
+                    found[email] = entity
+        return found
+
+    def _read(self, fetch: Callable[[Dict[str, Any]], Any]) -> Any:
+        """Run ``fetch`` on the replica the router picks, or on the primary
+
+        ``fetch`` receives the keyword arguments that bind its statement to the
+        chosen engine. A replica that raises a database error is reported to
+        the router and the read is retried on the primary.
+        """
+        engine = self._read_router.read_engine() if self._read_router else None
+        if engine is not None:
+            try:
+                return fetch({"bind_arguments": {"bind": engine}})
+            except DBAPIError:
+                db.session.rollback()
+                self._read_router.mark_unhealthy(engine)
+        return fetch({})
+
+    def _record_write(self) -> None:
+        if self._read_router is not None:
+            self._read_router.record_write()
+        if self._list_version is not None:
+            self._list_version.invalidate()
+
+    def _lookup_value(self, email: str):
+        """Value of the lookup key column for an email"""
+        canonical = self._canonicalize(email)
+        return email_digest(canonical) if self._use_digest else canonical
+
+    def iter_blacklist(
+        self,
+        app_uuid: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        page_size: int = 1000,
+    ) -> Iterator[Blacklist]:
+        """Iterate over blacklist entries using keyset pagination on id
+
+        Each page is fetched with ``WHERE id > :last_id ORDER BY id LIMIT :n``,
+        so memory stays bounded by the page size regardless of the table size
+        and no OFFSET scan is ever needed.
+        """
+        columns = (
+            BlacklistModel.id,
+            BlacklistModel.email,
+            BlacklistModel.app_uuid,
+            BlacklistModel.blocked_reason,
+            BlacklistModel.ip,
+            BlacklistModel.created_at,
+        )
+        filters = []
+        if app_uuid:
+            filters.append(BlacklistModel.app_uuid == app_uuid)
+        if created_from:
+            filters.append(BlacklistModel.created_at >= created_from)
+        if created_to:
+            filters.append(BlacklistModel.created_at < created_to)
+
+        last_id = 0
+        while True:
+            statement = (
+                select(*columns)
+                .where(BlacklistModel.id > last_id, *filters)
+                .order_by(BlacklistModel.id)
+                .limit(page_size)
+            )
+            rows = self._read(lambda options: db.session.execute(statement, **options).all())
+            for row in rows:
+                last_id = row.id
+                yield Blacklist(
+                    email=row.email,
+                    app_uuid=row.app_uuid,
+                    blocked_reason=row.blocked_reason,
+                    ip=row.ip,
+                    created_at=row.created_at
+                )
+            if len(rows) < page_size:
+                return
+
+    def fetch_rows_after(self, last_id: int, limit: int = 10000) -> List[Any]:
+        """Rows with an id above ``last_id`` in id order, as plain column tuples
+
+        Used to load and incrementally sync in-memory copies of the table; rows
+        left without a canonical email by the canonical-email backfill are skipped.
+        """
+        statement = (
+            select(
+                BlacklistModel.id,
+                BlacklistModel.email,
+                BlacklistModel.email_canonical,
+                BlacklistModel.app_uuid,
+                BlacklistModel.blocked_reason,
+                BlacklistModel.ip,
+                BlacklistModel.created_at,
+            )
+            .where(BlacklistModel.id > last_id, BlacklistModel.email_canonical.isnot(None))
+            .order_by(BlacklistModel.id)
+            .limit(limit)
+        )
+        return self._read(lambda options: db.session.execute(statement, **options).all())
+
+    def count_rows(self) -> int:
+        """Number of rows ``fetch_rows_after`` can return, to reconcile in-memory copies with the table"""
+        statement = select(func.count()).select_from(BlacklistModel).where(BlacklistModel.email_canonical.isnot(None))
+        return self._read(lambda options: db.session.execute(statement, **options).scalar())
+
+    @staticmethod
+    def _to_entity(blacklist_model: BlacklistModel) -> Blacklist:
+        return Blacklist(
+            email=blacklist_model.email,
+            app_uuid=blacklist_model.app_uuid,
+            blocked_reason=blacklist_model.blocked_reason,
+            ip=blacklist_model.ip,
+            created_at=blacklist_model.created_at
+        )
+
+    def iter_emails(self, batch_size: int = 5000) -> Iterator[str]:
+        """Iterate over the canonical form of every blacklisted email"""
+        statement = (
+            select(BlacklistModel.email_canonical)
+            .where(BlacklistModel.email_canonical.isnot(None))
+            .execution_options(yield_per=batch_size)
+        )
+        for (email,) in self._read(lambda options: db.session.execute(statement, **options)):
+            yield email
@@ -0,0 +1,397 @@
+"""
+Shared, memory-mapped table of blacklisted email digests
+
+Usage:
+    python -m src.infrastructure.shared_digest_table build [--config production]
+        [--path FILE] [--loop SECONDS]
+
+With ``BLACKLIST_REPOSITORY_MODE=shared`` the set of blacklisted emails lives
+in one file: an open-addressing hash table (linear probing, load factor at
+most 0.5, or 0.75 when rows pour in during a build) of the 16-byte BLAKE2b digests of their canonical forms. Every
+worker maps it read-only, so its pages sit once in the page cache however
+many workers there are, instead of one in-process copy per worker.
+
+The ``build`` command writes a new table next to the old one and renames it
+into place, so readers see either the old or the new file, never a partial
+one. Under gunicorn the master starts it with ``--loop`` as a sidecar process
+(see ``gunicorn.conf.py``); it can equally run from cron or a separate
+container sharing the volume. Workers notice the swap by checking the file's
+inode at most once per ``check_interval``.
+
+Rows inserted after a table was built are covered by a small per-worker delta:
+digests of this worker's own inserts plus rows above the table's high-water
+mark, polled from the database every ``poll_interval`` seconds by whichever
+request thread finds the poll due. Like the in-memory mode, each poll re-reads
+the last ``rescan_ids`` ids below the mark, and every ``reconcile_interval``
+seconds a row count taken before the poll is compared with the table plus the
+delta; a shortfall, left by a transaction that committed further out of id
+order, re-reads the whole table into the delta. The table
+answers membership only: misses are answered without a query, hits fetch the
+entry from the database.
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Optional, Dict, Any, Iterable, Iterator, List, Set
+from flask import current_app
+from ..domain.canonical_email import EMAIL_DIGEST_SIZE, canonicalize_email, email_digest
+from ..domain.entities import Blacklist
+from ..domain.ports import BlacklistRepositoryPort
+from .repositories import BlacklistRepository
+
+MAGIC = b"BLDT"
+FORMAT_VERSION = 1
+# magic, version, slot count, entries, high-water mark, built at (unix time)
+HEADER = struct.Struct("<4sIQQQd")
+HEADER_SIZE = 64
+EMPTY_SLOT = bytes(EMAIL_DIGEST_SIZE)
+
+
+def slot_count_for(entries: int) -> int:
+    """Power-of-two slot count keeping the load factor at or below 0.5"""
+    slots = 16
+    while slots < entries * 2:
+        slots *= 2
+    return slots
+
+
+class DigestTableWriter:
+    """Digest table written in place into a temporary file through a writable mapping
+
+    The table lives in the page cache rather than on the heap, so building it
+    takes no more process memory than a batch of rows. It is sized for
+    ``expected_entries``; ``full`` turns true once the load factor reaches
+    0.75, after which the caller stops adding and later rows are left to the
+    workers' deltas.
+    """
+
+    def __init__(self, path: str, expected_entries: int):
+        self.path = path
+        self.slots = slot_count_for(expected_entries)
+        self.entries = 0
+        self._mask = self.slots - 1
+        self._temporary = f"{path}.tmp.{os.getpid()}"
+        self._handle = open(self._temporary, "w+b")
+        self._handle.truncate(HEADER_SIZE + self.slots * EMAIL_DIGEST_SIZE)
+        self._map = mmap.mmap(self._handle.fileno(), 0)
+
+    @property
+    def full(self) -> bool:
+        return self.entries * 4 >= self.slots * 3
+
+    def add(self, digest: bytes) -> bool:
+        """Store a digest, returning whether it was new"""
+        slot = int.from_bytes(digest[:8], "little") & self._mask
+        while True:
+            offset = HEADER_SIZE + slot * EMAIL_DIGEST_SIZE
+            current = self._map[offset:offset + EMAIL_DIGEST_SIZE]
+            if current == EMPTY_SLOT:
+                self._map[offset:offset + EMAIL_DIGEST_SIZE] = digest
+                self.entries += 1
+                return True
+            if current == digest:
+                return False
+            slot = (slot + 1) & self._mask
+
+    def commit(self, high_water_mark: int) -> int:
+        """Write the header and rename the table into place, returning the number of entries"""
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, self.slots, self.entries, high_water_mark, time.time())
+        self._map[:HEADER_SIZE] = header.ljust(HEADER_SIZE, b"\0")
+        self._map.flush()
+        self._close()
+        os.replace(self._temporary, self.path)
+        return self.entries
+
+    def discard(self) -> None:
+        """Remove the temporary file of a table that is not committed"""
+        self._close()
+        try:
+            os.unlink(self._temporary)
+        except FileNotFoundError:
+            pass
+
+    def _close(self) -> None:
+        if not self._map.closed:
+            self._map.close()
+            os.fsync(self._handle.fileno())
+            self._handle.close()
+
+
+def write_digest_table(path: str, digests: List[bytes], high_water_mark: int) -> int:
+    """Write a table of ``digests`` to ``path`` atomically, returning the number of entries"""
+    writer = DigestTableWriter(path, len(digests))
+    try:
+        for digest in digests:
+            writer.add(digest)
+    except BaseException:
+        writer.discard()
+        raise
+    return writer.commit(high_water_mark)
+
+
+def build_from_repository(repository: BlacklistRepository, path: str, batch_size: int = 10000) -> int:
+    """Build the table from every blacklisted email, streaming rows into it (requires an app context)
+
+    The table is sized from a row count taken first. Should rows inserted
+    meanwhile fill it up, the build stops early and records the last id it
+    stored as the high-water mark, so workers poll the rest into their deltas.
+    """
+    writer = DigestTableWriter(path, repository.count_rows())
+    last_id = 0
+    try:
+        while not writer.full:
+            rows = repository.fetch_rows_after(last_id, batch_size)
+            for row in rows:
+                if writer.full:
+                    break
+                writer.add(email_digest(row.email_canonical))
+                last_id = row.id
+            if len(rows) < batch_size:
+                break
+    except BaseException:
+        writer.discard()
+        raise
+    return writer.commit(last_id)
+
+
+class DigestTable:
+    """Read-only view of a digest table file"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as handle:
+            stat = os.fstat(handle.fileno())
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, slots, entries, high_water_mark, built_at = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a blacklist digest table")
+        self.identity = (stat.st_dev, stat.st_ino)
+        self.slots = slots
+        self.entries = entries
+        self.high_water_mark = high_water_mark
+        self.built_at = built_at
+        self._mask = slots - 1
+
+    def __contains__(self, digest: bytes) -> bool:
+        slot = int.from_bytes(digest[:8], "little") & self._mask
+        while True:
+            offset = HEADER_SIZE + slot * EMAIL_DIGEST_SIZE
+            current = self._map[offset:offset + EMAIL_DIGEST_SIZE]
+            if current == digest:
+                return True
+            if current == EMPTY_SLOT:
+                return False
+            slot = (slot + 1) & self._mask
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._map)
+
+
+class SharedTableBlacklistRepository(BlacklistRepositoryPort):
+    """Answers misses from the shared digest table plus a per-worker delta
+
+    While the table file is missing or unreadable, or the delta has not been
+    refreshed for ``max_staleness`` seconds, lookups go to the repository.
+    """
+
+    def __init__(
+        self,
+        repository: BlacklistRepository,
+        path: str,
+        check_interval: float = 1.0,
+        poll_interval: float = 1.0,
+        max_staleness: float = 30.0,
+        batch_size: int = 10000,
+        rescan_ids: int = 1000,
+        reconcile_interval: float = 60.0,
+        canonicalize: Callable[[str], str] = canonicalize_email,
+    ):
+        self._repository = repository
+        self._path = path
+        self._check_interval = check_interval
+        self._poll_interval = poll_interval
+        self._max_staleness = max_staleness
+        self._batch_size = max(1, batch_size)
+        self._rescan_ids = max(0, rescan_ids)
+        self._reconcile_interval = reconcile_interval
+        self._canonicalize = canonicalize
+        self._table: Optional[DigestTable] = None
+        self._delta: Set[bytes] = set()
+        self._delta_mark = 0
+        self._checked_at = float("-inf")
+        self._polled_at = float("-inf")
+        self._reconcile_at = 0.0
+        self._reconciles = 0
+        self._refresh_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._swaps = 0
+        self._fallback_reads = 0
+
+    def add_email_to_blacklist(self, blacklist: Blacklist) -> bool:
+        """Add an email through the repository and to the delta on success"""
+        success = self._repository.add_email_to_blacklist(blacklist)
+        if success:
+            self._add_to_delta([blacklist.email])
+        return success
+
+    def add_emails_to_blacklist(self, blacklists: List[Blacklist]) -> List[bool]:
+        """Add several emails through the repository and the created ones to the delta"""
+        created = self._repository.add_emails_to_blacklist(blacklists)
+        self._add_to_delta([blacklist.email for blacklist, was_created in zip(blacklists, created) if was_created])
+        return created
+
+    def is_email_blacklisted(self, email: str) -> Optional[Blacklist]:
+        """Return None for emails absent from the table and delta, otherwise query the repository"""
+        if not self._usable():
+            self._fallback_reads += 1
+            return self._repository.is_email_blacklisted(email)
+        if not self._contains(email):
+            return None
+        return self._repository.is_email_blacklisted(email)
+
+    def get_blacklisted_emails(self, emails: List[str]) -> Dict[str, Blacklist]:
+        """Drop emails absent from the table and delta, and look the rest up in the repository"""
+        if not self._usable():
+            self._fallback_reads += 1
+            return self._repository.get_blacklisted_emails(emails)
+        candidates = [email for email in dict.fromkeys(emails) if self._contains(email)]
+        return self._repository.get_blacklisted_emails(candidates) if candidates else {}
+
+    def iter_emails(self, batch_size: int = 5000) -> Iterator[str]:
+        """Iterate over the canonical form of every blacklisted email"""
+        return self._repository.iter_emails(batch_size)
+
+    def count_rows(self) -> int:
+        """Number of emails ``iter_emails`` yields"""
+        return self._repository.count_rows()
+
+    def iter_blacklist(self, *args, **kwargs) -> Iterator[Blacklist]:
+        """Iterate over blacklist entries from the repository"""
+        return self._repository.iter_blacklist(*args, **kwargs)
+
+    def refresh(self) -> None:
+        """Map a newly swapped table and poll rows above the high-water mark (requires an app context)"""
+        now = time.monotonic()
+        if now - self._checked_at >= self._check_interval:
+            self._checked_at = now
+            self._reload_table()
+        if self._table is not None and now - self._polled_at >= self._poll_interval:
+            self._poll_delta()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return table size, delta size, swaps and staleness"""
+        table = self._table
+        lag = time.monotonic() - self._polled_at
+        return {
+            "loaded": table is not None,
+            "entries": table.entries if table else 0,
+            "table_bytes": table.size_bytes if table else 0,
+            "high_water_mark": max(self._delta_mark, table.high_water_mark) if table else 0,
+            "built_at": table.built_at if table else None,
+            "delta_entries": len(self._delta),
+            "replication_lag_seconds": round(lag, 3) if table and lag != float("inf") else None,
+            "swaps": self._swaps,
+            "reconciles": self._reconciles,
+            "fallback_reads": self._fallback_reads,
+        }
+
+    def _contains(self, email: str) -> bool:
+        digest = email_digest(self._canonicalize(email))
+        return digest in self._delta or digest in self._table
+
+    def _usable(self) -> bool:
+        # One thread refreshes at a time; the others carry on with the current table and delta
+        if self._refresh_lock.acquire(blocking=False):
+            try:
+                self.refresh()
+            except Exception:
+                current_app.logger.exception("Shared digest table refresh failed")
+            finally:
+                self._refresh_lock.release()
+        return self._table is not None and time.monotonic() - self._polled_at <= self._max_staleness
+
+    def _reload_table(self) -> None:
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            return
+        if self._table is not None and self._table.identity == (stat.st_dev, stat.st_ino):
+            return
+
+        table = DigestTable(self._path)
+        with self._lock:
+            # Rows above the new table's mark are re-polled; older delta entries are now in the table
+            self._table = table
+            self._delta = set()
+            self._delta_mark = table.high_water_mark
+            self._polled_at = float("-inf")
+            self._reconcile_at = time.monotonic() + self._reconcile_interval
+            self._swaps += 1
+
+    def _poll_delta(self) -> None:
+        expected = None
+        if self._reconcile_interval > 0 and time.monotonic() >= self._reconcile_at:
+            # Counted before the poll, so every row it counts has committed by the time the poll reads
+            expected = self._repository.count_rows()
+            self._reconcile_at = time.monotonic() + self._reconcile_interval
+
+        self._apply_rows_after(max(0, self._delta_mark - self._rescan_ids))
+        if expected is not None and expected > self._table.entries + len(self._delta):
+            self._apply_rows_after(0)
+            self._reconciles += 1
+        self._polled_at = time.monotonic()
+
+    def _apply_rows_after(self, last_id: int) -> None:
+        table = self._table
+        while True:
+            rows = self._repository.fetch_rows_after(last_id, self._batch_size)
+            digests = [email_digest(row.email_canonical) for row in rows]
+            with self._lock:
+                # Only digests the table lacks, so table entries plus delta size counts distinct rows
+                self._delta.update(digest for digest in digests if digest not in table)
+                if rows:
+                    last_id = rows[-1].id
+                    self._delta_mark = max(self._delta_mark, last_id)
+            if len(rows) < self._batch_size:
+                return
+
+    def _add_to_delta(self, emails: Iterable[str]) -> None:
+        digests = [email_digest(self._canonicalize(email)) for email in emails]
+        with self._lock:
+            self._delta.update(digest for digest in digests if self._table is None or digest not in self._table)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the shared blacklist digest table")
+    parser.add_argument("command", choices=("build",))
+    parser.add_argument("--config", default="default", help="Configuration name")
+    parser.add_argument("--path", help="Table file (default: BLACKLIST_SHARED_TABLE_PATH)")
+    parser.add_argument("--loop", type=float, help="Rebuild every this many seconds instead of once")
+    args = parser.parse_args(argv)
+
+    from src.app import create_app
+
+    app = create_app(args.config)
+    path = args.path or app.config["BLACKLIST_SHARED_TABLE_PATH"]
+    repository = BlacklistRepository()
+    while True:
+        started = time.monotonic()
+        try:
+            with app.app_context():
+                entries = build_from_repository(repository, path, app.config.get("BLACKLIST_MEMORY_BATCH_SIZE", 10000))
+            print(f"Wrote {entries} digests to {path} in {time.monotonic() - started:.1f} s", flush=True)
+        except Exception as e:
+            if not args.loop:
+                raise
+            print(f"Digest table build failed: {e}", file=sys.stderr, flush=True)
+        if not args.loop:
+            return 0
+        time.sleep(max(0.0, args.loop - (time.monotonic() - started)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+"""
+Write-behind ingest queue for blacklist inserts
+
+With write-behind enabled, ``POST /blacklists`` validates the entry, queues it
+here and answers 202 with a tracking id instead of holding the worker for a
+commit. A per-process flusher thread groups queued entries into
+``add_emails_to_blacklist`` transactions of up to ``batch_size`` rows, written
+as soon as a batch fills or ``flush_interval`` seconds after its first entry
+was queued. The queue is bounded: once ``max_queue_size`` entries are waiting
+or being written, ``enqueue`` refuses new ones so callers can shed load.
+
+Lookups consult the pending entries before the wrapped repository, so an
+accepted email is reported as blacklisted by the worker that accepted it
+straight away and by every worker once its batch commits. Pending entries live
+in process memory: ``close`` drains them on worker shutdown, but a killed
+worker loses what it had not written yet.
+
+Tracking ids are random tokens signed with an HMAC of the application secret,
+so they reveal nothing about the entry. Only the worker that queued an entry
+knows its outcome, and only until it falls out of the last ``status_retention``
+statuses. Any other worker, or the same one after that, recognises the
+signature and answers ``unknown`` rather than claiming the entry is still
+pending: the entry was accepted, but this worker cannot tell what became of it.
+Clients polling through the load balancer get the outcome once a poll reaches
+the worker that queued it, and should confirm with a lookup of the email once
+``unknown`` keeps coming back.
+"""
+import atexit
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Optional, Dict, Any, Iterator, List, Tuple
+from flask import current_app
+from ..domain.canonical_email import canonicalize_email
+from ..domain.entities import Blacklist
+from ..domain.ports import BlacklistRepositoryPort, BlacklistIngestQueuePort
+from .metrics import record_blacklist_ingest
+
+
+def _tracking_signature(secret: str, token: str) -> str:
+    digest = hmac.new(secret.encode("utf-8"), token.encode("ascii"), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:16]).decode("ascii").rstrip("=")
+
+
+def new_tracking_id(secret: str) -> str:
+    """Opaque tracking id: a random token and its HMAC signature"""
+    token = secrets.token_urlsafe(12)
+    return f"{token}.{_tracking_signature(secret, token)}"
+
+
+def is_signed_tracking_id(secret: str, tracking_id: str) -> bool:
+    """Whether a tracking id was issued with this secret"""
+    token, _, signature = tracking_id.partition(".")
+    if not token.isascii() or not signature:
+        return False
+    return hmac.compare_digest(signature, _tracking_signature(secret, token))
+
+
+class WriteBehindBlacklistRepository(BlacklistRepositoryPort, BlacklistIngestQueuePort):
+    """Queues inserts for batched background writes to a BlacklistRepositoryPort
+
+    The worker that queued an entry answers status lookups from its own status
+    table; other workers only verify the tracking id's signature.
+    """
+
+    def __init__(
+        self,
+        repository: BlacklistRepositoryPort,
+        secret: str,
+        max_queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        status_retention: int = 100000,
+        canonicalize: Callable[[str], str] = canonicalize_email,
+    ):
+        self._repository = repository
+        self._secret = secret
+        self._max_queue_size = max(1, max_queue_size)
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = flush_interval
+        self._status_retention = max(1, status_retention)
+        self._canonicalize = canonicalize
+        self._condition = threading.Condition()
+        self._queue: "deque[Tuple[str, Blacklist]]" = deque()
+        self._pending: Dict[str, Blacklist] = {}
+        self._outstanding = 0
+        self._statuses: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._app = None
+        self._pid: Optional[int] = None
+
+    def enqueue(self, blacklist: Blacklist) -> Optional[str]:
+        """Queue an entry for the flusher, returning its tracking id or None when the queue is full"""
+        self._ensure_started()
+        tracking_id = new_tracking_id(self._secret)
+        with self._condition:
+            if self._outstanding >= self._max_queue_size:
+                record_blacklist_ingest("rejected")
+                return None
+            self._outstanding += 1
+            self._queue.append((tracking_id, blacklist))
+            self._pending.setdefault(self._canonicalize(blacklist.email), blacklist)
+            self._set_status(tracking_id, "pending", blacklist)
+            self._condition.notify()
+        return tracking_id
+
+    def get_status(self, tracking_id: str) -> Optional[Dict[str, Any]]:
+        """Return the ingest status for a tracking id, or None if it was not issued by this service"""
+        with self._condition:
+            status = self._statuses.get(tracking_id)
+        if status is not None:
+            return dict(status, tracking_id=tracking_id)
+        if not is_signed_tracking_id(self._secret, tracking_id):
+            return None
+        # Queued by another worker, or its outcome is no longer retained here
+        return {"tracking_id": tracking_id, "status": "unknown", "fecha_creacion": None}
+
+    def flush(self) -> int:
+        """Write every queued entry now, returning how many were written (requires an app context)"""
+        written = 0
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return written
+            self._write(batch)
+            written += len(batch)
+
+    def close(self, timeout: float = 30.0) -> None:
+        """Stop the flusher thread of this process and drain what is still queued"""
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+        thread, app = self._thread, self._app
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        if app is not None:
+            with app.app_context():
+                self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and limits"""
+        with self._condition:
+            return {
+                "queued": len(self._queue),
+                "outstanding": self._outstanding,
+                "max_queue_size": self._max_queue_size,
+                "batch_size": self._batch_size,
+            }
+
+    def add_email_to_blacklist(self, blacklist: Blacklist) -> bool:
+        """Add an email synchronously, treating a pending entry for it as a duplicate"""
+        if self._pending_entry(blacklist.email) is not None:
+            return False
+        return self._repository.add_email_to_blacklist(blacklist)
+
+    def add_emails_to_blacklist(self, blacklists: List[Blacklist]) -> List[bool]:
+        """Add several emails synchronously, treating pending entries as duplicates"""
+        fresh = [
+            index for index, blacklist in enumerate(blacklists)
+            if self._pending_entry(blacklist.email) is None
+        ]
+        created = [False] * len(blacklists)
+        if fresh:
+            outcomes = self._repository.add_emails_to_blacklist([blacklists[index] for index in fresh])
+            for index, outcome in zip(fresh, outcomes):
+                created[index] = outcome
+        return created
+
+    def is_email_blacklisted(self, email: str) -> Optional[Blacklist]:
+        """Return the pending entry for an email, falling back to the repository"""
+        pending = self._pending_entry(email)
+        if pending is not None:
+            return pending
+        return self._repository.is_email_blacklisted(email)
+
+    def get_blacklisted_emails(self, emails: List[str]) -> Dict[str, Blacklist]:
+        """Resolve pending emails locally and look up the rest in one repository call"""
+        found = {}
+        misses = []
+        for email in dict.fromkeys(emails):
+            pending = self._pending_entry(email)
+            if pending is None:
+                misses.append(email)
+            else:
+                found[email] = pending
+        if misses:
+            found.update(self._repository.get_blacklisted_emails(misses))
+        return found
+
+    def iter_emails(self, batch_size: int = 5000) -> Iterator[str]:
+        """Iterate over the canonical form of every committed blacklisted email"""
+        return self._repository.iter_emails(batch_size)
+
+    def count_rows(self) -> int:
+        """Number of committed emails ``iter_emails`` yields"""
+        return self._repository.count_rows()
+
+    def iter_blacklist(self, *args, **kwargs) -> Iterator[Blacklist]:
+        """Iterate over committed blacklist entries"""
+        return self._repository.iter_blacklist(*args, **kwargs)
+
+    def _pending_entry(self, email: str) -> Optional[Blacklist]:
+        canonical = self._canonicalize(email)
+        with self._condition:
+            return self._pending.get(canonical)
+
+    def _set_status(self, tracking_id: str, status: str, blacklist: Blacklist) -> None:
+        self._statuses[tracking_id] = {
+            "status": status,
+            "email": blacklist.email,
+            "fecha_creacion": blacklist.created_at.isoformat() if status in ("pending", "created") else None,
+        }
+        self._statuses.move_to_end(tracking_id)
+        while len(self._statuses) > self._status_retention:
+            self._statuses.popitem(last=False)
+
+    def _take_batch(self) -> List[Tuple[str, Blacklist]]:
+        with self._condition:
+            count = min(self._batch_size, len(self._queue))
+            return [self._queue.popleft() for _ in range(count)]
+
+    def _write(self, batch: List[Tuple[str, Blacklist]]) -> None:
+        try:
+            created = self._repository.add_emails_to_blacklist([blacklist for _, blacklist in batch])
+            outcomes = ["created" if was_created else "duplicate" for was_created in created]
+        except Exception:
+            current_app.logger.exception("Write-behind flush of %d blacklist entries failed", len(batch))
+            outcomes = ["failed"] * len(batch)
+
+        with self._condition:
+            for (tracking_id, blacklist), outcome in zip(batch, outcomes):
+                canonical = self._canonicalize(blacklist.email)
+                if self._pending.get(canonical) is blacklist:
+                    del self._pending[canonical]
+                self._set_status(tracking_id, outcome, blacklist)
+                record_blacklist_ingest(outcome)
+            self._outstanding -= len(batch)
+
+    def _ensure_started(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+
+        with self._start_lock:
+            if self._pid == pid:
+                return
+            # Entries copied from the parent of a forked worker belong to the parent
+            with self._condition:
+                self._queue.clear()
+                self._pending.clear()
+                self._outstanding = 0
+            self._stop = threading.Event()
+            self._app = current_app._get_current_object()
+            self._thread = threading.Thread(target=self._run, args=(self._app, self._stop), daemon=True)
+            self._thread.start()
+            if self._pid is None:
+                atexit.register(self.close)
+            self._pid = pid
+
+    def _run(self, app, stop: threading.Event) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and not stop.is_set():
+                    self._condition.wait()
+                if stop.is_set():
+                    return
+                deadline = time.monotonic() + self._flush_interval
+                while len(self._queue) < self._batch_size and not stop.is_set():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+            batch = self._take_batch()
+            if batch:
+                with app.app_context():
+                    self._write(batch)
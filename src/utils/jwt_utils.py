@@ -1,6 +1,20 @@
-from flask_jwt_extended import create_access_token, get_jwt_identity
+import hashlib
+import time
+from collections import OrderedDict
 from datetime import datetime
 from threading import Lock
+from typing import Optional, Dict, Any, Tuple
+from flask import current_app, request
+from flask_jwt_extended import create_access_token, decode_token, get_jwt_identity, get_jwt, verify_jwt_in_request
+from flask_jwt_extended.exceptions import (
+    CSRFError,
+    InvalidHeaderError,
+    JWTDecodeError,
+    NoAuthorizationError,
+    WrongTokenError,
+)
+from jwt.exceptions import DecodeError, ExpiredSignatureError, InvalidSignatureError, InvalidTokenError
+from ..infrastructure.metrics import record_jwt_cache_lookup, record_jwt_failure
 
 _SINGLETON_TOKEN: str | None = None
 _singleton_lock = Lock()
@@ -34,6 +48,191 @@ def get_singleton_token() -> str:
         _SINGLETON_TOKEN = generate_static_token()
         return _SINGLETON_TOKEN
 
+def issue_token() -> dict:
+    """Body of the ``POST /token`` response"""
+    return {
+        'token': get_singleton_token(),
+        'message': 'Token generated successfully',
+        'usage': 'Use this token in Authorization header: Bearer <token>'
+    }
+
+
+def jwt_error_body(error: Exception) -> Optional[dict]:
+    """401 body for a token verification error, or None for errors unrelated to the token"""
+    # Every PyJWT error gets the same body; the metric tells them apart
+    if isinstance(error, InvalidTokenError):
+        if isinstance(error, ExpiredSignatureError):
+            record_jwt_failure("expired")
+        elif isinstance(error, DecodeError) and not isinstance(error, InvalidSignatureError):
+            record_jwt_failure("decode_error")
+        else:
+            record_jwt_failure("invalid_signature")
+        return {'error': 'Invalid identity', 'message': 'Token signature verification failed'}
+
+    if isinstance(error, (NoAuthorizationError, InvalidHeaderError, JWTDecodeError)):
+        record_jwt_failure("missing_token" if isinstance(error, NoAuthorizationError) else "invalid_header")
+        return {'error': 'Invalid identity', 'message': str(error)}
+
+    if isinstance(error, (CSRFError, WrongTokenError)):
+        record_jwt_failure("wrong_token")
+        return {'error': 'Invalid identity', 'message': 'Token validation failed'}
+
+    return None
+
+
+def authenticate_request(token_cache: Optional["VerifiedTokenCache"]) -> Tuple[Optional[dict], Optional[dict]]:
+    """Verify the current request's Bearer token
+
+    Returns ``(claims, None)`` on success, ``(None, None)`` for methods exempt
+    from authentication and ``(None, body)`` with the 401 body otherwise.
+    Shared by ``require_auth_token`` and the ASGI serving mode, so both answer
+    with the same rules and messages.
+    """
+    try:
+        jwt_data = verify_jwt_in_request_cached(token_cache)
+    except Exception as e:
+        body = jwt_error_body(e)
+        if body is None:
+            raise
+        return None, body
+    if jwt_data is None:
+        return None, None
+
+    if not jwt_data.get(current_app.config['JWT_IDENTITY_CLAIM']):
+        return None, {'error': 'Invalid token identity'}
+    return jwt_data, None
+
+
 def get_user_info():
     """Get current user info from JWT token"""
-    return get_jwt_identity()
\ No newline at end of file
+    return get_jwt_identity()
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of the claims of already verified JWTs keyed by the SHA-256 of the raw token
+
+    A hit skips signature verification and claim parsing. Entries are dropped
+    once the token's ``exp`` has passed, and the whole cache is flushed when
+    the fingerprint of ``JWT_SECRET_KEY`` changes, so rotating the secret
+    invalidates every previously verified token.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self._max_size = max(1, max_size)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = Lock()
+        self._secret: Optional[str] = None
+        self._secret_fingerprint: Optional[str] = None
+        self._hits = 0
+        self._misses = 0
+        self._expirations = 0
+        self._flushes = 0
+
+    def get(self, token: str, secret: str) -> Optional[dict]:
+        """Return the claims of a verified token, or None"""
+        key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        with self._lock:
+            self._check_secret(secret)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            expires_at, jwt_data = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return jwt_data
+
+    def put(self, token: str, secret: str, jwt_data: dict) -> None:
+        """Remember a token that passed verification"""
+        key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        with self._lock:
+            self._check_secret(secret)
+            self._entries[key] = (jwt_data.get("exp"), jwt_data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every verified token"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache hit/miss/expiration/flush counters"""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self._max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "expirations": self._expirations,
+                "flushes": self._flushes,
+                "secret_fingerprint": self._secret_fingerprint,
+            }
+
+    def _check_secret(self, secret: str) -> None:
+        if secret == self._secret:
+            return
+        if self._secret is not None:
+            self._entries.clear()
+            self._flushes += 1
+        self._secret = secret
+        self._secret_fingerprint = hashlib.sha256(str(secret).encode("utf-8")).hexdigest()[:16]
+
+
+def verify_jwt_in_request_cached(token_cache: Optional[VerifiedTokenCache]) -> Optional[dict]:
+    """Verify the request's access token, reusing earlier verifications
+
+    Failures raise the same flask_jwt_extended/PyJWT exceptions as
+    ``verify_jwt_in_request()``, so the registered error handlers answer
+    them. Returns the token claims, or None for methods exempt from
+    authentication. With a cache, tokens are checked with the public
+    ``decode_token``: signature, expiry, claims and the token type, but no
+    blocklist or user loader callbacks (this app registers none), and
+    ``get_jwt()`` is not populated; callers use the returned claims.
+    """
+    if request.method == "OPTIONS":
+        return None
+
+    token = _bearer_token_from_header()
+    if token_cache is None or token is None:
+        verify_jwt_in_request()
+        return get_jwt()
+
+    secret = current_app.config["JWT_SECRET_KEY"]
+    jwt_data = token_cache.get(token, secret)
+    if jwt_data is not None:
+        record_jwt_cache_lookup(True)
+        return jwt_data
+
+    record_jwt_cache_lookup(False)
+    jwt_data = decode_token(token)
+    if jwt_data.get("type") != "access":
+        raise WrongTokenError("Only non-refresh tokens are allowed")
+    token_cache.put(token, secret, jwt_data)
+    return jwt_data
+
+
+def _bearer_token_from_header() -> Optional[str]:
+    """Raw token from a well-formed header, None when verification must decide"""
+    config = current_app.config
+    locations = config.get("JWT_TOKEN_LOCATION", ["headers"])
+    if isinstance(locations, str):
+        locations = [locations]
+    if list(locations) != ["headers"]:
+        return None
+    header = request.headers.get(config.get("JWT_HEADER_NAME", "Authorization"), "")
+    header_type = config.get("JWT_HEADER_TYPE", "Bearer")
+    if not header_type:
+        return header or None
+    scheme, _, token = header.partition(" ")
+    if scheme != header_type or not token or " " in token:
+        return None
+    return token
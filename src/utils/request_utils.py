@@ -0,0 +1,15 @@
+from typing import Optional
+from flask import has_request_context, request
+
+
+def get_client_ip() -> Optional[str]:
+    """Get the client IP address of the current request, None outside a request"""
+    if not has_request_context():
+        return None
+    # Check if running behind a proxy
+    if request.environ.get('HTTP_X_FORWARDED_FOR'):
+        return request.environ['HTTP_X_FORWARDED_FOR'].split(',')[0].strip()
+    elif request.environ.get('HTTP_X_REAL_IP'):
+        return request.environ['HTTP_X_REAL_IP']
+    else:
+        return request.environ.get('REMOTE_ADDR')
@@ -0,0 +1,123 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from src.app import create_app
+from src.config import TestingConfig
+from src.infrastructure.admission import ConcurrencyLimiter
+from src.infrastructure.migrations import create_blacklist_table
+from src.infrastructure.models import db
+
+
+class TestConcurrencyLimiter(unittest.TestCase):
+    """Test cases for ConcurrencyLimiter"""
+
+    def test_queues_then_sheds(self):
+        """Test requests over the limit wait in the queue and are shed once it is full or the wait runs out"""
+        limiter = ConcurrencyLimiter('read', 1, max_queue=1, queue_timeout=5)
+        self.assertIsNone(limiter.acquire())
+
+        outcome = []
+        waiter = threading.Thread(target=lambda: outcome.append(limiter.acquire()))
+        waiter.start()
+        while limiter.stats()['waiting'] == 0:
+            time.sleep(0.001)
+        self.assertEqual(limiter.acquire(), 'queue_full')
+
+        limiter.release(0.01)
+        waiter.join()
+        self.assertEqual(outcome, [None])
+        self.assertEqual(limiter.stats(), {'limit': 1, 'in_flight': 1, 'waiting': 0, 'shed': 1})
+
+        limiter._queue_timeout = 0.01
+        self.assertEqual(limiter.acquire(), 'timeout')
+
+    def test_aimd_limit_follows_latency(self):
+        """Test slow requests shrink the limit down to the floor and fast ones grow it back"""
+        limiter = ConcurrencyLimiter('read', 10, adaptive=True, min_limit=2, latency_target=0.1)
+
+        for _ in range(30):
+            self.assertIsNone(limiter.acquire())
+            limiter._decreased_at = 0.0
+            limiter.release(0.5)
+        self.assertEqual(limiter.limit, 2)
+
+        # Only grows while in use: one request at a time never uses half of the limit
+        for _ in range(50):
+            limiter.acquire()
+            limiter.release(0.01)
+        self.assertLess(limiter.limit, 4)
+        for _ in range(100):
+            slots = limiter.limit
+            for _ in range(slots):
+                self.assertIsNone(limiter.acquire())
+            for _ in range(slots):
+                limiter.release(0.01)
+        self.assertEqual(limiter.limit, 10)
+
+
+class TestAdmissionControl(unittest.TestCase):
+    """Test cases for admission control of the blacklist endpoints"""
+
+    def setUp(self):
+        with patch.object(TestingConfig, 'ADMISSION_CONTROL_ENABLED', True):
+            self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        create_blacklist_table()
+        token = self.client.post('/token').get_json()['token']
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.admission = self.app.container.get_service('admission_controller')
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_shed_requests_get_503_and_probes_bypass(self):
+        """Test an overloaded limiter answers 503 with Retry-After while /ping and /health are served"""
+        with patch.object(self.admission.read_limiter, 'acquire', return_value='queue_full') as acquire:
+            response = self.client.get('/blacklists/user@example.com', headers=self.headers)
+            self.assertEqual(self.client.get('/ping').status_code, 200)
+            self.assertEqual(self.client.get('/health').status_code, 200)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '1')
+        self.assertEqual(response.get_json()['reason'], 'queue_full')
+        acquire.assert_called_once()
+
+    def test_reads_and_writes_use_their_own_limiter(self):
+        """Test each request takes a slot from the matching limiter and returns it"""
+        with patch.object(self.admission.write_limiter, 'release', wraps=self.admission.write_limiter.release) as write:
+            self.client.post('/blacklists', json={
+                'email': 'user@example.com', 'app_uuid': 'app', 'blocked_reason': 'spam'
+            }, headers=self.headers)
+            self.client.post('/blacklists/check', json={'emails': ['user@example.com']}, headers=self.headers)
+
+        write.assert_called_once()
+        self.assertEqual(self.admission.stats()['read']['in_flight'], 0)
+        self.assertEqual(self.admission.stats()['write']['in_flight'], 0)
+
+    def test_exports_use_their_own_limiter_and_report_time_to_first_byte(self):
+        """Test a streamed export holds an export slot until it ends without charging the stream as latency"""
+        self.client.post('/blacklists', json={
+            'email': 'user@example.com', 'app_uuid': 'app', 'blocked_reason': 'spam'
+        }, headers=self.headers)
+        export_limiter = self.admission.export_limiter
+        with patch.object(export_limiter, 'release', wraps=export_limiter.release) as release, \
+                patch.object(self.admission.read_limiter, 'acquire') as read_acquire:
+            response = self.client.get('/blacklists', headers=self.headers, buffered=False)
+            self.assertEqual(export_limiter.stats()['in_flight'], 1)
+            time.sleep(0.2)
+            response.get_data()
+            response.close()
+
+        read_acquire.assert_not_called()
+        release.assert_called_once()
+        self.assertLess(release.call_args[0][0], 0.2)
+        self.assertEqual(self.admission.stats()['export']['in_flight'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
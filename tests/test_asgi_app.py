@@ -0,0 +1,166 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import AsyncMock
+from flask import Flask
+from flask_jwt_extended import JWTManager
+from src.adapters.asgi_app import BlacklistASGIApp
+from src.application.async_blacklist_service import AsyncBlacklistService
+from src.app import create_app
+from src.config import TestingConfig
+from src.domain.entities import Blacklist
+
+
+def call_asgi(app, method, path, headers=None, body=b""):
+    """Run a single HTTP request through an ASGI app and return (status, json body)"""
+    status, _, payload = call_asgi_raw(app, method, path, headers, body)
+    return status, json.loads(payload) if payload else None
+
+
+def call_asgi_raw(app, method, path, headers=None, body=b""):
+    """Run a single HTTP request through an ASGI app and return (status, content type, body bytes)"""
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()],
+        "client": ("127.0.0.1", 50000),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    content_type = dict(messages[0]["headers"])[b"content-type"]
+    return messages[0]["status"], content_type, messages[1]["body"]
+
+
+class TestBlacklistASGIApp(unittest.TestCase):
+    """Test cases for the ASGI serving mode"""
+
+    def setUp(self):
+        self.mock_repository = AsyncMock()
+        auth_app = Flask(__name__)
+        auth_app.config.from_object(TestingConfig)
+        JWTManager(auth_app)
+        self.app = BlacklistASGIApp(AsyncBlacklistService(self.mock_repository), auth_app)
+        _, token_data = call_asgi(self.app, "POST", "/token")
+        self.auth_headers = {"Authorization": f"Bearer {token_data['token']}"}
+
+    def test_check_blacklisted_email(self):
+        """Test the check route returns the same body as the Flask app"""
+        self.mock_repository.is_email_blacklisted.return_value = Blacklist(
+            email="blacklisted@example.com", app_uuid="app", blocked_reason="Spam detected"
+        )
+
+        status, body = call_asgi(self.app, "GET", "/blacklists/blacklisted@example.com", self.auth_headers)
+
+        self.assertEqual(status, 200)
+        self.assertTrue(body["blacklisted"])
+        self.assertEqual(body["blocked_reason"], "Spam detected")
+
+    def test_add_and_duplicate_email(self):
+        """Test inserts return 201 and duplicates 409"""
+        data = json.dumps({
+            "email": "test@example.com",
+            "app_uuid": "12345678-1234-1234-1234-123456789012",
+            "blocked_reason": "Spam detected"
+        }).encode()
+
+        self.mock_repository.add_email_to_blacklist.return_value = True
+        status, body = call_asgi(self.app, "POST", "/blacklists", self.auth_headers, data)
+        self.assertEqual(status, 201)
+        self.assertEqual(body["email"], "test@example.com")
+        self.assertEqual(self.mock_repository.add_email_to_blacklist.call_args[0][0].ip, "127.0.0.1")
+
+        self.mock_repository.add_email_to_blacklist.return_value = False
+        status, body = call_asgi(self.app, "POST", "/blacklists", self.auth_headers, data)
+        self.assertEqual(status, 409)
+
+    def test_invalid_payload(self):
+        """Test invalid emails fail validation"""
+        data = json.dumps({"email": "invalid-email", "app_uuid": "app", "blocked_reason": "Spam"}).encode()
+
+        status, _ = call_asgi(self.app, "POST", "/blacklists", self.auth_headers, data)
+
+        self.assertEqual(status, 400)
+
+    def test_missing_and_invalid_token(self):
+        """Test protected routes reject missing and tampered tokens"""
+        status, body = call_asgi(self.app, "GET", "/blacklists/clean@example.com")
+        self.assertEqual(status, 401)
+        self.assertEqual(body["message"], "Missing Authorization Header")
+
+        tampered = {"Authorization": self.auth_headers["Authorization"][:-2] + "xx"}
+        status, body = call_asgi(self.app, "GET", "/blacklists/clean@example.com", tampered)
+        self.assertEqual(status, 401)
+        self.assertEqual(body["message"], "Token signature verification failed")
+
+    def test_accepts_tokens_issued_by_flask_app(self):
+        """Test tokens are interchangeable between serving modes"""
+        flask_app = create_app('testing')
+        token = json.loads(flask_app.test_client().post('/token').data)["token"]
+        self.mock_repository.is_email_blacklisted.return_value = None
+
+        status, body = call_asgi(
+            self.app, "GET", "/blacklists/clean@example.com", {"Authorization": f"Bearer {token}"}
+        )
+
+        self.assertEqual(status, 200)
+        self.assertFalse(body["blacklisted"])
+
+    def test_probes_and_metrics(self):
+        """Test the liveness, readiness and metrics routes of create_app are served"""
+        status, body = call_asgi(self.app, "GET", "/health/live")
+        self.assertEqual((status, body["status"]), (200, "alive"))
+
+        self.mock_repository.check_database_health.return_value = True
+        status, body = call_asgi(self.app, "GET", "/health/ready")
+        self.assertEqual((status, body["status"]), (200, "healthy"))
+        self.mock_repository.check_database_health.return_value = False
+        status, _ = call_asgi(self.app, "GET", "/health/ready")
+        self.assertEqual(status, 503)
+
+        status, content_type, payload = call_asgi_raw(self.app, "GET", "/metrics")
+        self.assertEqual(status, 200)
+        self.assertTrue(content_type.startswith(b"text/plain"))
+        self.assertIn(b"# TYPE", payload)
+
+    def test_wsgi_only_routes_return_501(self):
+        """Test routes only the WSGI application serves are answered with 501"""
+        for method, path in (("GET", "/blacklists"), ("POST", "/blacklists/batch"),
+                             ("POST", "/blacklists/check"), ("GET", "/blacklists/ingest/abc.def")):
+            status, body = call_asgi(self.app, method, path, self.auth_headers, b"[]")
+            self.assertEqual(status, 501, path)
+            self.assertEqual(body["error"], "Not implemented")
+
+    def test_startup_does_not_touch_the_schema(self):
+        """Test the lifespan startup runs no DDL"""
+        messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message["type"])
+
+        asyncio.run(BlacklistASGIApp(self.app.blacklist_service, self.app.auth_app, self.mock_repository)(
+            {"type": "lifespan"}, receive, send
+        ))
+        self.assertEqual(sent, ["lifespan.startup.complete", "lifespan.shutdown.complete"])
+        self.assertEqual([call[0] for call in self.mock_repository.mock_calls], ["dispose"])
+
+    def test_unknown_route(self):
+        """Test unknown routes return 404"""
+        status, _ = call_asgi(self.app, "GET", "/unknown")
+
+        self.assertEqual(status, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
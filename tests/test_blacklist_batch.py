@@ -0,0 +1,93 @@
+import unittest
+import json
+from src.app import create_app
+from src.infrastructure.migrations import create_blacklist_table
+from src.infrastructure.models import db, BlacklistModel
+
+
+class TestBlacklistBatch(unittest.TestCase):
+    """Test cases for the batch blacklist endpoint"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+
+        create_blacklist_table()
+
+        token_resp = self.client.post('/token')
+        token_data = json.loads(token_resp.data)
+        self.auth_headers = {
+            "Authorization": f"Bearer {token_data['token']}",
+            "Content-Type": "application/json"
+        }
+
+    def tearDown(self):
+        """Tear down test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _entry(self, email):
+        return {
+            "email": email,
+            "app_uuid": "12345678-1234-1234-1234-123456789012",
+            "blocked_reason": "Spam detected"
+        }
+
+    def test_batch_reports_created_duplicate_and_invalid(self):
+        """Test each batch item gets its own outcome"""
+        self.client.post('/blacklists', data=json.dumps(self._entry("existing@example.com")), headers=self.auth_headers)
+
+        data = [
+            self._entry("new@example.com"),
+            self._entry("existing@example.com"),
+            self._entry("invalid-email"),
+            self._entry("new@example.com"),
+        ]
+        response = self.client.post('/blacklists/batch', data=json.dumps(data), headers=self.auth_headers)
+
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.data)
+        self.assertEqual(response_data["total"], 4)
+        self.assertEqual(response_data["created"], 1)
+        self.assertEqual(response_data["duplicates"], 2)
+        self.assertEqual(response_data["invalid"], 1)
+        self.assertEqual(
+            [result["status"] for result in response_data["results"]],
+            ["created", "duplicate", "invalid", "duplicate"]
+        )
+        self.assertEqual(BlacklistModel.query.count(), 2)
+
+    def test_batch_is_chunked(self):
+        """Test batches larger than the chunk size are fully inserted"""
+        data = [self._entry(f"user{i}@example.com") for i in range(1200)]
+
+        response = self.client.post('/blacklists/batch', data=json.dumps(data), headers=self.auth_headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)["created"], 1200)
+        self.assertEqual(BlacklistModel.query.count(), 1200)
+
+    def test_batch_rejects_non_list(self):
+        """Test the batch endpoint requires a JSON array"""
+        response = self.client.post(
+            '/blacklists/batch', data=json.dumps(self._entry("a@example.com")), headers=self.auth_headers
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_rejects_oversized_batch(self):
+        """Test batches above the configured maximum are refused"""
+        self.app.config["BLACKLIST_BATCH_MAX_ITEMS"] = 2
+        data = [self._entry(f"user{i}@example.com") for i in range(3)]
+
+        response = self.client.post('/blacklists/batch', data=json.dumps(data), headers=self.auth_headers)
+
+        self.assertEqual(response.status_code, 413)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import json
+from datetime import datetime
+from src.app import create_app
+from src.infrastructure.migrations import create_blacklist_table
+from src.infrastructure.models import db, BlacklistModel
+
+
+class TestBlacklistBulkCheck(unittest.TestCase):
+    """Test cases for the bulk blacklist check endpoint"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+
+        create_blacklist_table()
+
+        token_resp = self.client.post('/token')
+        token_data = json.loads(token_resp.data)
+        self.auth_headers = {
+            "Authorization": f"Bearer {token_data['token']}",
+            "Content-Type": "application/json"
+        }
+
+        db.session.add(BlacklistModel(
+            email="blacklisted@example.com",
+            app_uuid="12345678-1234-1234-1234-123456789012",
+            blocked_reason="Spam detected",
+            created_at=datetime.utcnow()
+        ))
+        db.session.commit()
+
+    def tearDown(self):
+        """Tear down test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_bulk_check_preserves_input_order(self):
+        """Test results are returned in the order the emails were sent"""
+        data = {"emails": ["clean@example.com", "blacklisted@example.com", "clean@example.com"]}
+
+        response = self.client.post('/blacklists/check', data=json.dumps(data), headers=self.auth_headers)
+
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.data)
+        self.assertEqual(response_data["count"], 3)
+        self.assertIn("lookup_ms", response_data)
+        self.assertEqual(
+            [(result["email"], result["blacklisted"]) for result in response_data["results"]],
+            [("clean@example.com", False), ("blacklisted@example.com", True), ("clean@example.com", False)]
+        )
+        self.assertEqual(response_data["results"][1]["blocked_reason"], "Spam detected")
+
+    def test_bulk_check_rejects_invalid_emails(self):
+        """Test invalid emails fail validation"""
+        data = {"emails": ["not-an-email"]}
+
+        response = self.client.post('/blacklists/check', data=json.dumps(data), headers=self.auth_headers)
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_check_enforces_max_emails(self):
+        """Test requests above the configured maximum are refused"""
+        self.app.config["BLACKLIST_CHECK_MAX_EMAILS"] = 1
+        data = {"emails": ["a@example.com", "b@example.com"]}
+
+        response = self.client.post('/blacklists/check', data=json.dumps(data), headers=self.auth_headers)
+
+        self.assertEqual(response.status_code, 413)
+
+
+if __name__ == '__main__':
+    unittest.main()
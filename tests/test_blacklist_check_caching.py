@@ -0,0 +1,165 @@
+import unittest
+from unittest.mock import patch
+from sqlalchemy import text
+from src.app import create_app
+from src.config import TestingConfig
+from src.domain.entities import Blacklist
+from src.infrastructure.migrations import create_blacklist_table
+from src.infrastructure.models import db
+from src.infrastructure.repositories import BlacklistRepository
+
+
+class TestBlacklistCheckCaching(unittest.TestCase):
+    """Test cases for ETag revalidation of GET /blacklists/<email>"""
+
+    def setUp(self):
+        with patch.object(TestingConfig, 'BLACKLIST_CHECK_CACHE_MAX_AGE', 60):
+            self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        create_blacklist_table()
+        token = self.client.post('/token').get_json()['token']
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.list_version = self.app.container.get_service('list_version')
+        self.repository = self.app.container.get_service('blacklist_repository')
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _check(self, email, etag=None):
+        headers = dict(self.headers)
+        if etag:
+            headers['If-None-Match'] = etag
+        return self.client.get(f'/blacklists/{email}', headers=headers)
+
+    def test_absent_email_revalidates_without_lookup(self):
+        """Test a "not blacklisted" answer is tagged with the list version and revalidated from memory"""
+        response = self._check('user@example.com')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Cache-Control'], 'private, max-age=60')
+        etag = response.headers['ETag']
+        self.assertTrue(etag.startswith('"absent-'))
+
+        with patch.object(self.repository, 'is_email_blacklisted') as lookup, \
+                patch.object(self.list_version, '_fetch') as fetch:
+            revalidated = self._check('user@example.com', etag)
+        lookup.assert_not_called()
+        fetch.assert_not_called()
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.data, b'')
+        self.assertEqual(revalidated.headers['ETag'], etag)
+
+    def test_insert_changes_the_answer_and_its_tag(self):
+        """Test an insert invalidates absent tags and blacklisted answers revalidate by entry"""
+        absent_etag = self._check('user@example.com').headers['ETag']
+        self.client.post('/blacklists', json={
+            'email': 'user@example.com', 'app_uuid': 'app', 'blocked_reason': 'spam'
+        }, headers=self.headers)
+
+        response = self._check('user@example.com', absent_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()['blacklisted'])
+        entry_etag = response.headers['ETag']
+        self.assertTrue(entry_etag.startswith('"entry-'))
+
+        with patch('src.adapters.blacklist_controller.blacklist_check_response_schema') as schema:
+            self.assertEqual(self._check('user@example.com', entry_etag).status_code, 304)
+        schema.dump.assert_not_called()
+
+    def test_inserts_elsewhere_are_seen_after_the_refresh_interval(self):
+        """Test rows written by another host or the bulk importer change the version once it is re-read"""
+        absent_etag = self._check('user@example.com').headers['ETag']
+        with db.engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO blacklist (email, email_canonical, app_uuid, blocked_reason, created_at) "
+                "VALUES ('user@example.com', 'user@example.com', 'app', 'spam', '2024-01-01 00:00:00')"
+            ))
+        self.assertEqual(self._check('user@example.com', absent_etag).status_code, 304)
+
+        self.list_version._refresh_interval = 0
+        self.assertEqual(self._check('user@example.com', absent_etag).status_code, 200)
+
+
+class TestBlacklistCheckCachingBehindLookupCache(unittest.TestCase):
+    """Test cases for ETags when lookups may be answered by the in-process cache"""
+
+    def setUp(self):
+        with patch.object(TestingConfig, 'BLACKLIST_CACHE_ENABLED', True):
+            self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        create_blacklist_table()
+        token = self.client.post('/token').get_json()['token']
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.list_version = self.app.container.get_service('list_version')
+        self.list_version._refresh_interval = 0
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_cached_miss_is_not_tagged_with_a_later_version(self):
+        """Test a stale cached "not blacklisted" answer gets no absent tag and absent tags are not honoured"""
+        self.assertFalse(self.client.get('/blacklists/user@example.com', headers=self.headers).get_json()['blacklisted'])
+        BlacklistRepository(list_version=self.list_version).add_email_to_blacklist(
+            Blacklist('user@example.com', 'app', 'spam')
+        )
+
+        stale = self.client.get('/blacklists/user@example.com', headers=self.headers)
+        self.assertFalse(stale.get_json()['blacklisted'])
+        self.assertNotIn('ETag', stale.headers)
+
+        self.app.container.get_service('blacklist_repository').clear()
+        headers = dict(self.headers, **{'If-None-Match': f'"absent-{self.list_version.current()}"'})
+        response = self.client.get('/blacklists/user@example.com', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()['blacklisted'])
+        self.assertTrue(response.headers['ETag'].startswith('"entry-'))
+
+
+class TestBlacklistCheckCachingWithWriteBehind(unittest.TestCase):
+    """Test cases for ETags when inserts may still be pending in the write-behind queue"""
+
+    def setUp(self):
+        with patch.object(TestingConfig, 'BLACKLIST_WRITE_BEHIND_ENABLED', True), \
+                patch.object(TestingConfig, 'BLACKLIST_WRITE_BEHIND_FLUSH_INTERVAL', 60):
+            self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        create_blacklist_table()
+        token = self.client.post('/token').get_json()['token']
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.list_version = self.app.container.get_service('list_version')
+        self.list_version._refresh_interval = 0
+        self.queue = self.app.container.get_service('write_behind_repository')
+
+    def tearDown(self):
+        self.queue.close()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_pending_entry_is_not_hidden_by_an_absent_tag(self):
+        """Test revalidating an absent tag after an enqueue returns the pending entry"""
+        miss = self.client.get('/blacklists/user@example.com', headers=self.headers)
+        self.assertNotIn('ETag', miss.headers)
+
+        accepted = self.client.post('/blacklists', json={
+            'email': 'user@example.com', 'app_uuid': 'app', 'blocked_reason': 'spam'
+        }, headers=self.headers)
+        self.assertEqual(accepted.status_code, 202)
+
+        headers = dict(self.headers, **{'If-None-Match': f'"absent-{self.list_version.current()}"'})
+        response = self.client.get('/blacklists/user@example.com', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()['blacklisted'])
+
+
+if __name__ == '__main__':
+    unittest.main()
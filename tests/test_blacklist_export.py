@@ -0,0 +1,78 @@
+import unittest
+import json
+from datetime import datetime
+from src.app import create_app
+from src.infrastructure.migrations import create_blacklist_table
+from src.infrastructure.models import db, BlacklistModel
+
+
+class TestBlacklistExport(unittest.TestCase):
+    """Test cases for the streaming blacklist export endpoint"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.app = create_app('testing')
+        self.app.config["BLACKLIST_EXPORT_PAGE_SIZE"] = 2
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+
+        create_blacklist_table()
+
+        token_resp = self.client.post('/token')
+        token_data = json.loads(token_resp.data)
+        self.auth_only_headers = {
+            "Authorization": f"Bearer {token_data['token']}"
+        }
+
+        for i in range(5):
+            db.session.add(BlacklistModel(
+                email=f"user{i}@example.com",
+                app_uuid="app-even" if i % 2 == 0 else "app-odd",
+                blocked_reason="Spam detected",
+                created_at=datetime(2024, 1, i + 1)
+            ))
+        db.session.commit()
+
+    def tearDown(self):
+        """Tear down test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_export_ndjson_pages_through_all_rows(self):
+        """Test the NDJSON export returns every row in insertion order"""
+        response = self.client.get('/blacklists', headers=self.auth_only_headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        entries = [json.loads(line) for line in response.data.decode().splitlines()]
+        self.assertEqual([entry["email"] for entry in entries], [f"user{i}@example.com" for i in range(5)])
+
+    def test_export_csv_with_filters(self):
+        """Test the CSV export applies app_uuid and created_at filters"""
+        response = self.client.get(
+            '/blacklists?format=csv&app_uuid=app-even&created_from=2024-01-02T00:00:00',
+            headers=self.auth_only_headers
+        )
+
+        self.assertEqual(response.status_code, 200)
+        lines = response.data.decode().splitlines()
+        self.assertEqual(lines[0], "email,app_uuid,blocked_reason,fecha_creacion")
+        self.assertEqual([line.split(",")[0] for line in lines[1:]], ["user2@example.com", "user4@example.com"])
+
+    def test_export_rejects_unknown_format(self):
+        """Test unsupported export formats fail validation"""
+        response = self.client.get('/blacklists?format=xml', headers=self.auth_only_headers)
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_requires_token(self):
+        """Test the export endpoint requires authentication"""
+        response = self.client.get('/blacklists')
+
+        self.assertEqual(response.status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 import json
 from datetime import datetime
 from src.app import create_app
+from src.infrastructure.migrations import create_blacklist_table
 from src.infrastructure.models import db, BlacklistModel
 from unittest.mock import patch
 
@@ -17,7 +18,7 @@ class TestBlacklistService(unittest.TestCase):
         self.client = self.app.test_client()
 
         # Create tables
-        db.create_all()
+        create_blacklist_table()
 
         # Obtain a valid JWT once for all tests
         token_resp = self.client.post('/token')
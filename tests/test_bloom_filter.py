@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import Mock
+from src.domain.entities import Blacklist
+from src.domain.ports import BlacklistRepositoryPort
+from src.infrastructure.bloom_filter import BloomFilter, BloomFilterBlacklistRepository
+from src.infrastructure.cached_repository import CachedBlacklistRepository
+
+
+class TestBloomFilter(unittest.TestCase):
+    """Test cases for BloomFilter"""
+
+    def test_added_values_are_members(self):
+        """Test there are no false negatives"""
+        bloom = BloomFilter(capacity=1000, false_positive_rate=0.01)
+        emails = [f"user{i}@example.com" for i in range(1000)]
+        for email in emails:
+            bloom.add(email)
+
+        self.assertTrue(all(email in bloom for email in emails))
+
+    def test_false_positive_rate_is_bounded(self):
+        """Test the observed false positive rate stays near the configured rate"""
+        bloom = BloomFilter(capacity=1000, false_positive_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"user{i}@example.com")
+
+        false_positives = sum(f"other{i}@example.com" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class TestBloomFilterBlacklistRepository(unittest.TestCase):
+    """Test cases for BloomFilterBlacklistRepository"""
+
+    def setUp(self):
+        self.mock_repository = Mock(spec=BlacklistRepositoryPort)
+        self.mock_repository.count_rows.return_value = 1
+        self.mock_repository.iter_emails.return_value = iter(["blacklisted@example.com"])
+        self.repository = BloomFilterBlacklistRepository(
+            self.mock_repository, rebuild_interval=0, min_capacity=100
+        )
+        self.repository.rebuild()
+
+    def test_rebuild_is_sized_from_the_row_count(self):
+        """Test the filter is sized from count_rows with headroom and never below min_capacity"""
+        self.assertEqual(self.repository.stats()["capacity"], 100)
+
+        self.mock_repository.count_rows.return_value = 500
+        self.mock_repository.iter_emails.return_value = (f"user{i}@example.com" for i in range(500))
+        self.repository.rebuild()
+
+        stats = self.repository.stats()
+        self.assertEqual((stats["capacity"], stats["entries"]), (1000, 500))
+
+    def test_rebuild_through_a_wrapping_repository(self):
+        """Test the row count used for sizing is passed through repository wrappers"""
+        self.mock_repository.count_rows.return_value = 500
+        self.mock_repository.iter_emails.return_value = iter(["blacklisted@example.com"])
+        repository = BloomFilterBlacklistRepository(
+            CachedBlacklistRepository(self.mock_repository), rebuild_interval=0, min_capacity=100
+        )
+        repository.rebuild()
+
+        self.assertEqual(repository.stats()["capacity"], 1000)
+
+    def test_definite_miss_skips_repository(self):
+        """Test emails absent from the filter never reach the repository"""
+        self.assertIsNone(self.repository.is_email_blacklisted("clean@example.com"))
+
+        self.mock_repository.is_email_blacklisted.assert_not_called()
+        self.assertEqual(self.repository.stats()["short_circuited"], 1)
+
+    def test_possible_hit_queries_repository(self):
+        """Test emails in the filter are resolved by the repository"""
+        entry = Blacklist(email="blacklisted@example.com", app_uuid="app", blocked_reason="Spam")
+        self.mock_repository.is_email_blacklisted.return_value = entry
+
+        self.assertEqual(self.repository.is_email_blacklisted("blacklisted@example.com"), entry)
+
+    def test_successful_add_updates_filter(self):
+        """Test a successful insert makes the email visible to the filter"""
+        self.mock_repository.add_email_to_blacklist.return_value = True
+        entry = Blacklist(email="new@example.com", app_uuid="app", blocked_reason="Spam")
+        self.repository.add_email_to_blacklist(entry)
+
+        self.mock_repository.is_email_blacklisted.return_value = entry
+        self.assertEqual(self.repository.is_email_blacklisted("new@example.com"), entry)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from src.app import create_app
+from src.infrastructure.bulk_import import BlacklistBulkImporter, read_checkpoint_offset
+from src.infrastructure.migrations import create_blacklist_table
+from src.infrastructure.models import db, BlacklistModel
+
+
+class TestBlacklistBulkImporter(unittest.TestCase):
+    """Test cases for the streaming bulk importer"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        create_blacklist_table()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.checkpoint_path = os.path.join(self.tmp_dir.name, "import.checkpoint")
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        self.tmp_dir.cleanup()
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(content)
+        return path
+
+    def test_csv_import_skips_duplicates_and_rejects_invalid_rows(self):
+        """Test CSV rows are validated and existing emails are skipped"""
+        path = self._write("entries.csv", (
+            "email,app_uuid,blocked_reason\n"
+            "a@example.com,app-1,Spam\n"
+            "invalid-email,app-1,Spam\n"
+            "a@example.com,app-1,Spam\n"
+            "b@example.com,app-1,Fraud\n"
+        ))
+
+        importer = BlacklistBulkImporter(chunk_size=2, checkpoint_path=self.checkpoint_path, out=io.StringIO())
+        report = importer.run(path, "csv")
+
+        self.assertEqual(report["rows_read"], 4)
+        self.assertEqual(report["rows_inserted"], 2)
+        self.assertEqual(report["rows_rejected"], 1)
+        self.assertEqual(BlacklistModel.query.count(), 2)
+        self.assertEqual(read_checkpoint_offset(self.checkpoint_path, path), os.path.getsize(path))
+
+    def test_csv_quoted_fields_span_lines(self):
+        """Test a quoted multiline field is one record and the offsets land between records"""
+        first = 'a@example.com,app-1,"Spam\nreported twice, by ""ops"""\n'
+        path = self._write("entries.csv", (
+            "email,app_uuid,blocked_reason\n" + first + "b@example.com,app-1,Fraud\n"
+        ))
+
+        importer = BlacklistBulkImporter(chunk_size=1, checkpoint_path=self.checkpoint_path, out=io.StringIO())
+        report = importer.run(path, "csv")
+
+        self.assertEqual((report["rows_read"], report["rows_inserted"]), (2, 2))
+        entry = BlacklistModel.query.filter_by(email="a@example.com").one()
+        self.assertEqual(entry.blocked_reason, 'Spam\nreported twice, by "ops"')
+
+        db.session.query(BlacklistModel).delete()
+        db.session.commit()
+        header_size = len("email,app_uuid,blocked_reason\n")
+        report = BlacklistBulkImporter(out=io.StringIO()).run(path, "csv", offset=header_size + len(first))
+        self.assertEqual(report["rows_read"], 1)
+        self.assertEqual([row.email for row in BlacklistModel.query.all()], ["b@example.com"])
+
+    def test_ndjson_import_resumes_from_offset(self):
+        """Test an import started at a checkpointed offset only loads later rows"""
+        lines = [
+            json.dumps({"email": "a@example.com", "app_uuid": "app-1", "blocked_reason": "Spam"}) + "\n",
+            json.dumps({"email": "b@example.com", "app_uuid": "app-1", "blocked_reason": "Spam"}) + "\n",
+        ]
+        path = self._write("entries.ndjson", "".join(lines))
+
+        importer = BlacklistBulkImporter(chunk_size=10, out=io.StringIO())
+        report = importer.run(path, "ndjson", offset=len(lines[0].encode("utf-8")))
+
+        self.assertEqual(report["rows_read"], 1)
+        self.assertEqual([row.email for row in BlacklistModel.query.all()], ["b@example.com"])
+
+    def test_invalid_utf8_lines_are_rejected_not_fatal(self):
+        """Test a line that is not valid UTF-8 is rejected and the rest of the file still loads"""
+        rejects_path = os.path.join(self.tmp_dir.name, "rejects.ndjson")
+        for file_format, content in (
+            ("csv", b"email,app_uuid,blocked_reason\nbad\xff@example.com,app-1,Spam\nb@example.com,app-1,Fraud\n"),
+            ("ndjson", b'{"email": "bad\xff@example.com"}\n'
+                       + json.dumps({"email": "b@example.com", "app_uuid": "app-1", "blocked_reason": "Spam"}).encode() + b"\n"),
+        ):
+            with self.subTest(file_format=file_format):
+                path = os.path.join(self.tmp_dir.name, f"entries.{file_format}")
+                with open(path, "wb") as handle:
+                    handle.write(content)
+
+                importer = BlacklistBulkImporter(rejects_path=rejects_path, out=io.StringIO())
+                report = importer.run(path, file_format)
+
+                self.assertEqual((report["rows_read"], report["rows_inserted"], report["rows_rejected"]), (2, 1, 1))
+                self.assertEqual([row.email for row in BlacklistModel.query.all()], ["b@example.com"])
+                with open(rejects_path, encoding="utf-8") as handle:
+                    reject = json.loads(handle.readlines()[-1])
+                self.assertEqual(reject["offset"], content.index(b"\n", content.index(b"\xff")) + 1)
+                self.assertIn("utf-8", reject["errors"]["_line"][0])
+
+                db.session.query(BlacklistModel).delete()
+                db.session.commit()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from unittest.mock import Mock, patch
+from src.domain.entities import Blacklist
+from src.infrastructure.cached_repository import CachedBlacklistRepository
+
+
+class TestCachedBlacklistRepository(unittest.TestCase):
+    """Test cases for CachedBlacklistRepository"""
+
+    def setUp(self):
+        self.mock_repository = Mock()
+        self.repository = CachedBlacklistRepository(
+            self.mock_repository, max_size=2, positive_ttl=60, negative_ttl=10
+        )
+        self.entry = Blacklist(
+            email="blacklisted@example.com",
+            app_uuid="12345678-1234-1234-1234-123456789012",
+            blocked_reason="Spam detected",
+        )
+
+    def test_positive_lookup_is_cached(self):
+        """Test repeated positive lookups only hit the repository once"""
+        self.mock_repository.is_email_blacklisted.return_value = self.entry
+
+        self.assertEqual(self.repository.is_email_blacklisted(self.entry.email), self.entry)
+        self.assertEqual(self.repository.is_email_blacklisted(self.entry.email), self.entry)
+
+        self.mock_repository.is_email_blacklisted.assert_called_once_with(self.entry.email)
+        stats = self.repository.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_negative_lookup_expires(self):
+        """Test negative lookups are re-queried after their TTL"""
+        self.mock_repository.is_email_blacklisted.return_value = None
+
+        with patch("src.infrastructure.cached_repository.time.monotonic", return_value=100.0):
+            self.assertIsNone(self.repository.is_email_blacklisted("clean@example.com"))
+            self.assertIsNone(self.repository.is_email_blacklisted("clean@example.com"))
+        with patch("src.infrastructure.cached_repository.time.monotonic", return_value=111.0):
+            self.assertIsNone(self.repository.is_email_blacklisted("clean@example.com"))
+
+        self.assertEqual(self.mock_repository.is_email_blacklisted.call_count, 2)
+
+    def test_add_invalidates_cached_negative(self):
+        """Test adding an email drops a cached negative lookup"""
+        self.mock_repository.is_email_blacklisted.return_value = None
+        self.repository.is_email_blacklisted(self.entry.email)
+
+        self.mock_repository.add_email_to_blacklist.return_value = True
+        self.assertTrue(self.repository.add_email_to_blacklist(self.entry))
+
+        self.mock_repository.is_email_blacklisted.return_value = self.entry
+        self.assertEqual(self.repository.is_email_blacklisted(self.entry.email), self.entry)
+
+    def test_miss_read_before_concurrent_insert_is_not_cached(self):
+        """Test a lookup invalidated while in flight does not store its stale result"""
+        def lookup_racing_an_insert(email):
+            self.mock_repository.add_email_to_blacklist.return_value = True
+            self.repository.add_email_to_blacklist(self.entry)
+            return None
+
+        self.mock_repository.is_email_blacklisted.side_effect = lookup_racing_an_insert
+        self.assertIsNone(self.repository.is_email_blacklisted(self.entry.email))
+
+        self.mock_repository.is_email_blacklisted.side_effect = None
+        self.mock_repository.is_email_blacklisted.return_value = self.entry
+        self.assertEqual(self.repository.is_email_blacklisted(self.entry.email), self.entry)
+        self.assertEqual(self.repository.stats()["size"], 1)
+
+    def test_failed_lookup_is_not_cached(self):
+        """Test a lookup that raises leaves nothing behind in the cache"""
+        self.mock_repository.is_email_blacklisted.side_effect = RuntimeError("database unavailable")
+        with self.assertRaises(RuntimeError):
+            self.repository.is_email_blacklisted("clean@example.com")
+
+        self.assertEqual(self.repository.stats()["size"], 0)
+        self.assertEqual(self.repository._loading, {})
+
+    def test_bulk_lookup_only_queries_misses(self):
+        """Test bulk lookups reuse cached results and cache the rest"""
+        self.mock_repository.is_email_blacklisted.return_value = self.entry
+        self.repository.is_email_blacklisted(self.entry.email)
+
+        self.mock_repository.get_blacklisted_emails.return_value = {}
+        found = self.repository.get_blacklisted_emails([self.entry.email, "clean@example.com"])
+
+        self.assertEqual(found, {self.entry.email: self.entry})
+        self.mock_repository.get_blacklisted_emails.assert_called_once_with(["clean@example.com"])
+        self.assertIsNone(self.repository.is_email_blacklisted("clean@example.com"))
+        self.assertEqual(self.mock_repository.is_email_blacklisted.call_count, 1)
+
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted past max size"""
+        self.mock_repository.is_email_blacklisted.return_value = None
+
+        for email in ("a@example.com", "b@example.com", "c@example.com"):
+            self.repository.is_email_blacklisted(email)
+
+        stats = self.repository.stats()
+        self.assertEqual(stats["size"], 2)
+        self.assertEqual(stats["evictions"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from src.app import create_app
+from src.domain.canonical_email import canonicalize_email
+from src.domain.entities import Blacklist
+from src.infrastructure.migrations import create_blacklist_table
+from src.infrastructure.models import db
+from src.infrastructure.repositories import BlacklistRepository
+
+
+class TestCanonicalizeEmail(unittest.TestCase):
+    """Test cases for canonicalize_email"""
+
+    def test_trims_and_lowercases(self):
+        """Test case and surrounding whitespace are ignored"""
+        self.assertEqual(canonicalize_email('  User.Name+Tag@Example.COM '), 'user.name+tag@example.com')
+
+    def test_provider_rules_fold_gmail_aliases(self):
+        """Test Gmail dots and plus tags are removed only with provider rules"""
+        self.assertEqual(canonicalize_email('J.Doe+news@googlemail.com', provider_rules=True), 'jdoe@gmail.com')
+        self.assertEqual(canonicalize_email('j.doe+news@example.com', provider_rules=True), 'j.doe+news@example.com')
+
+
+class TestCanonicalEmailRepository(unittest.TestCase):
+    """Test cases for canonical email lookups and uniqueness"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        create_blacklist_table()
+        self.repository = BlacklistRepository()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_lookup_ignores_case(self):
+        """Test a differently cased spelling finds the entry"""
+        self.repository.add_email_to_blacklist(Blacklist('User@Example.com', 'app', 'spam'))
+
+        entry = self.repository.is_email_blacklisted('user@EXAMPLE.com')
+
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry.email, 'User@Example.com')
+
+    def test_case_variants_are_duplicates(self):
+        """Test another spelling of an existing email is rejected, singly and in batches"""
+        self.assertTrue(self.repository.add_email_to_blacklist(Blacklist('user@example.com', 'app', 'spam')))
+        self.assertFalse(self.repository.add_email_to_blacklist(Blacklist('USER@example.com', 'app', 'spam')))
+
+        created = self.repository.add_emails_to_blacklist([
+            Blacklist('User@example.com', 'app', 'spam'),
+            Blacklist('new@example.com', 'app', 'spam'),
+            Blacklist('NEW@example.com', 'app', 'spam'),
+        ])
+
+        self.assertEqual(created, [False, True, False])
+
+    def test_bulk_lookup_keys_results_by_requested_email(self):
+        """Test bulk lookups match every spelling and return the emails as requested"""
+        self.repository.add_email_to_blacklist(Blacklist('user@example.com', 'app', 'spam'))
+
+        found = self.repository.get_blacklisted_emails(['USER@example.com', 'user@example.com', 'x@example.com'])
+
+        self.assertEqual(set(found), {'USER@example.com', 'user@example.com'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import gzip
+import json
+import unittest
+from src.app import create_app
+from src.adapters import content_negotiation
+from src.infrastructure.migrations import create_blacklist_table
+from src.infrastructure.models import db
+
+
+class TestContentNegotiation(unittest.TestCase):
+    """Test cases for MessagePack bodies and compression of the blacklist endpoints"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        create_blacklist_table()
+        token = self.client.post('/token').get_json()['token']
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.emails = [f'user{i}@example.com' for i in range(100)]
+        self.client.post('/blacklists/batch', json=[
+            {'email': email, 'app_uuid': 'app', 'blocked_reason': 'spam'} for email in self.emails
+        ], headers=self.headers)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    @unittest.skipIf(content_negotiation.msgpack is None, 'msgpack is not installed')
+    def test_msgpack_request_and_response(self):
+        """Test MessagePack bodies are accepted and returned when asked for"""
+        msgpack = content_negotiation.msgpack
+        headers = dict(self.headers, Accept='application/msgpack')
+        response = self.client.post('/blacklists', data=msgpack.packb({
+            'email': 'new@example.com', 'app_uuid': 'app', 'blocked_reason': 'spam'
+        }), content_type='application/msgpack', headers=headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.mimetype, 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.data)['email'], 'new@example.com')
+
+        check = self.client.get('/blacklists/new@example.com', headers=headers)
+        self.assertTrue(msgpack.unpackb(check.data)['blacklisted'])
+        self.assertTrue(check.headers['ETag'].endswith('-msgpack"'))
+        self.assertIn('Accept', check.vary)
+        self.assertEqual(self.client.get('/blacklists/new@example.com', headers=self.headers).mimetype,
+                         'application/json')
+
+    @unittest.skipIf(content_negotiation.msgpack is None, 'msgpack is not installed')
+    def test_malformed_bodies_are_rejected(self):
+        """Test undecodable MessagePack and JSON bodies get a 400 on every route that reads a body"""
+        for path in ('/blacklists', '/blacklists/batch', '/blacklists/check'):
+            response = self.client.post(path, data=b'\xc1\xc1garbage',
+                                        content_type='application/msgpack', headers=self.headers)
+            self.assertEqual(response.status_code, 400, path)
+            self.assertEqual(response.get_json()['error'], 'Failed to decode MessagePack body')
+
+            response = self.client.post(path, data=b'{"email": ', content_type='application/json',
+                                        headers=self.headers)
+            self.assertEqual(response.status_code, 400, path)
+
+    def test_gzip_above_the_size_threshold(self):
+        """Test large responses are gzip compressed and small ones are left alone"""
+        headers = dict(self.headers, **{'Accept-Encoding': 'gzip'})
+        response = self.client.post('/blacklists/check', json={'emails': self.emails}, headers=headers)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.vary)
+        results = json.loads(gzip.decompress(response.data))['results']
+        self.assertEqual(len(results), 100)
+        self.assertLess(len(response.data), len(json.dumps(results)) / 4)
+
+        small = self.client.get('/blacklists/user1@example.com', headers=headers)
+        self.assertNotIn('Content-Encoding', small.headers)
+        self.assertTrue(small.get_json()['blacklisted'])
+        self.assertTrue(small.headers['ETag'].endswith('-gzip"'))
+
+    @unittest.skipIf(content_negotiation.zstandard is None, 'zstandard is not installed')
+    def test_streamed_export_is_compressed_per_chunk(self):
+        """Test the export stays streamed and every chunk is decodable as it arrives"""
+        zstandard = content_negotiation.zstandard
+        plain = self.client.get('/blacklists?format=csv', headers=self.headers).data
+        headers = dict(self.headers, **{'Accept-Encoding': 'gzip;q=0.5, zstd'})
+        response = self.client.get('/blacklists?format=csv', headers=headers, buffered=False)
+        self.assertEqual(response.headers['Content-Encoding'], 'zstd')
+        self.assertNotIn('Content-Length', response.headers)
+
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+        first_chunk = decompressor.decompress(next(iter(response.response)))
+        self.assertTrue(first_chunk.startswith(b'email,app_uuid'))
+        response.close()
+        self.assertEqual(zstandard.ZstdDecompressor().decompressobj().decompress(
+            self.client.get('/blacklists?format=csv', headers=headers).data
+        ), plain)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import time
+import unittest
+from unittest.mock import Mock, patch
+from flask import Flask
+from src.app import create_app
+from src.application.health_service import HealthService
+from src.infrastructure.health_refresher import HealthRefresher
+from src.infrastructure.migrations import create_blacklist_table
+from src.infrastructure.models import db
+
+
+class TestHealthRefresher(unittest.TestCase):
+    """Test cases for HealthRefresher"""
+
+    def setUp(self):
+        self.mock_health_check = Mock()
+        self.mock_health_check.check_database_health.return_value = True
+        self.mock_health_check.check_external_services_health.return_value = True
+        self.mock_health_check.get_database_pool_status.return_value = {}
+        self.health_service = HealthService(self.mock_health_check)
+        self.app = Flask(__name__)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def test_status_is_served_from_cache(self):
+        """Test requests between refreshes do not probe the database"""
+        refresher = HealthRefresher(self.health_service, interval=60)
+
+        for _ in range(5):
+            status = refresher.get_status()
+
+        self.assertEqual(status.status, "healthy")
+        self.assertEqual(self.mock_health_check.check_database_health.call_count, 1)
+        self.assertIn("probe_latency_ms", status.details)
+        self.assertIn("staleness_seconds", status.details)
+        refresher.stop()
+
+    def test_background_thread_refreshes_status(self):
+        """Test the refresher picks up a failing database without a request probing it"""
+        refresher = HealthRefresher(self.health_service, interval=0.02)
+        self.assertEqual(refresher.get_status().status, "healthy")
+
+        self.mock_health_check.check_database_health.return_value = False
+        deadline = time.monotonic() + 2
+        while refresher.get_status().status == "healthy" and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(refresher.get_status().status, "unhealthy")
+        refresher.stop()
+
+    def test_stale_status_is_unhealthy(self):
+        """Test a status older than max_staleness is reported as unhealthy"""
+        refresher = HealthRefresher(self.health_service, interval=60, max_staleness=0.01)
+        refresher.get_status()
+        time.sleep(0.02)
+
+        status = refresher.get_status()
+
+        self.assertEqual(status.status, "unhealthy")
+        self.assertEqual(status.message, "Health status is stale")
+        refresher.stop()
+
+
+class TestHealthEndpoints(unittest.TestCase):
+    """Test cases for the health, liveness and readiness endpoints"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        create_blacklist_table()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_health_reports_database_healthy(self):
+        """Test /health probes the database with a working query"""
+        response = self.client.get('/health')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['status'], 'healthy')
+        self.assertIn('probe_latency_ms', response.get_json()['details'])
+
+    def test_liveness_does_not_touch_database(self):
+        """Test /health/live answers even when the database is down"""
+        health_check = self.app.container.get_service('health_check')
+        with patch.object(health_check, 'check_database_health') as check:
+            response = self.client.get('/health/live')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['status'], 'alive')
+        check.assert_not_called()
+
+    def test_readiness_returns_503_when_unhealthy(self):
+        """Test /health/ready fails while the database is down"""
+        self.assertEqual(self.client.get('/health/ready').status_code, 200)
+
+        health_check = self.app.container.get_service('health_check')
+        with patch.object(health_check, 'check_database_health', return_value=False):
+            response = self.client.get('/health/ready')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.get_json()['status'], 'unhealthy')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import time
+import unittest
+from datetime import timedelta
+from flask_jwt_extended import create_access_token, create_refresh_token
+from src.app import create_app
+from src.infrastructure.migrations import create_blacklist_table
+from src.infrastructure.models import db
+from src.utils.jwt_utils import VerifiedTokenCache
+
+
+class TestVerifiedTokenCache(unittest.TestCase):
+    """Test cases for VerifiedTokenCache"""
+
+    def test_hit_after_put(self):
+        """Test a stored token is returned until evicted"""
+        cache = VerifiedTokenCache(max_size=1)
+        cache.put("token-a", "secret", {"sub": "a"})
+
+        self.assertEqual(cache.get("token-a", "secret"), {"sub": "a"})
+
+        cache.put("token-b", "secret", {"sub": "b"})
+        self.assertIsNone(cache.get("token-a", "secret"))
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_expired_token_is_not_returned(self):
+        """Test entries are dropped once the token exp has passed"""
+        cache = VerifiedTokenCache()
+        cache.put("token", "secret", {"sub": "a", "exp": int(time.time()) - 1})
+
+        self.assertIsNone(cache.get("token", "secret"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_secret_rotation_flushes_entries(self):
+        """Test a different secret empties the cache"""
+        cache = VerifiedTokenCache()
+        cache.put("token", "old-secret", {"sub": "a"})
+
+        self.assertIsNone(cache.get("token", "new-secret"))
+        self.assertEqual(cache.stats()["flushes"], 1)
+
+
+class TestRequireAuthTokenCache(unittest.TestCase):
+    """Test cases for the verified-token cache in require_auth_token"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        create_blacklist_table()
+        self.token_cache = self.app.container.get_service('verified_token_cache')
+        token = self.client.post('/token').get_json()['token']
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_repeat_requests_hit_the_cache(self):
+        """Test only the first request with a token verifies it"""
+        for _ in range(3):
+            response = self.client.get('/blacklists/user@example.com', headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+
+        stats = self.token_cache.stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 2)
+
+    def test_rotated_secret_rejects_cached_token(self):
+        """Test a cached token stops working once the secret changes"""
+        self.client.get('/blacklists/user@example.com', headers=self.headers)
+        self.app.config['JWT_SECRET_KEY'] = 'rotated-jwt-secret-key-for-the-cache-test'
+
+        response = self.client.get('/blacklists/user@example.com', headers=self.headers)
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.token_cache.stats()['flushes'], 1)
+
+    def test_expired_token_keeps_error_response(self):
+        """Test expired tokens are rejected as before and not cached"""
+        token = create_access_token(identity='blacklist_service', expires_delta=timedelta(seconds=-1))
+
+        response = self.client.get('/blacklists/user@example.com', headers={'Authorization': f'Bearer {token}'})
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.get_json()['error'], 'Invalid identity')
+        self.assertEqual(self.token_cache.stats()['size'], 0)
+
+    def test_refresh_token_is_rejected(self):
+        """Test only access tokens are accepted, as verify_jwt_in_request does"""
+        token = create_refresh_token(identity='blacklist_service')
+
+        response = self.client.get('/blacklists/user@example.com', headers={'Authorization': f'Bearer {token}'})
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.get_json()['error'], 'Invalid identity')
+        self.assertEqual(self.token_cache.stats()['size'], 0)
+
+    def test_malformed_header_keeps_error_response(self):
+        """Test malformed headers still go through the regular verification errors"""
+        response = self.client.get('/blacklists/user@example.com', headers={'Authorization': 'Token abc'})
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.get_json()['error'], 'Invalid identity')
+
+
+if __name__ == '__main__':
+    unittest.main()
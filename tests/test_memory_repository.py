@@ -0,0 +1,119 @@
+import time
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from sqlalchemy import text
+from src.app import create_app
+from src.domain.entities import Blacklist
+from src.infrastructure.memory_repository import InMemoryBlacklistRepository
+from src.infrastructure.migrations import create_blacklist_table
+from src.infrastructure.models import db
+from src.infrastructure.repositories import BlacklistRepository
+
+
+class TestInMemoryBlacklistRepository(unittest.TestCase):
+    """Test cases for InMemoryBlacklistRepository"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        create_blacklist_table()
+        self.database = BlacklistRepository()
+        self.database.add_email_to_blacklist(
+            Blacklist('User@Example.com', 'app', 'spam', '10.0.0.1', datetime(2024, 1, 2, 3, 4, 5, 678901))
+        )
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _insert_elsewhere(self, row_id, email):
+        """Insert a row as another worker would, bypassing the repository under test"""
+        with db.engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO blacklist (id, email, email_canonical, app_uuid, blocked_reason, created_at) "
+                "VALUES (:id, :email, :email, 'app', 'spam', '2024-01-01 00:00:00')"
+            ), {"id": row_id, "email": email})
+
+    def test_answers_lookups_from_memory(self):
+        """Test loaded entries round-trip every field and checks do not query the database"""
+        repository = InMemoryBlacklistRepository(self.database, poll_interval=0)
+        repository.sync()
+
+        with patch.object(self.database, 'is_email_blacklisted') as database_lookup, \
+                patch.object(repository, 'sync'):
+            entry = repository.is_email_blacklisted('user@EXAMPLE.com')
+            self.assertIsNone(repository.is_email_blacklisted('other@example.com'))
+
+        database_lookup.assert_not_called()
+        self.assertEqual(entry, Blacklist('User@Example.com', 'app', 'spam', '10.0.0.1',
+                                          datetime(2024, 1, 2, 3, 4, 5, 678901)))
+        self.assertEqual(set(repository.get_blacklisted_emails(['USER@example.com', 'x@example.com'])),
+                         {'USER@example.com'})
+
+    def test_polls_rows_written_elsewhere(self):
+        """Test rows above the high-water mark, and late commits just below it, are picked up"""
+        repository = InMemoryBlacklistRepository(self.database, poll_interval=0)
+        repository.sync()
+        self._insert_elsewhere(10, 'late@example.com')
+        repository.sync()
+        self._insert_elsewhere(5, 'slow-commit@example.com')
+
+        self.assertIsNotNone(repository.is_email_blacklisted('late@example.com'))
+        self.assertIsNotNone(repository.is_email_blacklisted('slow-commit@example.com'))
+        self.assertEqual(repository.stats()['high_water_mark'], 10)
+
+    def test_reconcile_picks_up_commits_behind_the_rescan_window(self):
+        """Test a row committed further below the mark than the rescan reaches is found by the count"""
+        repository = InMemoryBlacklistRepository(self.database, poll_interval=0, rescan_ids=1, reconcile_interval=60)
+        repository.sync()
+        self._insert_elsewhere(10, 'late@example.com')
+        repository.sync()
+        self._insert_elsewhere(5, 'bulk-chunk@example.com')
+        repository.sync()
+        self.assertIsNone(repository.is_email_blacklisted('bulk-chunk@example.com'))
+
+        repository._reconcile_at = 0.0
+        self.assertIsNotNone(repository.is_email_blacklisted('bulk-chunk@example.com'))
+        self.assertEqual(repository.stats()['reconciles'], 1)
+
+        with patch.object(self.database, 'fetch_rows_after', wraps=self.database.fetch_rows_after) as fetch:
+            repository._reconcile_at = 0.0
+            repository.sync()
+        self.assertEqual(repository.stats()['reconciles'], 1)
+        self.assertEqual(fetch.call_args.args[0], 9)
+
+    def test_writes_go_through_the_database(self):
+        """Test inserts are committed and visible locally at once"""
+        repository = InMemoryBlacklistRepository(self.database, poll_interval=60)
+
+        with patch.object(repository, '_ensure_started'):
+            repository.sync()
+            self.assertTrue(repository.add_email_to_blacklist(Blacklist('new@example.com', 'app', 'spam')))
+            self.assertFalse(repository.add_email_to_blacklist(Blacklist('NEW@example.com', 'app', 'spam')))
+            self.assertIsNotNone(repository.is_email_blacklisted('new@example.com'))
+        self.assertIsNotNone(self.database.is_email_blacklisted('new@example.com'))
+
+    def test_stale_copy_falls_back_to_database(self):
+        """Test lookups query the database once the last sync is older than max_staleness"""
+        repository = InMemoryBlacklistRepository(self.database, poll_interval=60, max_staleness=0.01)
+
+        with patch.object(repository, '_ensure_started'):
+            repository.sync()
+            self._insert_elsewhere(10, 'late@example.com')
+            self.assertIsNone(repository.is_email_blacklisted('late@example.com'))
+            time.sleep(0.02)
+            self.assertIsNotNone(repository.is_email_blacklisted('late@example.com'))
+
+        stats = repository.stats()
+        self.assertFalse(stats['usable'])
+        self.assertEqual(stats['fallback_reads'], 1)
+        self.assertEqual(stats['entries'], 1)
+        self.assertGreater(stats['memory_bytes_per_million'], 0)
+        self.assertGreaterEqual(stats['replication_lag_seconds'], 0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import json
+from datetime import timedelta
+import jwt
+from flask_jwt_extended import create_access_token
+from src.app import create_app
+from src.infrastructure.migrations import create_blacklist_table
+from src.infrastructure.models import db
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    """Test cases for the Prometheus metrics endpoint"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        create_blacklist_table()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _metrics(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        return response.data.decode()
+
+    def test_request_metrics_per_route(self):
+        """Test requests are counted by route template and status code"""
+        self.client.get('/ping')
+
+        metrics = self._metrics()
+
+        self.assertIn('http_requests_total{method="GET",route="/ping",status="200"}', metrics)
+        self.assertIn('http_request_duration_seconds_bucket{le="0.001",method="GET",route="/ping"}', metrics)
+
+    def test_blacklist_lookup_and_db_metrics(self):
+        """Test blacklist checks are counted and hit the database query metrics"""
+        token = json.loads(self.client.post('/token').data)['token']
+        self.client.get('/blacklists/clean@example.com', headers={"Authorization": f"Bearer {token}"})
+
+        metrics = self._metrics()
+
+        self.assertIn('blacklist_lookups_total{result="miss"}', metrics)
+        self.assertIn('route="/blacklists/<string:email>"', metrics)
+        self.assertIn('db_queries_total', metrics)
+
+    def test_jwt_failures_by_reason(self):
+        """Test rejected tokens are counted by reason"""
+        self.client.get('/blacklists/clean@example.com')
+
+        metrics = self._metrics()
+
+        self.assertIn('jwt_verification_failures_total{reason="missing_token"}', metrics)
+
+    def test_rejected_token_reasons_keep_the_same_body(self):
+        """Test expired, malformed and forged tokens are counted apart but answered alike"""
+        tokens = {
+            'expired': create_access_token(identity='blacklist_service', expires_delta=timedelta(seconds=-1)),
+            'decode_error': 'not-a-jwt',
+            'invalid_signature': jwt.encode({'sub': 'blacklist_service'}, 'another-secret-key-of-enough-length', algorithm='HS256'),
+        }
+        for reason, token in tokens.items():
+            with self.subTest(reason=reason):
+                response = self.client.get('/blacklists/clean@example.com', headers={"Authorization": f"Bearer {token}"})
+
+                self.assertEqual(response.status_code, 401)
+                self.assertEqual(response.get_json(), {
+                    'error': 'Invalid identity', 'message': 'Token signature verification failed'
+                })
+                self.assertRegex(self._metrics(), rf'jwt_verification_failures_total{{reason="{reason}"}} [1-9]')
+
+
+if __name__ == "__main__":
+    unittest.main()
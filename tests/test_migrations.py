@@ -0,0 +1,129 @@
+import unittest
+from sqlalchemy import inspect, text
+from src.app import create_app
+from src.domain.canonical_email import email_canonicalizer, email_digest
+from src.domain.entities import Blacklist
+from src.infrastructure.migrations import MIGRATIONS, current_version, migration_metadata, upgrade
+from src.infrastructure.models import db, BlacklistModel
+from src.infrastructure.repositories import BlacklistRepository
+
+
+class TestMigrations(unittest.TestCase):
+    """Test cases for the migrations command"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        migration_metadata.drop_all(bind=db.engine)
+        self.app_context.pop()
+
+    def test_create_app_does_not_touch_schema(self):
+        """Test building the app leaves the database untouched"""
+        self.assertNotIn('blacklist', inspect(db.engine).get_table_names())
+
+    def test_upgrade_applies_pending_migrations_once(self):
+        """Test upgrade creates the schema, records versions and is idempotent"""
+        applied = upgrade()
+
+        self.assertEqual(applied, [version for version, _, _ in MIGRATIONS])
+        self.assertIn('blacklist', inspect(db.engine).get_table_names())
+        self.assertEqual(current_version(), MIGRATIONS[-1][0])
+        self.assertEqual(upgrade(), [])
+
+    def test_canonical_email_backfill_keeps_oldest_of_colliding_rows(self):
+        """Test legacy rows get a canonical email and collisions are left unindexed"""
+        with db.engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE blacklist (id INTEGER PRIMARY KEY, email VARCHAR(255) NOT NULL UNIQUE, "
+                "app_uuid VARCHAR(36) NOT NULL, blocked_reason TEXT NOT NULL, ip VARCHAR(45), "
+                "created_at DATETIME NOT NULL)"
+            ))
+            connection.execute(text(
+                "INSERT INTO blacklist (id, email, app_uuid, blocked_reason, created_at) VALUES "
+                "(1, 'User@Example.com', 'app', 'first', '2024-01-01'), "
+                "(2, ' user@example.com', 'app', 'second', '2024-01-02'), "
+                "(3, 'other@example.com', 'app', 'third', '2024-01-03')"
+            ))
+
+        upgrade()
+
+        canonical = dict(db.session.query(BlacklistModel.id, BlacklistModel.email_canonical))
+        self.assertEqual(canonical, {1: 'user@example.com', 2: None, 3: 'other@example.com'})
+        entry = BlacklistRepository().is_email_blacklisted('USER@example.com')
+        self.assertEqual(entry.blocked_reason, 'first')
+
+    def test_changing_provider_normalization_recomputes_canonical_emails(self):
+        """Test existing Gmail aliases keep matching after normalization is turned on, and again after it is off"""
+        upgrade()
+        BlacklistRepository().add_emails_to_blacklist([
+            Blacklist('A.B+promo@gmail.com', 'app', 'first'),
+            Blacklist('ab@googlemail.com', 'app', 'second'),
+        ])
+
+        self.app.config['BLACKLIST_EMAIL_PROVIDER_NORMALIZATION'] = True
+        upgrade()
+        repository = BlacklistRepository(canonicalize=email_canonicalizer(self.app.config))
+        self.assertEqual(repository.is_email_blacklisted('ab@gmail.com').blocked_reason, 'first')
+        self.assertEqual(repository.is_email_blacklisted('a.b+other@gmail.com').blocked_reason, 'first')
+        canonical = dict(db.session.query(BlacklistModel.email, BlacklistModel.email_canonical))
+        self.assertEqual(canonical, {'A.B+promo@gmail.com': 'ab@gmail.com', 'ab@googlemail.com': None})
+        self.assertIn('ix_blacklist_email_canonical',
+                      {index['name'] for index in inspect(db.engine).get_indexes('blacklist')})
+
+        self.app.config['BLACKLIST_EMAIL_PROVIDER_NORMALIZATION'] = False
+        upgrade()
+        repository = BlacklistRepository()
+        self.assertEqual(repository.is_email_blacklisted('a.b+promo@gmail.com').blocked_reason, 'first')
+        self.assertEqual(repository.is_email_blacklisted('AB@googlemail.com').blocked_reason, 'second')
+        self.assertIsNone(repository.is_email_blacklisted('ab@gmail.com'))
+
+    def test_digest_lookup_key_swaps_indexes(self):
+        """Test digest mode keeps only the digest index and looks entries up by it, and canonical mode restores the others"""
+        upgrade()
+        repository = BlacklistRepository(lookup_key='digest')
+        self.assertTrue(repository.add_email_to_blacklist(Blacklist('User@Example.com', 'app', 'spam')))
+
+        self.app.config['BLACKLIST_LOOKUP_KEY'] = 'digest'
+        upgrade()
+
+        indexes = {index['name'] for index in inspect(db.engine).get_indexes('blacklist')}
+        self.assertIn('ix_blacklist_email_digest', indexes)
+        self.assertNotIn('ix_blacklist_email_canonical', indexes)
+        self.assertNotIn('ix_blacklist_email', indexes)
+        self.assertEqual(
+            db.session.query(BlacklistModel.email_digest).scalar(), email_digest('user@example.com')
+        )
+        self.assertEqual(repository.is_email_blacklisted(' user@example.COM').blocked_reason, 'spam')
+        self.assertFalse(repository.add_email_to_blacklist(Blacklist('USER@example.com', 'app', 'spam')))
+        self.assertEqual(repository.get_blacklisted_emails(['USER@example.com', 'x@example.com']), {
+            'USER@example.com': repository.is_email_blacklisted('user@example.com'),
+        })
+
+        self.app.config['BLACKLIST_LOOKUP_KEY'] = 'canonical'
+        upgrade()
+
+        indexes = {index['name']: index for index in inspect(db.engine).get_indexes('blacklist')}
+        self.assertNotIn('ix_blacklist_email_digest', indexes)
+        self.assertTrue(indexes['ix_blacklist_email_canonical']['unique'])
+        self.assertTrue(indexes['ix_blacklist_email']['unique'])
+
+    def test_model_leaves_lookup_indexes_to_the_migrations(self):
+        """Test the model declares no lookup index and a fresh digest-mode database only gets the digest one"""
+        db.create_all()
+        self.assertEqual(inspect(db.engine).get_indexes('blacklist'), [])
+        db.drop_all()
+
+        self.app.config['BLACKLIST_LOOKUP_KEY'] = 'digest'
+        upgrade()
+
+        indexes = {index['name'] for index in inspect(db.engine).get_indexes('blacklist')}
+        self.assertEqual(indexes, {'ix_blacklist_email_digest'})
+
+
+if __name__ == '__main__':
+    unittest.main()
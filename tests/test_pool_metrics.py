@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from src.app import create_app
+from src.infrastructure.models import db
+from src.infrastructure.pool_metrics import InstrumentedQueuePool, get_pool_status
+
+
+class TestInstrumentedQueuePool(unittest.TestCase):
+    """Test cases for connection pool metrics"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.tmp_dir.name, 'pool.db')}",
+            poolclass=InstrumentedQueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.05,
+        )
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp_dir.cleanup()
+
+    def test_checkouts_and_timeouts_are_counted(self):
+        """Test an exhausted pool records a wait and a timeout"""
+        connection = self.engine.connect()
+        try:
+            with self.assertRaises(PoolTimeoutError):
+                self.engine.connect()
+
+            status = get_pool_status(self.engine)
+            self.assertEqual(status["pool_class"], "InstrumentedQueuePool")
+            self.assertEqual(status["checked_out"], 1)
+            self.assertEqual(status["checkouts"], 1)
+            self.assertEqual(status["connects"], 1)
+            self.assertEqual(status["waits"], 1)
+            self.assertEqual(status["timeouts"], 1)
+        finally:
+            connection.close()
+
+        self.assertEqual(get_pool_status(self.engine)["checked_out"], 0)
+
+
+class TestHealthPoolStatus(unittest.TestCase):
+    """Test cases for pool status in the health endpoint"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        self.app_context.pop()
+
+    def test_health_reports_database_pool(self):
+        """Test /health includes the connection pool status"""
+        response = self.client.get('/health')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("pool_class", response.get_json()["details"]["database_pool"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from flask import Flask
+from src.app import create_app
+from src.config import TestingConfig
+from src.infrastructure import profiling
+from src.infrastructure.profiling import RequestProfiler, sign_profile_request, PROFILE_HEADER
+
+
+class TestRequestProfiler(unittest.TestCase):
+    """Test cases for RequestProfiler"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.tmp_dir.name, "profiles")
+        self.app = Flask(__name__)
+
+        self.release_slow = threading.Event()
+
+        @self.app.route("/work/<int:n>")
+        def work(n):
+            return {"total": sum(range(n))}
+
+        @self.app.route("/slow")
+        def slow():
+            self.release_slow.wait(5)
+            return {"done": True}
+
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _profiles(self):
+        if not os.path.isdir(self.output_dir):
+            return []
+        return sorted(name for name in os.listdir(self.output_dir) if name.endswith(".prof"))
+
+    def test_disabled_profiler_writes_nothing(self):
+        """Test no profile is written when sampling is off"""
+        RequestProfiler(self.output_dir).init_app(self.app)
+
+        self.client.get("/work/10")
+
+        self.assertEqual(self._profiles(), [])
+
+    def test_sampled_request_writes_profile_named_by_route(self):
+        """Test sampled requests produce a profile with route and duration in the name"""
+        RequestProfiler(self.output_dir, sample_rate=1.0).init_app(self.app)
+
+        self.client.get("/work/1000")
+
+        profiles = self._profiles()
+        self.assertEqual(len(profiles), 1)
+        self.assertIn("_GET_work-int-n_", profiles[0])
+        self.assertRegex(profiles[0], r"_\d+ms_\d+\.prof$")
+
+    def test_signed_header_forces_profile(self):
+        """Test a correctly signed header profiles the request and a bad one does not"""
+        RequestProfiler(self.output_dir, secret="s3cret").init_app(self.app)
+
+        self.client.get("/work/10", headers={PROFILE_HEADER: "bad"})
+        self.assertEqual(self._profiles(), [])
+
+        signature = sign_profile_request("s3cret", "GET", "/work/10")
+        self.client.get("/work/10", headers={PROFILE_HEADER: signature})
+        self.assertEqual(len(self._profiles()), 1)
+
+    def test_overlapping_sampled_requests_profile_one_at_a_time(self):
+        """Test a request sampled while another is profiled is served unprofiled"""
+        profiler = RequestProfiler(self.output_dir, sample_rate=1.0)
+        profiler.init_app(self.app)
+        statuses = []
+        first = threading.Thread(target=lambda: statuses.append(self.app.test_client().get("/slow").status_code))
+        first.start()
+        try:
+            deadline = time.monotonic() + 5
+            while not profiling._profile_lock.locked() and time.monotonic() < deadline:
+                time.sleep(0.001)
+
+            self.assertEqual(self.client.get("/work/10").status_code, 200)
+            self.assertEqual(profiler.profiles_skipped, 1)
+        finally:
+            self.release_slow.set()
+            first.join()
+
+        self.assertEqual(statuses, [200])
+        self.assertEqual(len(self._profiles()), 1)
+        self.assertIn("_GET_slow_", self._profiles()[0])
+        self.client.get("/work/10")
+        self.assertEqual(len(self._profiles()), 2)
+
+    def test_profiler_already_active_does_not_fail_the_request(self):
+        """Test a request is still served when cProfile cannot be enabled"""
+        RequestProfiler(self.output_dir, sample_rate=1.0).init_app(self.app)
+
+        with patch("src.infrastructure.profiling.cProfile.Profile.enable",
+                   side_effect=ValueError("Another profiling tool is already active")):
+            self.assertEqual(self.client.get("/work/10").status_code, 200)
+        self.assertEqual(self._profiles(), [])
+
+    def test_disk_usage_is_capped(self):
+        """Test the oldest profiles are removed past the size cap"""
+        RequestProfiler(self.output_dir, sample_rate=1.0, max_bytes=1).init_app(self.app)
+
+        for _ in range(3):
+            self.client.get("/work/10")
+
+        self.assertLessEqual(len(self._profiles()), 1)
+
+    def test_control_file_toggles_sample_rate(self):
+        """Test a sample rate written by one profiler is picked up by another"""
+        control_file = os.path.join(self.tmp_dir.name, "control.json")
+        writer = RequestProfiler(self.output_dir, control_file=control_file)
+        reader = RequestProfiler(self.output_dir, control_file=control_file)
+
+        writer.set_sample_rate(0.5)
+
+        with patch("src.infrastructure.profiling.time.monotonic", return_value=10**6):
+            self.assertEqual(reader.status()["sample_rate"], 0.5)
+
+
+class TestProfilingController(unittest.TestCase):
+    """Test cases for the profiling admin endpoint"""
+
+    def setUp(self):
+        with patch.object(TestingConfig, 'PROFILING_SECRET', 's3cret'):
+            self.app = create_app('testing')
+        self.client = self.app.test_client()
+        token = json.loads(self.client.post('/token').data)['token']
+        self.auth_headers = {"Authorization": f"Bearer {token}"}
+        self.signed_headers = dict(self.auth_headers, **{
+            PROFILE_HEADER: sign_profile_request('s3cret', 'PUT', '/admin/profiling')
+        })
+
+    def test_put_changes_sample_rate(self):
+        """Test the sample rate can be changed at runtime"""
+        response = self.client.put('/admin/profiling', json={"sample_rate": 0.25}, headers=self.signed_headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["sample_rate"], 0.25)
+        self.assertEqual(self.app.container.get_service("request_profiler").sample_rate, 0.25)
+
+    def test_put_rejects_invalid_rate(self):
+        """Test sample rates outside [0, 1] are rejected"""
+        response = self.client.put('/admin/profiling', json={"sample_rate": 2}, headers=self.signed_headers)
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_put_requires_signature(self):
+        """Test a bearer token alone cannot change the sample rate"""
+        response = self.client.put('/admin/profiling', json={"sample_rate": 1}, headers=self.auth_headers)
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.app.container.get_service("request_profiler").sample_rate, 0.0)
+
+    def test_requires_token(self):
+        """Test the admin endpoint requires authentication"""
+        response = self.client.get('/admin/profiling')
+
+        self.assertEqual(response.status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
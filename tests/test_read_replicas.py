@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from sqlalchemy import text
+from src.app import create_app
+from src.config import TestingConfig
+from src.domain.entities import Blacklist
+from src.infrastructure.migrations import create_blacklist_table
+from src.infrastructure.models import db, BlacklistModel
+
+
+class TestReadReplicaRouting(unittest.TestCase):
+    """Test cases for routing blacklist reads to a replica (two SQLite files)"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        primary_url = f"sqlite:///{os.path.join(self.tmp_dir, 'primary.db')}"
+        replica_url = f"sqlite:///{os.path.join(self.tmp_dir, 'replica.db')}"
+        with patch.object(TestingConfig, 'SQLALCHEMY_DATABASE_URI', primary_url), \
+                patch.object(TestingConfig, 'SQLALCHEMY_BINDS', {'replica_0': replica_url}), \
+                patch.object(TestingConfig, 'BLACKLIST_CACHE_ENABLED', False):
+            self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        create_blacklist_table()
+        BlacklistModel.__table__.create(db.engines['replica_0'])
+        token = self.client.post('/token').get_json()['token']
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.repository = self.app.container.get_service('blacklist_repository')
+
+    def tearDown(self):
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+        self.app_context.pop()
+        # init_app registers a metadata per bind on the shared extension; later apps have no replica bind
+        db.metadatas.pop('replica_0', None)
+        shutil.rmtree(self.tmp_dir)
+
+    def _check(self, email, client_ip):
+        response = self.client.get(
+            f'/blacklists/{email}', headers=self.headers, environ_base={'REMOTE_ADDR': client_ip}
+        )
+        return response.get_json()['blacklisted']
+
+    def test_writer_reads_its_own_insert_from_primary(self):
+        """Test the inserting client reads from the primary while others read the (lagging) replica"""
+        response = self.client.post('/blacklists', json={
+            'email': 'user@example.com', 'app_uuid': 'app', 'blocked_reason': 'spam'
+        }, headers=self.headers, environ_base={'REMOTE_ADDR': '10.0.0.1'})
+        self.assertEqual(response.status_code, 201)
+
+        self.assertTrue(self._check('user@example.com', '10.0.0.1'))
+        self.assertFalse(self._check('user@example.com', '10.0.0.2'))
+
+    def test_reads_outside_the_window_use_the_replica(self):
+        """Test reads go to the replica once the read-your-writes window has passed"""
+        self.repository._read_router._window = 0
+        self.repository.add_email_to_blacklist(Blacklist('user@example.com', 'app', 'spam'))
+
+        self.assertIsNone(self.repository.is_email_blacklisted('user@example.com'))
+        self.assertEqual(list(self.repository.iter_emails()), [])
+
+    def test_failing_replica_falls_back_to_primary(self):
+        """Test a replica error sends the read to the primary and takes the replica out of rotation"""
+        self.repository.add_email_to_blacklist(Blacklist('user@example.com', 'app', 'spam'))
+        with db.engines['replica_0'].begin() as connection:
+            connection.execute(text('DROP TABLE blacklist'))
+
+        self.assertIsNotNone(self.repository.is_email_blacklisted('user@example.com'))
+        self.assertEqual(self.repository._read_router.stats()['unhealthy'], ['replica_0'])
+        self.assertEqual(
+            set(self.repository.get_blacklisted_emails(['user@example.com', 'x@example.com'])),
+            {'user@example.com'}
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
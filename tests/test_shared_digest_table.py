@@ -0,0 +1,151 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from sqlalchemy import text
+from src.app import create_app
+from src.domain.canonical_email import email_digest
+from src.domain.entities import Blacklist
+from src.infrastructure.migrations import create_blacklist_table
+from src.infrastructure.models import db
+from src.infrastructure.repositories import BlacklistRepository
+from src.infrastructure.shared_digest_table import (
+    DigestTable,
+    SharedTableBlacklistRepository,
+    build_from_repository,
+    write_digest_table,
+)
+
+
+class TestDigestTable(unittest.TestCase):
+    """Test cases for the digest table file format"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'digests.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_lookup_with_colliding_slots(self):
+        """Test members are found past probe collisions, duplicates are stored once and absent digests miss"""
+        digests = [email_digest(f'user{i}@example.com') for i in range(1000)]
+        # Same first 8 bytes, so both probe from the same slot
+        colliding = [b'\x01' * 8 + b'\x02' * 8, b'\x01' * 8 + b'\x03' * 8]
+
+        self.assertEqual(write_digest_table(self.path, digests + digests[:10] + colliding, 1234), 1002)
+        table = DigestTable(self.path)
+
+        self.assertTrue(all(digest in table for digest in digests + colliding))
+        self.assertNotIn(b'\x01' * 8 + b'\x04' * 8, table)
+        self.assertNotIn(email_digest('absent@example.com'), table)
+        self.assertEqual((table.entries, table.slots, table.high_water_mark), (1002, 2048, 1234))
+        self.assertFalse([name for name in os.listdir(self.tmp_dir) if name != 'digests.bin'])
+
+
+class TestSharedTableBlacklistRepository(unittest.TestCase):
+    """Test cases for SharedTableBlacklistRepository"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'digests.bin')
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        create_blacklist_table()
+        self.database = BlacklistRepository()
+        self.database.add_email_to_blacklist(Blacklist('User@Example.com', 'app', 'spam'))
+        self.repository = SharedTableBlacklistRepository(
+            self.database, self.path, check_interval=0, poll_interval=60
+        )
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        shutil.rmtree(self.tmp_dir)
+
+    def _insert_elsewhere(self, row_id, email):
+        """Insert a row as another worker would, bypassing the repository under test"""
+        with db.engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO blacklist (id, email, email_canonical, app_uuid, blocked_reason, created_at) "
+                "VALUES (:id, :email, :email, 'app', 'spam', '2024-01-01 00:00:00')"
+            ), {"id": row_id, "email": email})
+
+    def test_misses_skip_the_database(self):
+        """Test absent emails are answered from the table and present ones are fetched from the database"""
+        build_from_repository(self.database, self.path)
+
+        with patch.object(self.database, 'is_email_blacklisted', wraps=self.database.is_email_blacklisted) as lookup:
+            self.assertIsNone(self.repository.is_email_blacklisted('other@example.com'))
+            self.assertEqual(self.repository.is_email_blacklisted('user@EXAMPLE.com').email, 'User@Example.com')
+        lookup.assert_called_once_with('user@EXAMPLE.com')
+        self.assertEqual(
+            set(self.repository.get_blacklisted_emails(['USER@example.com', 'x@example.com'])),
+            {'USER@example.com'}
+        )
+
+    def test_delta_covers_rows_newer_than_the_table(self):
+        """Test local inserts and rows above the high-water mark are found until the next swap"""
+        build_from_repository(self.database, self.path)
+        self._insert_elsewhere(10, 'elsewhere@example.com')
+
+        self.assertTrue(self.repository.add_email_to_blacklist(Blacklist('local@example.com', 'app', 'spam')))
+        self.assertIsNotNone(self.repository.is_email_blacklisted('local@example.com'))
+        self.assertIsNotNone(self.repository.is_email_blacklisted('elsewhere@example.com'))
+        self.assertEqual(self.repository.stats()['delta_entries'], 2)
+
+        build_from_repository(self.database, self.path)
+        self.assertIsNotNone(self.repository.is_email_blacklisted('local@example.com'))
+        stats = self.repository.stats()
+        self.assertEqual((stats['swaps'], stats['entries'], stats['delta_entries']), (2, 3, 0))
+
+    def test_out_of_order_commits_are_polled(self):
+        """Test late commits below the mark are found by the rescan, or by the reconcile further back"""
+        self._insert_elsewhere(10, 'high@example.com')
+        build_from_repository(self.database, self.path)
+        self.repository._rescan_ids = 3
+        self.repository._poll_interval = 0
+        self.assertIsNone(self.repository.is_email_blacklisted('nearby@example.com'))
+
+        self._insert_elsewhere(8, 'nearby@example.com')
+        self._insert_elsewhere(3, 'far-behind@example.com')
+        self.assertIsNotNone(self.repository.is_email_blacklisted('nearby@example.com'))
+        self.assertIsNone(self.repository.is_email_blacklisted('far-behind@example.com'))
+
+        self.repository._reconcile_at = 0.0
+        self.assertIsNotNone(self.repository.is_email_blacklisted('far-behind@example.com'))
+        stats = self.repository.stats()
+        self.assertEqual((stats['reconciles'], stats['delta_entries']), (1, 2))
+
+    def test_build_streams_rows_and_stops_when_full(self):
+        """Test a build sized by a stale count stops at the load cap and leaves later rows to the delta"""
+        for row_id in range(10, 40):
+            self._insert_elsewhere(row_id, f'user{row_id}@example.com')
+
+        with patch.object(self.database, 'count_rows', return_value=1):
+            self.assertEqual(build_from_repository(self.database, self.path, batch_size=7), 12)
+        table = DigestTable(self.path)
+        self.assertEqual((table.slots, table.high_water_mark), (16, 20))
+        self.assertEqual(os.listdir(self.tmp_dir), ['digests.bin'])
+
+        self.assertIsNotNone(self.repository.is_email_blacklisted('user39@example.com'))
+        self.assertEqual(self.repository.stats()['delta_entries'], 19)
+
+    def test_missing_or_stale_table_falls_back_to_database(self):
+        """Test lookups query the database until a table exists and once polling is overdue"""
+        self._insert_elsewhere(10, 'late@example.com')
+        self.assertIsNotNone(self.repository.is_email_blacklisted('late@example.com'))
+        self.assertFalse(self.repository.stats()['loaded'])
+
+        build_from_repository(self.database, self.path)
+        self.repository._max_staleness = 0
+        with patch.object(self.repository, '_poll_delta'):
+            self.assertIsNotNone(self.repository.is_email_blacklisted('late@example.com'))
+        self.assertEqual(self.repository.stats()['fallback_reads'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import time
+import unittest
+from unittest.mock import patch
+from src.app import create_app
+from src.config import TestingConfig
+from src.domain.entities import Blacklist
+from src.infrastructure.migrations import create_blacklist_table
+from src.infrastructure.models import db, BlacklistModel
+from src.infrastructure.repositories import BlacklistRepository
+from src.infrastructure.write_behind import WriteBehindBlacklistRepository
+
+
+class TestWriteBehindBlacklistRepository(unittest.TestCase):
+    """Test cases for WriteBehindBlacklistRepository"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        create_blacklist_table()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_pending_entries_are_visible_before_commit(self):
+        """Test checks see a queued email before the flusher writes it"""
+        queue = WriteBehindBlacklistRepository(BlacklistRepository(), 'secret', flush_interval=60)
+
+        tracking_id = queue.enqueue(Blacklist('User@Example.com', 'app', 'spam'))
+
+        self.assertEqual(queue.is_email_blacklisted('user@example.com').blocked_reason, 'spam')
+        self.assertIn('user@example.com', queue.get_blacklisted_emails(['user@example.com']))
+        self.assertEqual(BlacklistModel.query.count(), 0)
+        self.assertEqual(queue.get_status(tracking_id)['status'], 'pending')
+        self.assertNotIn('Example', tracking_id)
+
+        queue.close()
+
+        self.assertEqual(BlacklistModel.query.count(), 1)
+        self.assertEqual(queue.get_status(tracking_id)['status'], 'created')
+
+    def test_flusher_batches_and_reports_duplicates(self):
+        """Test the background thread writes a full batch and marks repeated emails as duplicates"""
+        repository = BlacklistRepository()
+        queue = WriteBehindBlacklistRepository(repository, 'secret', batch_size=3, flush_interval=60)
+
+        with patch.object(repository, 'add_emails_to_blacklist', wraps=repository.add_emails_to_blacklist) as add:
+            ids = [
+                queue.enqueue(Blacklist(email, 'app', 'spam'))
+                for email in ('a@example.com', 'b@example.com', 'A@example.com')
+            ]
+            deadline = time.monotonic() + 2
+            while queue.stats()['outstanding'] and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        add.assert_called_once()
+        self.assertEqual([queue.get_status(i)['status'] for i in ids], ['created', 'created', 'duplicate'])
+        queue.close()
+
+    def test_full_queue_rejects_entries(self):
+        """Test enqueue refuses entries beyond max_queue_size"""
+        queue = WriteBehindBlacklistRepository(BlacklistRepository(), 'secret', max_queue_size=1, flush_interval=60)
+
+        self.assertIsNotNone(queue.enqueue(Blacklist('a@example.com', 'app', 'spam')))
+        self.assertIsNone(queue.enqueue(Blacklist('b@example.com', 'app', 'spam')))
+        queue.close()
+
+    def test_status_of_entries_queued_elsewhere(self):
+        """Test other workers report signed tracking ids as unknown and reject forged ones"""
+        producer = WriteBehindBlacklistRepository(BlacklistRepository(), 'secret', flush_interval=60)
+        tracking_id = producer.enqueue(Blacklist('user@example.com', 'app', 'spam'))
+        other = WriteBehindBlacklistRepository(BlacklistRepository(), 'secret')
+
+        self.assertEqual(other.get_status(tracking_id)['status'], 'unknown')
+        producer.close()
+        self.assertEqual(producer.get_status(tracking_id)['status'], 'created')
+
+        token = tracking_id.split('.')[0]
+        self.assertIsNone(other.get_status(f'{token}x.{tracking_id.split(".")[1]}'))
+        self.assertIsNone(other.get_status('not-a-tracking-id'))
+        self.assertIsNone(WriteBehindBlacklistRepository(BlacklistRepository(), 'other').get_status(tracking_id))
+
+    def test_status_of_evicted_entries_is_unknown(self):
+        """Test a worker answers unknown once an outcome falls out of its retained statuses"""
+        queue = WriteBehindBlacklistRepository(BlacklistRepository(), 'secret', flush_interval=60, status_retention=1)
+        first = queue.enqueue(Blacklist('a@example.com', 'app', 'spam'))
+        queue.enqueue(Blacklist('b@example.com', 'app', 'spam'))
+
+        self.assertEqual(queue.get_status(first)['status'], 'unknown')
+        queue.close()
+
+
+class TestWriteBehindEndpoints(unittest.TestCase):
+    """Test cases for POST /blacklists in write-behind mode"""
+
+    def setUp(self):
+        with patch.object(TestingConfig, 'BLACKLIST_WRITE_BEHIND_ENABLED', True, create=True), \
+                patch.object(TestingConfig, 'BLACKLIST_WRITE_BEHIND_FLUSH_INTERVAL', 60, create=True):
+            self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        create_blacklist_table()
+        token = self.client.post('/token').get_json()['token']
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.queue = self.app.container.get_service('write_behind_repository')
+
+    def tearDown(self):
+        self.queue.close()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_post_returns_202_with_tracking_id(self):
+        """Test an accepted insert is checkable at once and trackable until committed"""
+        response = self.client.post('/blacklists', json={
+            'email': 'user@example.com', 'app_uuid': 'app', 'blocked_reason': 'spam'
+        }, headers=self.headers)
+
+        self.assertEqual(response.status_code, 202)
+        body = response.get_json()
+        self.assertEqual(body['status'], 'pending')
+        self.assertEqual(response.headers['Location'], f"/blacklists/ingest/{body['tracking_id']}")
+
+        check = self.client.get('/blacklists/user@example.com', headers=self.headers)
+        self.assertTrue(check.get_json()['blacklisted'])
+
+        self.queue.flush()
+        status = self.client.get(response.headers['Location'], headers=self.headers)
+        self.assertEqual(status.status_code, 200)
+        self.assertEqual(status.get_json()['status'], 'created')
+
+    def test_post_returns_503_when_queue_is_full(self):
+        """Test backpressure once the queue is full"""
+        payload = {'app_uuid': 'app', 'blocked_reason': 'spam'}
+        with patch.object(self.queue, '_max_queue_size', 1):
+            first = self.client.post('/blacklists', json=dict(payload, email='a@example.com'), headers=self.headers)
+            second = self.client.post('/blacklists', json=dict(payload, email='b@example.com'), headers=self.headers)
+
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(second.status_code, 503)
+        self.assertEqual(second.headers['Retry-After'], '1')
+
+    def test_unknown_tracking_id_returns_404(self):
+        """Test a malformed tracking id is rejected"""
+        response = self.client.get('/blacklists/ingest/not-a-tracking-id', headers=self.headers)
+
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()